@@ -0,0 +1,41 @@
+"""add content hashes for dedup / incremental ingestion
+
+Revision ID: 8f3a1c2d9b7e
+Revises: 5c273b42f11b
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8f3a1c2d9b7e'
+down_revision: Union[str, Sequence[str], None] = '5c273b42f11b'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        'documents',
+        sa.Column('content_hash', sa.String(length=64), nullable=True)
+    )
+    op.create_index('ix_documents_source', 'documents', ['source'])
+
+    op.add_column(
+        'embeddings',
+        sa.Column('content_hash', sa.String(length=64), nullable=True)
+    )
+    op.create_index('ix_embeddings_content_hash', 'embeddings', ['content_hash'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_embeddings_content_hash', table_name='embeddings')
+    op.drop_column('embeddings', 'content_hash')
+    op.drop_index('ix_documents_source', table_name='documents')
+    op.drop_column('documents', 'content_hash')
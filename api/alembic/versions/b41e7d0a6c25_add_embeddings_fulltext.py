@@ -0,0 +1,44 @@
+"""add full-text search column to embeddings (hybrid retrieval)
+
+Revision ID: b41e7d0a6c25
+Revises: 8f3a1c2d9b7e
+Create Date: 2026-10-18 20:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b41e7d0a6c25'
+down_revision: Union[str, Sequence[str], None] = '8f3a1c2d9b7e'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        'embeddings',
+        sa.Column(
+            'content_tsv',
+            postgresql.TSVECTOR(),
+            sa.Computed("to_tsvector('simple', content)", persisted=True),
+            nullable=True
+        )
+    )
+    op.create_index(
+        'ix_embeddings_content_tsv',
+        'embeddings',
+        ['content_tsv'],
+        postgresql_using='gin'
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_embeddings_content_tsv', table_name='embeddings')
+    op.drop_column('embeddings', 'content_tsv')
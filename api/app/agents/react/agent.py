@@ -4,7 +4,7 @@ from app.agents.memory.summarize import summarize_history
 from app.agents.memory.base import AgentMemory
 from app.agents.state import AgentState
 from app.llm.runner import run_llm_async
-from app.llm.factory import LLMClientFactory
+from app.llm.factory import get_llm_factory
 from app.agents.schemas import AgentStep, ActionType
 from app.agents.actions import execute_action
 from app.llm.config import DEFAULT_GEN_CONFIG
@@ -26,7 +26,7 @@ class ReActAgent:
         self.memory = memory
         self.gen_config = generation_config or DEFAULT_GEN_CONFIG
 
-        self.llm_client = LLMClientFactory().get(provider)
+        self.llm_client = get_llm_factory().get(provider)
 
         self.tool_timeout = tool_timeout
         self.planner_timeout = planner_timeout
@@ -1,5 +1,6 @@
 from app.embeddings.factory import get_embedding_client
 from app.embeddings.service import EmbeddingService
+from app.container import vector_store
 from app.core.config import settings
 from app.infra.db import qdrant
 from .base import Tool
@@ -14,10 +15,10 @@ class VectorSearchTool(Tool):
         self.embedding_service = EmbeddingService(
             client=embedding_client
         )
-        self.use_qdrant = True  # switch between Qdrant & FAISS
+        self.use_qdrant = settings.VECTOR_SEARCH_BACKEND != "faiss"
 
-        # Lazy initialization for FAISS
-        self.faiss_index = None
+        # shared persisted FAISS index
+        self.faiss_index = vector_store
 
     def run(self, input: str, top_k: int = 5) -> str:
         # 1. Get embedding
@@ -33,8 +34,6 @@ class VectorSearchTool(Tool):
                 ]
             )
         else:
-            if self.faiss_index is None:
-                raise ValueError("FAISS index is not built")
             results = self.faiss_index.search(query_embedding=embedding, k=top_k)
             return "\n".join(
                 [
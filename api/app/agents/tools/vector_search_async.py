@@ -1,12 +1,14 @@
 import json
+from app.container import vector_store
 from app.core.config import settings
 from app.embeddings.factory import get_embedding_client
 from .base import Tool
 from app.agents.schemas import ActionType
 from app.embeddings.service import EmbeddingService
 from app.agents.tools.validation import VectorSearchArgs
+from app.embeddings.schemas import SimilarityResult
 from app.infra.db import qdrant
-import asyncio
+from app.services.reranker import get_reranker
 
 
 class VectorSearchAsyncTool(Tool):
@@ -15,7 +17,8 @@ class VectorSearchAsyncTool(Tool):
     def __init__(self):
         embedding_client = get_embedding_client(settings.EMBEDDING_PROVIDER)
         self.embedding_service = EmbeddingService(embedding_client)
-        self.use_qdrant = True
+        self.use_qdrant = settings.VECTOR_SEARCH_BACKEND != "faiss"
+        self.reranker = get_reranker()
 
     async def run(self, args: dict) -> str:
         """
@@ -64,13 +67,36 @@ class VectorSearchAsyncTool(Tool):
 
         # 3️⃣ Search in Qdrant
         if self.use_qdrant:
-            results = await asyncio.to_thread(
-                qdrant.search, query_vector=embedding, limit=validated_args.top_k
-            )
+            if self.reranker:
+                # over-fetch, keep the best top_k by cross-encoder score
+                hits = await qdrant.search(
+                    query_vector=embedding, limit=settings.RERANK_CANDIDATES
+                )
+                reranked = await self.reranker.rerank(
+                    validated_args.query,
+                    [
+                        SimilarityResult(
+                            document=h["content"], score=h["score"], id=str(h["id"])
+                        )
+                        for h in hits
+                    ],
+                    top_n=validated_args.top_k
+                )
+                results = [{"content": r.document, "score": r.score} for r in reranked]
+            else:
+                results = await qdrant.search(
+                    query_vector=embedding, limit=validated_args.top_k
+                )
             return "\n".join([
                 f"{r['content']} (score: {r['score']:.3f})"
                 for r in results
             ])
         else:
-            # TODO: add async FAISS if needed
-            raise NotImplementedError("FAISS async search not implemented yet")
+            # local FAISS index, searched in a thread
+            results = await vector_store.asearch(
+                query_embedding=embedding, k=validated_args.top_k
+            )
+            return "\n".join([
+                f"{doc} (score: {score:.3f})"
+                for doc, score in results
+            ])
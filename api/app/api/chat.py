@@ -1,12 +1,16 @@
 import traceback
 from fastapi import APIRouter, HTTPException, Depends, Request
+from fastapi.responses import StreamingResponse
+from app.core.logging import logger
+from app.core.sse import format_sse
 from app.dependencies.validation import chat_params_dependency
 from app.llm.sanitizer import sanitize_user_prompt
 from app.models.user import UserContext
 from app.services.chat_service import ChatService
 from app.services.rag_service import RAGService
-from app.llm.factory import LLMClientFactory
-from app.llm.filter import refusal_response, validate_llm_output
+from app.llm.factory import get_llm_factory
+from app.llm.filter import \
+    fallback_response, refusal_response, validate_llm_output, validate_partial_output
 from app.schemas.chat import ChatRequest, ChatRAGRequest, ChatResponse
 from app.llm.config import DEFAULT_GEN_CONFIG
 from app.dependencies.auth import auth_dependency
@@ -51,14 +55,7 @@ async def chat(
         )
 
         if not validate_llm_output(llm_output):
-            return {
-                "status": "fallback",
-                "answer": """
-                I might be mistaken.
-                Please rephrase your question or narrow the scope.
-                """,
-                "confidence": "low"
-            }
+            return fallback_response()
 
         return llm_output
 
@@ -71,6 +68,73 @@ async def chat(
         raise HTTPException(status_code=500, detail="Internal server error")
 
 
+async def _sse_stream(frames):
+    """
+    Pipes ChatService frames to SSE events,
+    validating the accumulated answer as it grows
+    """
+    text = ""
+    try:
+        async for frame in frames:
+            if frame["type"] == "delta":
+                text += frame["text"]
+                if not validate_partial_output(text, frame["text"]):
+                    yield format_sse("fallback", fallback_response())
+                    return
+                yield format_sse("delta", {"text": frame["text"]})
+            else:
+                if not text:
+                    yield format_sse("fallback", fallback_response())
+                    return
+                yield format_sse("done", frame)
+
+    except Exception:
+        logger.exception("Chat stream error")
+        yield format_sse("error", {"detail": "Internal server error"})
+
+    finally:
+        await frames.aclose()
+
+
+@router.post("/stream")
+async def chat_stream(
+    req: ChatRequest,
+    request: Request,
+    params=Depends(chat_params_dependency),  # provider, generation_config, timeout
+    user: UserContext = Depends(auth_dependency)
+):
+    """
+    Streams LLM answer as Server-Sent Events:
+    delta* → done | fallback | error
+    """
+    if not req.prompt or not req.prompt.strip():
+        raise HTTPException(status_code=400, detail="Prompt cannot be empty")
+
+    try:
+        safe_prompt = sanitize_user_prompt(req.prompt)
+        safe_instruction = (
+            sanitize_user_prompt(params["instruction"])
+            if params["instruction"] else None
+        )
+    except ValueError as e:
+        return refusal_response(str(e))
+
+    frames = service.stream(
+        prompt=safe_prompt,
+        provider=params["provider"],
+        gen_config=params["generation_config"],
+        instruction=safe_instruction,
+        timeout=params["timeout"],
+        request=request
+    )
+
+    return StreamingResponse(
+        _sse_stream(frames),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
 @router.post(
     "/rag",
     response_model=ChatResponse
@@ -95,7 +159,7 @@ async def chat_rag(
     )
 
     # 2. Get LLM client
-    llm_factory = LLMClientFactory()
+    llm_factory = get_llm_factory()
     llm_client = llm_factory.get(req.llm_provider)
 
     # Generate answer threw RAG
@@ -107,13 +171,6 @@ async def chat_rag(
     )
 
     if not validate_llm_output(llm_output):
-        return {
-            "status": "fallback",
-            "answer": """
-            I might be mistaken.
-            Please rephrase your question or narrow the scope.
-            """,
-            "confidence": "low"
-        }
+        return fallback_response()
 
     return llm_output
@@ -1,7 +1,7 @@
 from fastapi import APIRouter
 from app.services.chat_service import ChatService
 from app.services.rag_service import RAGService
-from app.llm.factory import LLMClientFactory
+from app.llm.factory import get_llm_factory
 from app.llm.config import EVAL_GEN_CONFIG
 
 router = APIRouter(prefix="/eval", tags=["Evaluation"])
@@ -47,7 +47,7 @@ async def eval_rag(question: str):
         top_k=5
     )
 
-    llm_factory = LLMClientFactory()
+    llm_factory = get_llm_factory()
     llm_client = llm_factory.get("qwen")
 
     result = await rag.answer(
@@ -1,10 +1,14 @@
 from uuid import UUID
-from fastapi import APIRouter, Depends, HTTPException, Path
+from fastapi import APIRouter, Depends, HTTPException, Path, Query
+from fastapi.responses import StreamingResponse
 
+from app.core.config import settings
+from app.core.sse import format_sse
 from app.dependencies.auth import auth_dependency
 from app.dependencies.inference import get_inference_service
+from app.inference.callbacks import callback_url_error
 from app.schemas.inference import \
-    InferenceResponse, InferenceRequest, InferenceStatusResponse
+    InferenceResponse, InferenceRequest, InferenceStatusResponse, JobStateResponse
 from app.inference.inference_service import InferenceService
 from app.dependencies.user import get_current_user
 
@@ -27,12 +31,19 @@ async def create_inference(
     """
     Creates async inference job
     """
+    callback_url = str(request.callback_url) if request.callback_url else None
+    if callback_url:
+        error = await callback_url_error(callback_url)
+        if error:
+            raise HTTPException(status_code=422, detail=f"Invalid callback_url: {error}")
+
     job_id = await service.create_job(
         prompt=request.prompt,
         model=request.model,
         temperature=request.temperature,
+        job_type="single_shot",
         user_id=user.id,
-        callback_url=request.callback_url
+        callback_url=callback_url
     )
     return InferenceResponse(job_id=job_id)
 
@@ -58,3 +69,56 @@ async def get_inference_status(
         result=job.get("result"),
         error=job.get("error")
     )
+
+
+def _job_state(job: dict) -> dict:
+    return JobStateResponse(**job).model_dump(mode="json")
+
+
+@router.get(
+    "/{job_id}/wait",
+    response_model=JobStateResponse
+)
+async def wait_for_job(
+    job_id: UUID = Path(...),
+    timeout: float = Query(30.0, gt=0, le=settings.JOB_WAIT_MAX_TIMEOUT),
+    service: InferenceService = Depends(get_inference_service)
+):
+    """
+    Long-poll: returns once the job has finished,
+    or its current state after `timeout` seconds. Any job type
+    """
+    job = await service.wait_for_job(job_id, timeout)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return JobStateResponse(**job)
+
+
+async def _job_sse_stream(updates):
+    async for event, data in updates:
+        if event == "status":
+            yield format_sse("status", _job_state(data))
+        elif event == "progress":
+            yield format_sse("progress", data)
+        else:
+            yield ": keepalive\n\n"
+
+
+@router.get("/{job_id}/events")
+async def job_events_stream(
+    job_id: UUID = Path(...),
+    service: InferenceService = Depends(get_inference_service)
+):
+    """
+    Job updates as Server-Sent Events:
+    status (current state first), progress*, ... until the job
+    has finished. Any job type
+    """
+    if not await service.get_job_status(job_id):
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    return StreamingResponse(
+        _job_sse_stream(service.watch_job(job_id)),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
@@ -1,7 +1,16 @@
-from fastapi import APIRouter, Depends, HTTPException, Request, UploadFile, Query
+import json
+import uuid
+from uuid import UUID
+from fastapi import APIRouter, Depends, HTTPException, Path, Request, UploadFile, Query
+from app.core.config import settings
 from app.dependencies.auth import auth_dependency
+from app.dependencies.inference import get_inference_service
 from app.dependencies.rate_limit import rate_limit_dependency
-from app.services.ingestion import EmbeddingLimitExceeded, ingest_pdf
+from app.inference.inference_service import InferenceService
+from app.models.user import UserContext
+from app.schemas.inference import InferenceResponse
+from app.schemas.ingestion import IngestionJobStatusResponse
+from app.services.ingestion import EmbeddingLimitExceeded, ingest_pdf, spool_to_disk
 
 router = APIRouter(
     prefix="/ingestion",
@@ -33,3 +42,55 @@ async def ingest(
             detail=f"Ingestion failed: {str(e)}. Probably, PDF is to big for limits."
         )
     return {"status": "ok", **result}
+
+
+@router.post("/ingest/async", response_model=InferenceResponse)
+async def ingest_async(
+    file: UploadFile,
+    source: str = Query(..., description="Источник документа"),
+    user: UserContext = Depends(auth_dependency),
+    service: InferenceService = Depends(get_inference_service),
+    _: None = Depends(rate_limit_dependency)
+):
+    """
+    Background ingestion: spools the upload to disk, creates an
+    'ingestion' job, returns job_id right away (no chunk cap)
+    """
+    path = await spool_to_disk(file.file, dir=settings.INGEST_SPOOL_DIR)
+
+    payload = {
+        "path": path,
+        "source": source,
+        "document_id": str(uuid.uuid4()),
+        "embedding_provider": settings.EMBEDDING_PROVIDER,
+    }
+
+    job_id = await service.create_job(
+        prompt=json.dumps(payload),
+        model=settings.EMBEDDING_PROVIDER,
+        temperature=0.0,
+        user_id=user.id,
+        job_type="ingestion",
+    )
+    return InferenceResponse(job_id=job_id)
+
+
+@router.get("/jobs/{job_id}", response_model=IngestionJobStatusResponse)
+async def get_ingestion_status(
+    job_id: UUID = Path(...),
+    service: InferenceService = Depends(get_inference_service)
+):
+    """
+    Returns ingestion job state, progress and result/error
+    """
+    job = await service.get_job_status(job_id)
+    if not job or job.get("job_type") != "ingestion":
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    return IngestionJobStatusResponse(
+        job_id=job_id,
+        status=job["status"],
+        progress=job.get("progress"),
+        result=job.get("result"),
+        error=job.get("error")
+    )
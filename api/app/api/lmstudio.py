@@ -18,7 +18,8 @@ router = APIRouter(
 def get_lmstudio_client():
     return BaseHTTPClient(
         base_url=settings.LMSTUDIO_BASE_URL,
-        api_key=settings.LMSTUDIO_API_KEY
+        api_key=settings.LMSTUDIO_API_KEY,
+        provider="lmstudio"
     )
 
 
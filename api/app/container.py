@@ -3,7 +3,15 @@ from app.embeddings.service import EmbeddingService
 from app.embeddings.factory import get_embedding_client
 from app.core.config import settings
 
-vector_store = VectorStore(dim=3072)
+vector_store = VectorStore(
+    dim=3072,
+    index_type=settings.VECTOR_STORE_INDEX,
+    path=settings.VECTOR_STORE_PATH,
+    nlist=settings.VECTOR_STORE_NLIST,
+    nprobe=settings.VECTOR_STORE_NPROBE,
+    hnsw_m=settings.VECTOR_STORE_HNSW_M,
+    ef_search=settings.VECTOR_STORE_EF_SEARCH,
+)
 
 embedding_client = get_embedding_client(settings.EMBEDDING_PROVIDER)
 embedding_service = EmbeddingService(
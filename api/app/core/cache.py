@@ -0,0 +1,98 @@
+import asyncio
+import json
+import zlib
+from typing import Iterable
+
+from app.core.config import settings
+from app.core.logging import logger
+from app.core.redis import redis_async_cache_client
+
+
+class AsyncRedisCache:
+    """
+    Non-blocking cache on top of redis.asyncio.
+
+    Every operation is bounded by `timeout`; Redis errors and timeouts
+    are logged and degrade to a miss / skipped write, so the cache never
+    fails or stalls the request it serves.
+    """
+
+    def __init__(self, client, timeout: float):
+        self.redis = client
+        self.timeout = timeout
+
+    async def _call(self, name: str, coro, default=None):
+        try:
+            return await asyncio.wait_for(coro, timeout=self.timeout)
+        except Exception as e:
+            logger.warning(f"Cache {name} failed: {e!r}")
+            return default
+
+    async def get(self, key: str) -> bytes | None:
+        return await self._call("get", self.redis.get(key))
+
+    async def get_many(self, keys: list[str]) -> list[bytes | None]:
+        if not keys:
+            return []
+        return await self._call(
+            "get_many",
+            self.redis.mget(keys),
+            default=[None] * len(keys)
+        )
+
+    async def set(self, key: str, value: bytes | str, ttl: int) -> None:
+        await self._call("set", self.redis.set(key, value, ex=ttl))
+
+    async def set_many(
+        self,
+        items: Iterable[tuple[str, bytes | str]],
+        ttl: int
+    ) -> None:
+        """Writes all items in one round-trip (pipeline, no MULTI)"""
+        pipe = self.redis.pipeline(transaction=False)
+        count = 0
+        for key, value in items:
+            pipe.set(key, value, ex=ttl)
+            count += 1
+        if count:
+            await self._call("set_many", pipe.execute())
+
+    async def delete(self, key: str) -> None:
+        await self._call("delete", self.redis.delete(key))
+
+
+cache = AsyncRedisCache(
+    redis_async_cache_client,
+    timeout=settings.CACHE_TIMEOUT
+)
+
+
+# ===== Value codec =====
+# b"c1:z" + zlib(json)  - compressed
+# b"c1:j" + json        - small values, compression doesn't pay off
+# no header             - legacy plain JSON
+CACHE_FORMAT = b"c1:"
+COMPRESS_MIN_BYTES = 512
+
+
+def encode_value(obj) -> bytes:
+    raw = json.dumps(obj, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+    if len(raw) < COMPRESS_MIN_BYTES:
+        return CACHE_FORMAT + b"j" + raw
+    return CACHE_FORMAT + b"z" + zlib.compress(raw, level=6)
+
+
+def decode_value(data: bytes | str | None):
+    if data is None:
+        return None
+    if isinstance(data, str):
+        data = data.encode("utf-8")
+
+    if data.startswith(CACHE_FORMAT):
+        header = len(CACHE_FORMAT)
+        kind, body = data[header:header + 1], data[header + 1:]
+        if kind == b"z":
+            body = zlib.decompress(body)
+        return json.loads(body)
+
+    return json.loads(data)
@@ -0,0 +1,69 @@
+import asyncio
+from contextlib import asynccontextmanager
+
+from app.core.config import settings
+
+
+class KeyedLimiter:
+    """
+    asyncio semaphores by key (provider, job type, ...), created on first use.
+
+    `limits` overrides `default` per key; default None = no limit
+    for keys without an explicit one.
+    """
+
+    def __init__(self, limits: dict[str, int], default: int | None):
+        self.limits = limits
+        self.default = default
+        self._semaphores: dict[str, asyncio.Semaphore | None] = {}
+
+    def get(self, key: str) -> asyncio.Semaphore | None:
+        if key not in self._semaphores:
+            limit = self.limits.get(key, self.default)
+            self._semaphores[key] = asyncio.Semaphore(limit) if limit else None
+        return self._semaphores[key]
+
+    def has_capacity(self, key: str) -> bool:
+        semaphore = self.get(key)
+        return semaphore is None or not semaphore.locked()
+
+    async def try_acquire(self, key: str) -> bool:
+        """Takes a slot only if one is free right now, never waits"""
+        if not self.has_capacity(key):
+            return False
+        semaphore = self.get(key)
+        if semaphore is not None:
+            await semaphore.acquire()  # free slot: returns without suspending
+        return True
+
+    def release(self, key: str):
+        semaphore = self.get(key)
+        if semaphore is not None:
+            semaphore.release()
+
+    @asynccontextmanager
+    async def slot(self, key: str):
+        semaphore = self.get(key)
+        if semaphore is None:
+            yield
+            return
+        async with semaphore:
+            yield
+
+
+class ProviderLimiter(KeyedLimiter):
+    """
+    Per-provider asyncio semaphores.
+
+    Caps how many calls to one upstream API are in flight in this process,
+    so a traffic spike queues here instead of hammering provider rate limits.
+    """
+
+    def __init__(self):
+        super().__init__(
+            settings.PROVIDER_MAX_CONCURRENCY,
+            settings.PROVIDER_DEFAULT_CONCURRENCY
+        )
+
+
+provider_limiter = ProviderLimiter()
@@ -0,0 +1,70 @@
+import importlib.util
+
+import httpx
+
+from app.core.config import settings
+from app.core.logging import logger
+
+# httpx needs the optional 'h2' package for HTTP/2
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+
+class HTTPClientPool:
+    """
+    Process-wide pool of httpx.AsyncClient, one per provider.
+
+    Clients keep connections alive between calls, so adapters don't pay
+    TCP/TLS setup on every generation. Opened on app / worker startup,
+    closed on shutdown.
+    """
+
+    def __init__(self):
+        self._clients: dict[str, httpx.AsyncClient] = {}
+
+    def _build_client(self, provider: str) -> httpx.AsyncClient:
+        max_connections = settings.HTTP_PROVIDER_MAX_CONNECTIONS.get(
+            provider,
+            settings.HTTP_MAX_CONNECTIONS
+        )
+        limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=min(
+                settings.HTTP_MAX_KEEPALIVE_CONNECTIONS,
+                max_connections
+            ),
+            keepalive_expiry=settings.HTTP_KEEPALIVE_EXPIRY,
+        )
+
+        http2 = settings.HTTP2_ENABLED and HTTP2_AVAILABLE
+        if settings.HTTP2_ENABLED and not HTTP2_AVAILABLE:
+            logger.warning("HTTP2_ENABLED is set but 'h2' is not installed")
+
+        return httpx.AsyncClient(
+            limits=limits,
+            http2=http2,
+            timeout=settings.LLM_TIMEOUT,
+        )
+
+    def get(self, provider: str) -> httpx.AsyncClient:
+        """Returns shared client for provider (created on first use)"""
+        client = self._clients.get(provider)
+        if client is None or client.is_closed:
+            client = self._build_client(provider)
+            self._clients[provider] = client
+        return client
+
+    async def startup(self, providers: list[str] | None = None):
+        """Pre-opens clients so the first request doesn't build them"""
+        for provider in providers or settings.HTTP_WARM_PROVIDERS:
+            self.get(provider)
+
+    async def aclose(self):
+        for provider, client in self._clients.items():
+            try:
+                await client.aclose()
+            except Exception as e:
+                logger.warning(f"Failed to close HTTP client '{provider}': {e}")
+        self._clients.clear()
+
+
+http_pool = HTTPClientPool()
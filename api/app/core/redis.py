@@ -15,3 +15,14 @@ redis_async_client = redis_async.Redis(
     db=settings.REDIS_DB,
     decode_responses=True
 )
+
+# Binary-safe client for cache values, with short socket timeouts:
+# a slow Redis must degrade to a cache miss, not stall the request
+redis_async_cache_client = redis_async.Redis(
+    host=settings.REDIS_HOST,
+    port=settings.REDIS_PORT,
+    db=settings.REDIS_DB,
+    decode_responses=False,
+    socket_timeout=settings.CACHE_SOCKET_TIMEOUT,
+    socket_connect_timeout=settings.CACHE_SOCKET_TIMEOUT
+)
@@ -0,0 +1,138 @@
+import asyncio
+from typing import Any, Awaitable, Callable
+from uuid import uuid4
+
+from app.core.config import settings
+from app.core.logging import logger
+from app.core.redis import redis_async_client
+
+# Deletes the lock only if we still own it, then wakes up waiting workers
+RELEASE_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    redis.call('DEL', KEYS[1])
+end
+redis.call('PUBLISH', KEYS[2], ARGV[1])
+return 1
+"""
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls with the same key into one execution.
+
+    - in-process: callers share one task and await its result
+    - cross-worker: a Redis lock (SET NX PX) elects one leader per key,
+      other workers wait for its pub/sub notification and then `load()`
+      the result the leader persisted (e.g. from cache)
+
+    If the leader fails or the wait times out, the follower runs `fn` itself.
+    """
+
+    LOCK_PREFIX = "singleflight:lock"
+    CHANNEL_PREFIX = "singleflight:done"
+
+    def __init__(self, redis, lock_ttl: float, wait_timeout: float):
+        self.redis = redis
+        self.lock_ttl = lock_ttl
+        self.wait_timeout = wait_timeout
+        self._inflight: dict[str, asyncio.Task] = {}
+        self._release = redis.register_script(RELEASE_SCRIPT)
+
+    async def do(
+        self,
+        key: str,
+        fn: Callable[[], Awaitable[Any]],
+        load: Callable[[], Awaitable[Any]] | None = None
+    ):
+        """
+        fn: produces (and persists) the result
+        load: reads a result persisted by another worker, None if missing;
+              without it coalescing is in-process only
+        """
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.create_task(self._run(key, fn, load))
+            self._inflight[key] = task
+            task.add_done_callback(lambda t: self._forget(key, t))
+        else:
+            logger.info(f"SingleFlight: joined in-flight call for '{key}'")
+
+        # shield: a cancelled caller must not cancel the shared call
+        return await asyncio.shield(task)
+
+    def _forget(self, key: str, task: asyncio.Task):
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        # mark exception as retrieved even if every caller went away
+        if not task.cancelled():
+            task.exception()
+
+    async def _run(self, key: str, fn, load):
+        if load is None:
+            return await fn()
+
+        lock_key = f"{self.LOCK_PREFIX}:{key}"
+        channel = f"{self.CHANNEL_PREFIX}:{key}"
+        token = uuid4().hex
+
+        try:
+            acquired = await self.redis.set(
+                lock_key, token, nx=True, px=int(self.lock_ttl * 1000)
+            )
+        except Exception as e:
+            logger.warning(f"SingleFlight: lock unavailable, running locally: {e!r}")
+            return await fn()
+
+        if acquired:
+            try:
+                return await fn()
+            finally:
+                try:
+                    await self._release(keys=[lock_key, channel], args=[token])
+                except Exception as e:
+                    logger.warning(f"SingleFlight: lock release failed: {e!r}")
+
+        return await self._follow(channel, fn, load)
+
+    async def _follow(self, channel: str, fn, load):
+        loop = asyncio.get_running_loop()
+        pubsub = self.redis.pubsub()
+        try:
+            await pubsub.subscribe(channel)
+
+            # the leader may have finished before we subscribed
+            result = await load()
+            if result is not None:
+                return result
+
+            deadline = loop.time() + self.wait_timeout
+            while (remaining := deadline - loop.time()) > 0:
+                message = await pubsub.get_message(
+                    ignore_subscribe_messages=True,
+                    timeout=remaining
+                )
+                if message is not None:
+                    break
+        except Exception as e:
+            logger.warning(f"SingleFlight: waiting for leader failed: {e!r}")
+        finally:
+            try:
+                await pubsub.unsubscribe(channel)
+                await pubsub.aclose()
+            except Exception:
+                pass
+
+        result = await load()
+        if result is not None:
+            logger.info("SingleFlight: result received from another worker")
+            return result
+
+        logger.info("SingleFlight: leader produced no result, running locally")
+        return await fn()
+
+
+singleflight = SingleFlight(
+    redis_async_client,
+    lock_ttl=settings.SINGLEFLIGHT_LOCK_TTL,
+    wait_timeout=settings.SINGLEFLIGHT_WAIT_TIMEOUT
+)
@@ -0,0 +1,7 @@
+import json
+
+
+def format_sse(event: str, data) -> str:
+    """Server-Sent Events frame: named event + JSON data"""
+    payload = json.dumps(data, ensure_ascii=False, default=str)
+    return f"event: {event}\ndata: {payload}\n\n"
@@ -1,18 +1,28 @@
 import contextlib
+from collections import OrderedDict
+from functools import lru_cache
 
+import tiktoken
 from fastapi import Request
 
+from app.core.config import settings
+from app.core.logging import logger
+
+# used for models tiktoken doesn't know (Gemini, local models)
+DEFAULT_ENCODING = "cl100k_base"
+
 
 @contextlib.contextmanager
-def track_tokens(obj, name: str, text: str):
+def track_tokens(obj, name: str, text: str, model: str | None = None):
     """
     Universal token counter
 
     obj: req or res
     name: req or res name, key "{name}_tokens"
     text: text to count tokens for
+    model: model the text is sent to (picks the tokenizer)
     """
-    tokens = count_tokens(text)
+    tokens = count_tokens(text, model=model)
 
     try:
         yield
@@ -31,7 +41,75 @@ def track_tokens(obj, name: str, text: str):
             raise TypeError("track_tokens expects Request or dict")
 
 
-def count_tokens(text: str) -> int:
+class TokenCounter:
+    """
+    Token counter for one encoding.
+
+    OpenAI-family models get their exact tiktoken encoding; other models
+    (Gemini, local ones) are approximated with cl100k_base, which is much
+    closer than a chars/4 rule for non-English text. If the encoding can't
+    be loaded at all, falls back to the chars/4 heuristic.
+    Counts are memoized (LRU), repeated strings are not re-encoded.
+    """
+
+    def __init__(self, encoding_name: str | None, cache_size: int):
+        self.encoding_name = encoding_name
+        self.encoding = None
+        if encoding_name:
+            try:
+                self.encoding = tiktoken.get_encoding(encoding_name)
+            except Exception as e:
+                logger.warning(
+                    f"Tokenizer '{encoding_name}' unavailable, "
+                    f"using approximate counts: {e!r}"
+                )
+        self.cache_size = cache_size
+        self._memo: OrderedDict[str, int] = OrderedDict()
+
+    @property
+    def exact(self) -> bool:
+        return self.encoding is not None
+
+    def _cached(self, text: str) -> int | None:
+        tokens = self._memo.get(text)
+        if tokens is not None:
+            self._memo.move_to_end(text)
+        return tokens
+
+    def _remember(self, text: str, tokens: int):
+        self._memo[text] = tokens
+        if len(self._memo) > self.cache_size:
+            self._memo.popitem(last=False)
+
+    def count(self, text: str) -> int:
+        if not text:
+            return 0
+        tokens = self._cached(text)
+        if tokens is None:
+            if self.encoding is None:
+                tokens = approximate_tokens(text)
+            else:
+                tokens = len(self.encoding.encode_ordinary(text))
+            self._remember(text, tokens)
+        return tokens
+
+    def count_batch(self, texts: list[str]) -> list[int]:
+        """Encodes the not yet cached texts in one (multi-threaded) tiktoken call"""
+        if self.encoding is None:
+            return [self.count(t) for t in texts]
+
+        missing = list(dict.fromkeys(
+            t for t in texts if t and self._cached(t) is None
+        ))
+        if missing:
+            encoded = self.encoding.encode_ordinary_batch(missing)
+            for text, tokens in zip(missing, encoded):
+                self._remember(text, len(tokens))
+
+        return [self.count(t) for t in texts]
+
+
+def approximate_tokens(text: str) -> int:
     """
     Approximate token counter.
     1 token ~= 3–4 characters (latin) or ~1–2 words.
@@ -41,3 +119,31 @@ def count_tokens(text: str) -> int:
 
     # rude but stable evristic
     return max(1, len(text) // 4)
+
+
+@lru_cache(maxsize=None)
+def _encoding_name(model: str | None) -> str:
+    if model:
+        try:
+            return tiktoken.encoding_name_for_model(model)
+        except KeyError:
+            pass
+    return DEFAULT_ENCODING
+
+
+@lru_cache(maxsize=None)
+def _counter(encoding_name: str) -> TokenCounter:
+    return TokenCounter(encoding_name, cache_size=settings.TOKEN_COUNT_CACHE_SIZE)
+
+
+def get_token_counter(model: str | None = None) -> TokenCounter:
+    """Shared counter for a model (exact for OpenAI-family models)"""
+    return _counter(_encoding_name(model))
+
+
+def count_tokens(text: str, model: str | None = None) -> int:
+    return get_token_counter(model).count(text)
+
+
+def count_tokens_batch(texts: list[str], model: str | None = None) -> list[int]:
+    return get_token_counter(model).count_batch(texts)
@@ -0,0 +1,116 @@
+import asyncio
+from typing import List
+
+from app.core.config import settings
+from app.core.logging import logger
+from app.core.tokens import count_tokens_batch
+from .clients.base.embedding_client import EmbeddingClient
+
+
+class EmbeddingBatcher(EmbeddingClient):
+    """
+    Async micro-batcher in front of an EmbeddingClient.
+
+    Concurrent embed() calls are queued per text and flushed as one
+    upstream request after `max_wait` seconds, or right away once the
+    batch reaches `max_batch_size` texts / `max_batch_tokens` tokens.
+    Results (or the upstream error) are fanned back out to the callers.
+    """
+
+    def __init__(
+        self,
+        client: EmbeddingClient,
+        max_batch_size: int,
+        max_batch_tokens: int,
+        max_wait: float,
+    ):
+        self.client = client
+        self.model = getattr(client, "model", None)
+        self.max_batch_size = max_batch_size
+        self.max_batch_tokens = max_batch_tokens
+        self.max_wait = max_wait
+
+        self._pending: list[tuple[str, int, asyncio.Future]] = []
+        self._pending_tokens = 0
+        self._timer: asyncio.TimerHandle | None = None
+        self._tasks: set[asyncio.Task] = set()
+
+    async def embed(self, texts: List[str]) -> List[List[float]]:
+        if not texts:
+            return []
+
+        loop = asyncio.get_running_loop()
+        futures = []
+        for text, tokens in zip(texts, count_tokens_batch(texts, model=self.model)):
+            future = loop.create_future()
+            self._add(text, tokens, future)
+            futures.append(future)
+
+        results = await asyncio.gather(*futures, return_exceptions=True)
+        for result in results:
+            if isinstance(result, BaseException):
+                raise result
+        return list(results)
+
+    def _add(self, text: str, tokens: int, future: asyncio.Future):
+        # flush first if this text would overflow the token budget
+        if self._pending and self._pending_tokens + tokens > self.max_batch_tokens:
+            self._flush()
+
+        self._pending.append((text, tokens, future))
+        self._pending_tokens += tokens
+
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._timer is None:
+            loop = asyncio.get_running_loop()
+            self._timer = loop.call_later(self.max_wait, self._flush)
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        batch = self._pending
+        self._pending = []
+        self._pending_tokens = 0
+        if not batch:
+            return
+
+        task = asyncio.create_task(self._run(batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch: list[tuple[str, int, asyncio.Future]]):
+        texts = [text for text, _, _ in batch]
+        try:
+            vectors = await self.client.embed(texts)
+            if len(vectors) != len(texts):
+                raise ValueError(
+                    f"Embedding provider returned {len(vectors)} vectors "
+                    f"for {len(texts)} texts"
+                )
+        except asyncio.CancelledError:
+            # e.g. loop shutdown: callers must not wait forever
+            for _, _, future in batch:
+                future.cancel()
+            raise
+        except Exception as e:
+            logger.warning(f"Embedding batch of {len(texts)} failed: {e!r}")
+            for _, _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for (_, _, future), vector in zip(batch, vectors):
+            if not future.done():
+                future.set_result(vector)
+
+
+def build_batcher(client: EmbeddingClient, provider: str) -> EmbeddingBatcher:
+    return EmbeddingBatcher(
+        client,
+        max_batch_size=settings.EMBEDDING_BATCH_MAX_SIZE.get(provider, 64),
+        max_batch_tokens=settings.EMBEDDING_BATCH_MAX_TOKENS.get(provider, 8192),
+        max_wait=settings.EMBEDDING_BATCH_WAIT_MS / 1000,
+    )
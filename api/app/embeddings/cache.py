@@ -0,0 +1,120 @@
+import hashlib
+import time
+from collections import OrderedDict
+from typing import List
+
+import numpy as np
+
+from app.core.cache import AsyncRedisCache, cache as redis_cache
+from app.core.config import settings
+from .clients.base.embedding_client import EmbeddingClient
+
+EMBEDDING_CACHE_VERSION = "v1"
+
+
+def embedding_key(provider: str, model: str, text: str) -> str:
+    digest = hashlib.sha256(text.encode("utf-8")).hexdigest()
+    return f"emb:{EMBEDDING_CACHE_VERSION}:{provider}:{model}:{digest}"
+
+
+def encode_vector(vector: List[float]) -> bytes:
+    return np.asarray(vector, dtype=np.float32).tobytes()
+
+
+def decode_vector(data: bytes) -> np.ndarray:
+    return np.frombuffer(data, dtype=np.float32)
+
+
+class LocalLRUCache:
+    """Small in-process LRU with per-entry TTL (not thread-safe, event loop only)"""
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: OrderedDict[str, tuple[float, np.ndarray]] = OrderedDict()
+
+    def get(self, key: str) -> np.ndarray | None:
+        item = self._data.get(key)
+        if item is None:
+            return None
+        expires_at, value = item
+        if expires_at < time.monotonic():
+            del self._data[key]
+            return None
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key: str, value: np.ndarray) -> None:
+        if self.maxsize <= 0:
+            return
+        self._data[key] = (time.monotonic() + self.ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+
+class CachedEmbeddingClient(EmbeddingClient):
+    """
+    Content-addressed cache in front of any EmbeddingClient.
+
+    Lookup order: in-process LRU -> Redis (one MGET) -> provider, which is
+    called once with only the missing, de-duplicated texts. Vectors are
+    stored as raw float32 bytes under emb:v1:{provider}:{model}:{sha256}.
+    """
+
+    def __init__(
+        self,
+        client: EmbeddingClient,
+        provider: str,
+        model: str,
+        redis: AsyncRedisCache = redis_cache,
+        ttl: int = settings.EMBEDDING_CACHE_TTL,
+        local: LocalLRUCache | None = None,
+    ):
+        self.client = client
+        self.provider = provider
+        self.model = model
+        self.redis = redis
+        self.ttl = ttl
+        self.local = local or LocalLRUCache(
+            maxsize=settings.EMBEDDING_CACHE_LOCAL_SIZE,
+            ttl=settings.EMBEDDING_CACHE_LOCAL_TTL
+        )
+
+    async def embed(self, texts: List[str]) -> List[List[float]]:
+        keys = [embedding_key(self.provider, self.model, t) for t in texts]
+        found: dict[str, np.ndarray] = {}
+
+        # 1. in-process
+        for key in keys:
+            vector = self.local.get(key)
+            if vector is not None:
+                found[key] = vector
+
+        # 2. Redis
+        remote_keys = list(dict.fromkeys(k for k in keys if k not in found))
+        if remote_keys:
+            values = await self.redis.get_many(remote_keys)
+            for key, data in zip(remote_keys, values):
+                if data:
+                    vector = decode_vector(data)
+                    found[key] = vector
+                    self.local.set(key, vector)
+
+        # 3. provider, only for what is still missing
+        missing: dict[str, str] = {}
+        for key, text in zip(keys, texts):
+            if key not in found:
+                missing.setdefault(key, text)
+
+        if missing:
+            vectors = await self.client.embed(list(missing.values()))
+            to_store = []
+            for key, vector in zip(missing, vectors):
+                array = np.asarray(vector, dtype=np.float32)
+                found[key] = array
+                self.local.set(key, array)
+                to_store.append((key, encode_vector(array)))
+            await self.redis.set_many(to_store, ttl=self.ttl)
+
+        return [found[key].tolist() for key in keys]
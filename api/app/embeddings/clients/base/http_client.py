@@ -1,11 +1,17 @@
-import httpx
 from typing import Optional, Dict
+from app.core.http import http_pool
 
 
 class BaseHTTPClient:
-    def __init__(self, base_url: str, api_key: Optional[str] = None):
+    def __init__(
+        self,
+        base_url: str,
+        api_key: Optional[str] = None,
+        provider: str = "default"
+    ):
         self.base_url = base_url.rstrip("/")
         self.api_key = api_key
+        self.provider = provider
 
     def _get_headers(self) -> Dict[str, str]:
         headers = {
@@ -18,30 +24,32 @@ class BaseHTTPClient:
         return headers
 
     async def _get(self, endpoint: str, timeout: float):
-        async with httpx.AsyncClient(timeout=timeout) as client:
-            response = await client.get(
-                f"{self.base_url}{endpoint}",
-                headers=self._get_headers()
+        client = http_pool.get(self.provider)
+        response = await client.get(
+            f"{self.base_url}{endpoint}",
+            headers=self._get_headers(),
+            timeout=timeout
+        )
+
+        if response.status_code >= 400:
+            raise RuntimeError(
+                f"HTTP {response.status_code}: {response.text}"
             )
 
-            if response.status_code >= 400:
-                raise RuntimeError(
-                    f"HTTP {response.status_code}: {response.text}"
-                )
-
-            return response
+        return response
 
     async def _post(self, endpoint: str, json_payload: dict, timeout: float):
-        async with httpx.AsyncClient(timeout=timeout) as client:
-            response = await client.post(
-                f"{self.base_url}{endpoint}",
-                json=json_payload,
-                headers=self._get_headers()
+        client = http_pool.get(self.provider)
+        response = await client.post(
+            f"{self.base_url}{endpoint}",
+            json=json_payload,
+            headers=self._get_headers(),
+            timeout=timeout
+        )
+
+        if response.status_code >= 400:
+            raise RuntimeError(
+                f"HTTP {response.status_code}: {response.text}"
             )
 
-            if response.status_code >= 400:
-                raise RuntimeError(
-                    f"HTTP {response.status_code}: {response.text}"
-                )
-
-            return response
+        return response
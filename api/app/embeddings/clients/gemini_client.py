@@ -1,24 +1,22 @@
 from typing import List
 from .base.embedding_client import EmbeddingClient
 from google import genai
-import asyncio
+from app.core.concurrency import provider_limiter
+from app.core.config import settings
 
 
 class GeminiEmbeddedClient(EmbeddingClient):
     def __init__(self, model: str = "gemini-embedding-001"):
         self.model = model
-        self.client = genai.Client()
+        self.client = genai.Client(api_key=settings.GEMINI_API_KEY)
 
     async def embed(self, texts: List[str]) -> List[List[float]]:
-        # Gemini SDK is sync -> wrap in thread executor
-        return await asyncio.to_thread(self._sync_embed, texts)
-
-    def _sync_embed(self, texts: List[str]) -> List[List[float]]:
-        # here we actually call the Gemini SDK
-        result = self.client.models.embed_content(
-            model=self.model,
-            contents=texts
-        )
+        # native async surface of the SDK, no executor thread
+        async with provider_limiter.slot("gemini:embed"):
+            result = await self.client.aio.models.embed_content(
+                model=self.model,
+                contents=texts
+            )
 
         # unwrap Gemini embeddings
         embeddings: list[list[float]] = []
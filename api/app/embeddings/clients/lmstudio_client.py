@@ -1,4 +1,4 @@
-from typing import Dict, Any, List, Optional
+from typing import List, Optional
 
 from .base.http_client import BaseHTTPClient
 from .base.embedding_client import EmbeddingClient
@@ -7,13 +7,13 @@ from .base.embedding_client import EmbeddingClient
 class LMStudioEmbeddingClient(EmbeddingClient, BaseHTTPClient):
 
     def __init__(self, base_url: str, model: str, api_key: Optional[str] = None):
-        BaseHTTPClient.__init__(self, base_url, api_key)
-        self.model_name = model
+        BaseHTTPClient.__init__(self, base_url, api_key, provider="lmstudio")
+        self.model = model
 
-    async def embed(self, texts: List[str]) -> Dict[str, Any]:
+    async def embed(self, texts: List[str]) -> List[List[float]]:
 
         payload = {
-            "model": self.model_name,
+            "model": self.model,
             "input": texts
         }
 
@@ -25,8 +25,6 @@ class LMStudioEmbeddingClient(EmbeddingClient, BaseHTTPClient):
 
         data = response.json()
 
-        return {
-            "embeddings": [d["embedding"] for d in data["data"]],
-            "provider": "lmstudio",
-            "usage": data.get("usage")
-        }
+        # keep input order, the server may return items out of order
+        items = sorted(data["data"], key=lambda d: d.get("index", 0))
+        return [d["embedding"] for d in items]
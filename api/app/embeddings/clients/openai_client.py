@@ -1,23 +1,20 @@
 from typing import List
 from .base.embedding_client import EmbeddingClient
-from openai import OpenAI
-import asyncio
+from openai import AsyncOpenAI
+from app.core.concurrency import provider_limiter
+from app.core.config import settings
 
 
 class OpenAIEmbeddingClient(EmbeddingClient):
     def __init__(self, model: str = "text-embedding-3-small"):
         self.model = model
-        self.client = OpenAI()  # автоматически берёт OPENAI_API_KEY из env
+        # api_key=None -> SDK takes OPENAI_API_KEY from env
+        self.client = AsyncOpenAI(api_key=settings.OPENAI_API_KEY)
 
     async def embed(self, texts: List[str]) -> List[List[float]]:
-        # OpenAI SDK сейчас синхронный → оборачиваем в executor
-        loop = asyncio.get_event_loop()
-
-        def sync_call():
-            resp = self.client.embeddings.create(
+        async with provider_limiter.slot("openai:embed"):
+            resp = await self.client.embeddings.create(
                 model=self.model,
                 input=texts
             )
-            return [d.embedding for d in resp.data]
-
-        return await loop.run_in_executor(None, sync_call)
+        return [d.embedding for d in resp.data]
@@ -1,14 +1,39 @@
+from functools import lru_cache
+
+from app.core.config import settings
+from app.embeddings.batcher import build_batcher
+from app.embeddings.cache import CachedEmbeddingClient
 from app.embeddings.clients.openai_client import OpenAIEmbeddingClient
 from app.embeddings.clients.gemini_client import GeminiEmbeddedClient
 from app.embeddings.clients.lmstudio_client import LMStudioEmbeddingClient
 
 
-def get_embedding_client(provider: str):
+def _build_embedding_client(provider: str):
+    model = settings.EMBEDDING_MODELS.get(provider)
     if provider == "openai":
-        return OpenAIEmbeddingClient()
+        return OpenAIEmbeddingClient(model=model)
     if provider == "gemini":
-        return GeminiEmbeddedClient()
+        return GeminiEmbeddedClient(model=model)
     if provider == "lmstudio":
-        return LMStudioEmbeddingClient()
+        return LMStudioEmbeddingClient(
+            base_url=settings.LMSTUDIO_BASE_URL,
+            model=model,
+            api_key=settings.LMSTUDIO_API_KEY
+        )
     else:
         raise ValueError(f"Unknown embedding provider: '{provider}'")
+
+
+@lru_cache(maxsize=None)
+def get_embedding_client(provider: str):
+    """
+    One shared client per provider:
+    cache -> micro-batcher -> provider client
+    """
+    client = _build_embedding_client(provider)
+    model = client.model
+    if settings.EMBEDDING_BATCH_ENABLED:
+        client = build_batcher(client, provider)
+    if settings.EMBEDDING_CACHE_ENABLED:
+        client = CachedEmbeddingClient(client, provider=provider, model=model)
+    return client
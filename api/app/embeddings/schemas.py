@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from typing import List
 
 
@@ -12,4 +12,9 @@ class EmbedResponse(BaseModel):
 
 class SimilarityResult(BaseModel):
     document: str   # document text
-    score: float    # cosine similarity
+    score: float    # cosine similarity (RRF score for hybrid search)
+    id: str | None = None   # chunk id (same in Qdrant and PG)
+    document_id: str | None = None
+    chunk_index: int | None = None
+    # only for context assembly (MMR), never serialized
+    vector: List[float] | None = Field(default=None, exclude=True)
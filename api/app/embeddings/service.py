@@ -28,18 +28,21 @@ class EmbeddingService:
         query: str,
         top_k: int = 5,
         request: Optional[Request] = None,
+        with_vectors: bool = False,
     ) -> List[SimilarityResult]:
         """Finging top-k similar docs via Qdrant"""
 
-        query_vector = await self.embed(query)
-
         query_vector = await self.embed(query, request=request)
 
         if request:
             with track_timing(request, "vector_search"):
-                hits = qdrant_search(query_vector=query_vector, limit=top_k)
+                hits = await qdrant_search(
+                    query_vector=query_vector, limit=top_k, with_vectors=with_vectors
+                )
         else:
-            hits = qdrant_search(query_vector=query_vector, limit=top_k)
+            hits = await qdrant_search(
+                query_vector=query_vector, limit=top_k, with_vectors=with_vectors
+            )
 
         results = []
         for hit in hits:
@@ -47,6 +50,10 @@ class EmbeddingService:
                 SimilarityResult(
                     document=hit.get("content", ""),
                     score=hit.get("score", 0.0),
+                    id=str(hit["id"]),
+                    document_id=hit.get("document_id"),
+                    chunk_index=hit.get("chunk_index"),
+                    vector=hit.get("vector") if with_vectors else None,
                 )
             )
 
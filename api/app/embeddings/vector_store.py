@@ -1,49 +1,301 @@
+import asyncio
+import json
+import os
+import threading
+from typing import List, Optional, Tuple
+
 import faiss
 import numpy as np
-from typing import List
+
+INDEX_FILE = "index.faiss"
+META_FILE = "meta.json"
+
+# FAISS recommends ~39 training points per IVF list
+IVF_TRAIN_POINTS_PER_LIST = 39
+# HNSW can't delete: removed ids are skipped in search until compaction
+HNSW_COMPACT_RATIO = 0.2
 
 
 class VectorStore:
-    def __init__(self, dim: int):
+    """
+    Local FAISS index (cosine similarity) with external string ids.
+
+    Demo / sample index of the API process (VECTOR_SEARCH_BACKEND=faiss):
+    ingested documents go to Qdrant only. Ingestion runs in the workers,
+    this index lives in each API process, so it isn't fed from there.
+
+    index_type:
+      "flat" - exact search (IndexFlatIP), fine up to ~100k vectors
+      "ivf"  - IndexIVFFlat; vectors stay in an exact index until there
+               are enough of them to train `nlist` lists, then it's built
+      "hnsw" - IndexHNSWFlat; replaced vectors are tombstones, compacted later
+
+    Persisted to `path` (index + JSON metadata), loaded memory-mapped
+    for fast cold starts; the first write after an mmap load reads the
+    index fully into memory. All index access is behind one lock;
+    asearch / asave / aload run in a thread, off the event loop.
+    """
+
+    def __init__(
+        self,
+        dim: int,
+        index_type: str = "flat",
+        path: Optional[str] = None,
+        nlist: int = 256,
+        nprobe: int = 16,
+        hnsw_m: int = 32,
+        ef_search: int = 64,
+    ):
+        if index_type not in ("flat", "ivf", "hnsw"):
+            raise ValueError(f"Unknown index type '{index_type}'")
         self.dim = dim
-        self.index = None
-        self.documents: List[str] = []
+        self.index_type = index_type
+        self.path = path
+        self.nlist = nlist
+        self.nprobe = nprobe
+        self.hnsw_m = hnsw_m
+        self.ef_search = ef_search
+
+        self._lock = threading.RLock()
+        self._mmapped = False
+        self.dirty = False
+        self._reset()
+
+    # ---------- index construction ----------
+
+    def _reset(self):
+        self.index = self._new_index(trained=False)
+        self.trained = self.index_type != "ivf"
+        self.next_id = 0
+        self.ids: dict[str, int] = {}  # external id -> faiss id
+        self.documents: dict[int, Tuple[str, str]] = {}  # faiss id -> (external id, text)
+        self.deleted: set[int] = set()  # HNSW tombstones
+
+    def _new_index(self, trained: bool) -> faiss.Index:
+        if self.index_type == "hnsw":
+            base = faiss.IndexHNSWFlat(self.dim, self.hnsw_m, faiss.METRIC_INNER_PRODUCT)
+            base.hnsw.efSearch = self.ef_search
+            return faiss.IndexIDMap2(base)
+        if self.index_type == "ivf" and trained:
+            quantizer = faiss.IndexFlatIP(self.dim)
+            index = faiss.IndexIVFFlat(
+                quantizer, self.dim, self.nlist, faiss.METRIC_INNER_PRODUCT
+            )
+            index.nprobe = self.nprobe
+            return index
+        return faiss.IndexIDMap2(faiss.IndexFlatIP(self.dim))
+
+    def _vectors(self) -> Tuple[np.ndarray, np.ndarray]:
+        """(ids, vectors) currently stored, for retraining / compaction"""
+        ids = np.array(
+            [i for i in self.documents if i not in self.deleted], dtype=np.int64
+        )
+        vectors = np.vstack([self.index.reconstruct(int(i)) for i in ids]) if len(ids) \
+            else np.zeros((0, self.dim), dtype=np.float32)
+        return ids, vectors
+
+    def _maybe_train_ivf(self):
+        if self.trained or self.index.ntotal < self.nlist * IVF_TRAIN_POINTS_PER_LIST:
+            return
+        ids, vectors = self._vectors()
+        index = self._new_index(trained=True)
+        index.train(vectors)
+        index.add_with_ids(vectors, ids)
+        self.index = index
+        self.trained = True
+
+    def _maybe_compact(self):
+        if not self.deleted or len(self.deleted) < HNSW_COMPACT_RATIO * self.index.ntotal:
+            return
+        ids, vectors = self._vectors()
+        index = self._new_index(trained=True)
+        if len(ids):
+            index.add_with_ids(vectors, ids)
+        for i in self.deleted:
+            self.documents.pop(i, None)
+        self.deleted.clear()
+        self.index = index
+
+    def _writable(self):
+        """mmapped indexes (IVF especially) are read-only on disk"""
+        if self._mmapped:
+            self.index = faiss.read_index(os.path.join(self.path, INDEX_FILE))
+            self._mmapped = False
+
+    def _prepare(self, vectors: List[List[float]]) -> np.ndarray:
+        array = np.array(vectors, dtype=np.float32)
+        if array.ndim != 2 or array.shape[1] != self.dim:
+            raise ValueError(
+                f"Embeddings dimension {array.shape[-1]} "
+                f"does not match index dimension {self.dim}"
+            )
+        # normalized vectors: inner product = cosine similarity
+        faiss.normalize_L2(array)
+        return array
+
+    # ---------- writes ----------
+
+    def add(self, ids: List[str], embeddings: List[List[float]], documents: List[str]):
+        """Adds or replaces vectors by external id"""
+        if not (len(ids) == len(embeddings) == len(documents)):
+            raise ValueError("ids, embeddings and documents must have the same length")
+        if not ids:
+            return
+        vectors = self._prepare(embeddings)
+
+        with self._lock:
+            self._writable()
+            self._remove([i for i in ids if i in self.ids])
+
+            faiss_ids = np.arange(self.next_id, self.next_id + len(ids), dtype=np.int64)
+            self.next_id += len(ids)
+            self.index.add_with_ids(vectors, faiss_ids)
+            for ext_id, faiss_id, document in zip(ids, faiss_ids, documents):
+                self.ids[ext_id] = int(faiss_id)
+                self.documents[int(faiss_id)] = (ext_id, document)
+
+            self._maybe_train_ivf()
+            self.dirty = True
+
+    def _remove(self, ids: List[str]) -> int:
+        faiss_ids = [self.ids.pop(i) for i in ids if i in self.ids]
+        if not faiss_ids:
+            return 0
+        if self.index_type == "hnsw":
+            self.deleted.update(faiss_ids)
+            self._maybe_compact()
+        else:
+            self.index.remove_ids(np.array(faiss_ids, dtype=np.int64))
+            for i in faiss_ids:
+                self.documents.pop(i, None)
+        return len(faiss_ids)
 
     def build(self, embeddings: List[List[float]], documents: List[str]):
+        """Replaces the whole index (ids are the document positions)"""
         if not embeddings:
             raise ValueError("Embeddings list is empty")
         if len(embeddings) != len(documents):
             raise ValueError("Number of embeddings must match number of documents")
+        with self._lock:
+            self._mmapped = False
+            self._reset()
+            self.add([str(i) for i in range(len(documents))], embeddings, documents)
 
-        # Преобразуем в numpy и проверим размерность
-        vectors = np.array(embeddings, dtype=np.float32)
-        if vectors.shape[1] != self.dim:
-            raise ValueError(
-                f"Embeddings dimension {vectors.shape[1]}"
-                f"does not match index dimension {self.dim}"
-            )
+    # ---------- search ----------
+
+    def __len__(self) -> int:
+        return len(self.ids)
 
-        # Нормализуем L2 (для cosine similarity)
-        faiss.normalize_L2(vectors)
+    def search(self, query_embedding: List[float], k: int) -> List[Tuple[str, float]]:
+        hits = self.search_with_ids(query_embedding, k)
+        return [(doc, score) for _, doc, score in hits]
 
-        # Создаём индекс FAISS
-        self.index = faiss.IndexFlatIP(self.dim)
-        self.index.add(vectors)
+    def search_with_ids(
+        self,
+        query_embedding: List[float],
+        k: int
+    ) -> List[Tuple[str, str, float]]:
+        """(external id, document, score) of the top-k"""
+        query = self._prepare([query_embedding])
 
-        # Сохраняем документы
-        self.documents = documents.copy()
+        with self._lock:
+            if not self.ids:
+                return []
+            # over-fetch past tombstones
+            fetch = min(k + len(self.deleted), self.index.ntotal)
+            scores, indices = self.index.search(query, fetch)
+
+            results = []
+            for faiss_id, score in zip(indices[0], scores[0]):
+                if faiss_id < 0 or faiss_id in self.deleted:
+                    continue
+                ext_id, document = self.documents[int(faiss_id)]
+                results.append((ext_id, document, float(score)))
+                if len(results) == k:
+                    break
+            return results
+
+    async def asearch(
+        self,
+        query_embedding: List[float],
+        k: int
+    ) -> List[Tuple[str, float]]:
+        return await asyncio.to_thread(self.search, query_embedding, k)
+
+    # ---------- persistence ----------
+
+    def save(self, path: Optional[str] = None):
+        """Index + metadata, each written to a temp file and renamed in place"""
+        path = path or self.path
+        if not path:
+            raise ValueError("No path to save the vector store to")
+        os.makedirs(path, exist_ok=True)
+
+        with self._lock:
+            meta = {
+                "dim": self.dim,
+                "index_type": self.index_type,
+                "trained": self.trained,
+                "next_id": self.next_id,
+                "documents": {
+                    str(i): [ext_id, doc] for i, (ext_id, doc) in self.documents.items()
+                },
+                "deleted": sorted(self.deleted),
+            }
+            index_tmp = os.path.join(path, INDEX_FILE + ".tmp")
+            faiss.write_index(self.index, index_tmp)
+            meta_tmp = os.path.join(path, META_FILE + ".tmp")
+            with open(meta_tmp, "w", encoding="utf-8") as f:
+                json.dump(meta, f, ensure_ascii=False)
+
+            # an mmapped index keeps its old inode, renaming over it is safe
+            os.replace(index_tmp, os.path.join(path, INDEX_FILE))
+            os.replace(meta_tmp, os.path.join(path, META_FILE))
+            self.path = path
+            self.dirty = False
+
+    def load(self, path: Optional[str] = None, mmap: bool = True) -> bool:
+        """Loads a saved index; False if there is none at `path`"""
+        path = path or self.path
+        index_file = os.path.join(path, INDEX_FILE) if path else None
+        if not index_file or not os.path.exists(index_file):
+            return False
+
+        with open(os.path.join(path, META_FILE), encoding="utf-8") as f:
+            meta = json.load(f)
+        if meta["dim"] != self.dim or meta["index_type"] != self.index_type:
+            raise ValueError(
+                f"Stored index ({meta['index_type']}, dim {meta['dim']}) doesn't match "
+                f"the configured one ({self.index_type}, dim {self.dim})"
+            )
 
-    def search(self, query_embedding: List[float], k: int):
-        if self.index is None:
-            raise ValueError("Vector index is empty. Call build() first.")
+        flags = faiss.IO_FLAG_MMAP | faiss.IO_FLAG_READ_ONLY if mmap else 0
+        index = faiss.read_index(index_file, flags)
+        if isinstance(index, faiss.IndexIVF):
+            index.nprobe = self.nprobe
+        elif self.index_type == "hnsw":
+            faiss.downcast_index(index.index).hnsw.efSearch = self.ef_search
 
-        query = np.array([query_embedding], dtype=np.float32)
-        faiss.normalize_L2(query)
+        with self._lock:
+            self.index = index
+            self._mmapped = mmap
+            self.trained = meta["trained"]
+            self.next_id = meta["next_id"]
+            self.documents = {
+                int(i): (ext_id, doc) for i, (ext_id, doc) in meta["documents"].items()
+            }
+            self.deleted = set(meta["deleted"])
+            self.ids = {
+                ext_id: i
+                for i, (ext_id, _) in self.documents.items()
+                if i not in self.deleted
+            }
+            self.path = path
+            self.dirty = False
+        return True
 
-        scores, indices = self.index.search(query, k)
+    async def asave(self, path: Optional[str] = None):
+        await asyncio.to_thread(self.save, path)
 
-        results = []
-        for pos, i in enumerate(indices[0]):
-            if i < len(self.documents):
-                results.append((self.documents[i], float(scores[0][pos])))
-        return results
+    async def aload(self, path: Optional[str] = None, mmap: bool = True) -> bool:
+        return await asyncio.to_thread(self.load, path, mmap)
@@ -0,0 +1,169 @@
+import asyncio
+import hashlib
+import hmac
+import ipaddress
+import json
+import socket
+import time
+from urllib.parse import urlparse
+
+import httpx
+
+from app.core.config import settings
+from app.core.logging import logger
+
+# retried: network errors, 5xx and these
+RETRY_STATUSES = {408, 425, 429}
+
+
+async def _resolve(host: str, port: int) -> list:
+    infos = await asyncio.get_running_loop().getaddrinfo(
+        host, port, type=socket.SOCK_STREAM
+    )
+    return [ipaddress.ip_address(info[4][0].split("%")[0]) for info in infos]
+
+
+async def check_callback_url(url: str) -> tuple[str | None, str | None]:
+    """
+    (error, address): why a callback can't go to `url`, or the address
+    it was checked against (None for CALLBACK_ALLOWED_HOSTS hosts).
+
+    Workers POST to user-supplied URLs: only http(s), only
+    CALLBACK_ALLOWED_HOSTS if set, and never to private / loopback /
+    link-local addresses (internal services). The request must then go
+    to that address, not to the host name: resolving it again could
+    give another answer (DNS rebinding).
+    """
+    parsed = urlparse(url)
+    if parsed.scheme not in ("http", "https") or not parsed.hostname:
+        return "only absolute http(s) URLs are allowed", None
+    host = parsed.hostname.lower()
+    if settings.CALLBACK_ALLOWED_HOSTS:
+        if host not in settings.CALLBACK_ALLOWED_HOSTS:
+            return f"host '{host}' is not in the allowed callback hosts", None
+        return None, None
+
+    try:
+        addresses = await _resolve(host, parsed.port or 443)
+    except OSError:
+        return f"host '{host}' can't be resolved", None
+    if not addresses:
+        return f"host '{host}' can't be resolved", None
+    for address in addresses:
+        if not address.is_global:
+            return f"host '{host}' resolves to a non-public address", None
+    return None, str(addresses[0])
+
+
+async def callback_url_error(url: str) -> str | None:
+    """Why a callback can't go to `url`, None if it can"""
+    error, _ = await check_callback_url(url)
+    return error
+
+
+def sign(body: bytes, timestamp: str) -> str | None:
+    """X-Signature: HMAC-SHA256 of "{timestamp}.{body}" """
+    if not settings.CALLBACK_SIGNING_SECRET:
+        return None
+    digest = hmac.new(
+        settings.CALLBACK_SIGNING_SECRET.encode("utf-8"),
+        timestamp.encode("utf-8") + b"." + body,
+        hashlib.sha256
+    ).hexdigest()
+    return f"sha256={digest}"
+
+
+def callback_payload(job: dict) -> dict:
+    return {
+        "job_id": job["job_id"],
+        "status": job["status"],
+        "result": job.get("result"),
+        "error": job.get("error"),
+    }
+
+
+class CallbackSender:
+    """
+    POSTs a finished job to its callback_url, signed with
+    CALLBACK_SIGNING_SECRET (X-Signature + X-Signature-Timestamp).
+    Connects to the address check_callback_url() approved, with the
+    original Host header and TLS server name, on a client of its own
+    (pooled connections are keyed by address, not by host name).
+
+    Retried with exponential backoff (CALLBACK_BACKOFF, doubled per
+    attempt) up to CALLBACK_MAX_ATTEMPTS; other 4xx answers are final.
+    Retries live in the worker process: a callback still failing when
+    the worker shuts down is dropped (the result stays in Redis).
+    """
+
+    def __init__(
+        self,
+        max_attempts: int = settings.CALLBACK_MAX_ATTEMPTS,
+        backoff: float = settings.CALLBACK_BACKOFF,
+        timeout: float = settings.CALLBACK_TIMEOUT,
+        transport: httpx.AsyncBaseTransport | None = None,
+    ):
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self.timeout = timeout
+        self.transport = transport
+
+    async def send(self, job: dict) -> bool:
+        url = job.get("callback_url")
+        if not url:
+            return False
+        # checked again here: DNS may have changed since the job was created
+        error, address = await check_callback_url(url)
+        if error:
+            logger.warning(f"Job {job['job_id']}: callback not sent, {error}")
+            return False
+
+        target = httpx.URL(url)
+        pinned = {"Content-Type": "application/json"}
+        extensions = {}
+        if address:
+            pinned["Host"] = target.netloc.decode("ascii")
+            extensions["sni_hostname"] = target.raw_host.decode("ascii")
+            target = target.copy_with(host=address)
+
+        body = json.dumps(callback_payload(job), default=str).encode("utf-8")
+        async with httpx.AsyncClient(
+            transport=self.transport, timeout=self.timeout
+        ) as client:
+            for attempt in range(1, self.max_attempts + 1):
+                timestamp = str(int(time.time()))
+                headers = dict(pinned)
+                signature = sign(body, timestamp)
+                if signature:
+                    headers["X-Signature"] = signature
+                    headers["X-Signature-Timestamp"] = timestamp
+                try:
+                    response = await client.post(
+                        target, content=body, headers=headers, extensions=extensions
+                    )
+                    if response.status_code < 400:
+                        return True
+                    retry = response.status_code >= 500 \
+                        or response.status_code in RETRY_STATUSES
+                    if not retry:
+                        logger.warning(
+                            f"Job {job['job_id']}: callback rejected "
+                            f"with {response.status_code}, not retrying"
+                        )
+                        return False
+                    reason = f"HTTP {response.status_code}"
+                except httpx.HTTPError as e:
+                    reason = repr(e)
+
+                if attempt < self.max_attempts:
+                    logger.info(
+                        f"Job {job['job_id']}: callback attempt {attempt} failed "
+                        f"({reason}), retrying"
+                    )
+                    await asyncio.sleep(self.backoff * 2 ** (attempt - 1))
+
+        logger.error(
+            f"Job {job['job_id']}: callback failed after "
+            f"{self.max_attempts} attempts ({reason})"
+        )
+        return False
@@ -1,11 +1,119 @@
 import json
+import time
 from typing import Optional
 from uuid import UUID
 
+from redis.exceptions import ResponseError
+
+from app.core.config import settings
+
+JOB_KEY = "inference:job:{job_id}"
+# job_id -> last heartbeat (unix time) of every running job
+RUNNING_KEY = "inference:running"
+# pub/sub: {"type": "status" | "progress", "job_id", ...} on every change
+EVENTS_CHANNEL = "inference:events"
+ACTIVE_STATUSES = ("queued", "running")
+
+# Jobs are hashes of JSON-encoded fields. Records written by older
+# versions as one JSON string are converted in place on first write.
+_MIGRATE = """
+if redis.call('TYPE', KEYS[1]).ok == 'string' then
+    local job = cjson.decode(redis.call('GET', KEYS[1]))
+    local ttl = redis.call('PTTL', KEYS[1])
+    redis.call('DEL', KEYS[1])
+    for field, value in pairs(job) do
+        redis.call('HSET', KEYS[1], field, cjson.encode(value))
+    end
+    if ttl > 0 then
+        redis.call('PEXPIRE', KEYS[1], ttl)
+    end
+end
+"""
+
+# KEYS: job, running set
+# ARGV: job_id, now, ttl (0 = active job, kept), channel, event, field, value, ...
+_UPDATE_STATUS = _MIGRATE + """
+if redis.call('EXISTS', KEYS[1]) == 0 then
+    return nil
+end
+redis.call('HSET', KEYS[1], unpack(ARGV, 6))
+if cjson.decode(redis.call('HGET', KEYS[1], 'status')) == 'running' then
+    redis.call('ZADD', KEYS[2], ARGV[2], ARGV[1])
+else
+    redis.call('ZREM', KEYS[2], ARGV[1])
+end
+if tonumber(ARGV[3]) > 0 then
+    redis.call('EXPIRE', KEYS[1], ARGV[3])
+else
+    -- active again (e.g. redelivered): drop an earlier terminal expiry
+    redis.call('PERSIST', KEYS[1])
+end
+redis.call('PUBLISH', ARGV[4], ARGV[5])
+return redis.call('HGETALL', KEYS[1])
+"""
+
+# KEYS: job; ARGV: channel, event, field, value, ...
+_SET_FIELDS = _MIGRATE + """
+if redis.call('EXISTS', KEYS[1]) == 0 then
+    return 0
+end
+redis.call('HSET', KEYS[1], unpack(ARGV, 3))
+redis.call('PUBLISH', ARGV[1], ARGV[2])
+return 1
+"""
+
+# KEYS: job, running set; ARGV: job_id, channel, event, encoded "queued"
+_REQUEUE = _MIGRATE + """
+redis.call('ZREM', KEYS[2], ARGV[1])
+local status = redis.call('HGET', KEYS[1], 'status')
+if not status or cjson.decode(status) ~= 'running' then
+    return 0
+end
+redis.call('HSET', KEYS[1], 'status', ARGV[4])
+redis.call('PUBLISH', ARGV[2], ARGV[3])
+return 1
+"""
+
+# KEYS: job, running set; ARGV: job_id, now, encoded now
+_HEARTBEAT = _MIGRATE + """
+if not redis.call('ZSCORE', KEYS[2], ARGV[1]) or redis.call('EXISTS', KEYS[1]) == 0 then
+    return 0
+end
+redis.call('ZADD', KEYS[2], ARGV[2], ARGV[1])
+redis.call('HSET', KEYS[1], 'last_heartbeat_at', ARGV[3])
+return 1
+"""
+
+
+def _encode(fields: dict) -> dict:
+    return {field: json.dumps(value) for field, value in fields.items()}
+
+
+def _args(fields: dict) -> list:
+    """Flat field, value, ... script arguments"""
+    return [item for pair in _encode(fields).items() for item in pair]
+
+
+def _decode(data: dict) -> dict:
+    return {field: json.loads(value) for field, value in data.items()}
+
 
 class InferenceJobRepository:
+    """
+    Job records in Redis hashes.
+
+    Every write touches only its own fields, in one Lua script, so a
+    heartbeat can't overwrite a result written at the same moment.
+    Finished jobs expire after JOB_RESULT_TTL. Status and progress
+    changes are published on EVENTS_CHANNEL from the same script.
+    """
+
     def __init__(self, redis_client):
         self.redis = redis_client
+        self._update_status = redis_client.register_script(_UPDATE_STATUS)
+        self._set_fields = redis_client.register_script(_SET_FIELDS)
+        self._heartbeat = redis_client.register_script(_HEARTBEAT)
+        self._requeue = redis_client.register_script(_REQUEUE)
 
     async def enqueue_job(self, job_id: UUID, payload: dict):
         job = {
@@ -20,26 +128,78 @@ class InferenceJobRepository:
             "result": None,
             "error": None
         }
-        await self.redis.set(f"inference:job:{job_id}", json.dumps(job))
-        await self.redis.lpush("inference:queue", json.dumps(job))
+        pipe = self.redis.pipeline()
+        pipe.hset(JOB_KEY.format(job_id=job_id), mapping=_encode(job))
+        pipe.lpush("inference:queue", json.dumps(job))
+        await pipe.execute()
 
     async def get_job(self, job_id: UUID) -> Optional[dict]:
-        data = await self.redis.get(f"inference:job:{job_id}")
+        key = JOB_KEY.format(job_id=job_id)
+        try:
+            data = await self.redis.hgetall(key)
+        except ResponseError:
+            # WRONGTYPE: a record from before the hash layout
+            data = await self.redis.get(key)
+            return json.loads(data) if data else None
         if not data:
             return None
-        return json.loads(data)
+        return _decode(data)
 
     async def update_status(
         self, job_id: UUID, status: str, result: str = None, error: str = None
     ):
-        key = f"inference:job:{job_id}"
-        job = await self.get_job(job_id)
-        if not job:
-            return
-        job["status"] = status
+        fields = {"status": status}
         if result is not None:
-            job["result"] = result
+            fields["result"] = result
         if error is not None:
-            job["error"] = error
-        await self.redis.set(key, json.dumps(job))
-        return job  # return job for callback
+            fields["error"] = error
+        now = time.time()
+        if status == "running":
+            fields["last_heartbeat_at"] = now
+        ttl = 0 if status in ACTIVE_STATUSES else settings.JOB_RESULT_TTL
+
+        event = {"type": "status", "job_id": str(job_id), "status": status}
+        data = await self._update_status(
+            keys=[JOB_KEY.format(job_id=job_id), RUNNING_KEY],
+            args=[
+                str(job_id), now, ttl, EVENTS_CHANNEL, json.dumps(event),
+                *_args(fields)
+            ]
+        )
+        if not data:
+            return
+        return _decode(dict(zip(data[::2], data[1::2])))  # return job for callback
+
+    async def heartbeat(self, job_id: UUID):
+        """Only while the job is still in the running set"""
+        now = time.time()
+        await self._heartbeat(
+            keys=[JOB_KEY.format(job_id=job_id), RUNNING_KEY],
+            args=[str(job_id), now, json.dumps(now)]
+        )
+
+    async def requeued(self, job_id: UUID) -> bool:
+        """
+        A running job put back on the queue: queued again and out of the
+        running set, so the zombie reaper doesn't fail it while it waits.
+        A job that already finished is left as it is.
+        """
+        event = {"type": "status", "job_id": str(job_id), "status": "queued"}
+        return await self._requeue(
+            keys=[JOB_KEY.format(job_id=job_id), RUNNING_KEY],
+            args=[str(job_id), EVENTS_CHANNEL, json.dumps(event), json.dumps("queued")]
+        ) == 1
+
+    async def stale_running(self, before: float) -> list[str]:
+        """Running jobs whose last heartbeat is older than `before`"""
+        return await self.redis.zrangebyscore(RUNNING_KEY, "-inf", before)
+
+    async def claim_zombie(self, job_id: str) -> bool:
+        return await self.redis.zrem(RUNNING_KEY, job_id) == 1
+
+    async def update_progress(self, job_id: UUID, progress: dict):
+        event = {"type": "progress", "job_id": str(job_id), "progress": progress}
+        await self._set_fields(
+            keys=[JOB_KEY.format(job_id=job_id)],
+            args=[EVENTS_CHANNEL, json.dumps(event), *_args({"progress": progress})]
+        )
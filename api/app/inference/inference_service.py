@@ -1,14 +1,20 @@
+import asyncio
+from typing import AsyncIterator, Optional, Tuple
 from uuid import uuid4, UUID
 
-from app.inference.inference_repository import InferenceJobRepository
+from app.core.config import settings
+from app.inference.inference_repository import ACTIVE_STATUSES, InferenceJobRepository
+from app.inference.job_events import JobEventBus, job_events
 
 
 class InferenceService:
     def __init__(
         self,
-        repo: InferenceJobRepository
+        repo: InferenceJobRepository,
+        events: JobEventBus = job_events
     ):
         self.repo = repo
+        self.events = events
 
     async def create_job(
         self,
@@ -39,3 +45,64 @@ class InferenceService:
         job_id: UUID
     ) -> dict | None:
         return await self.repo.get_job(job_id)
+
+    async def wait_for_job(self, job_id: UUID, timeout: float) -> dict | None:
+        """
+        Job once it has finished, or as it is when `timeout` runs out.
+        Woken by the job's status events instead of polling.
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        async with self.events.subscribe(str(job_id)) as events:
+            job = await self.repo.get_job(job_id)
+            while job and job["status"] in ACTIVE_STATUSES:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    event = await asyncio.wait_for(
+                        events.get(),
+                        min(remaining, settings.JOB_EVENTS_RESYNC_INTERVAL)
+                    )
+                except asyncio.TimeoutError:
+                    event = None
+                if event is None or event["type"] == "status":
+                    job = await self.repo.get_job(job_id)
+        return job
+
+    async def watch_job(
+        self,
+        job_id: UUID
+    ) -> AsyncIterator[Tuple[str, Optional[dict]]]:
+        """
+        ("status", job) now and on every status change, ("progress", ...)
+        as the job reports it, ("idle", None) every
+        JOB_EVENTS_RESYNC_INTERVAL without events; ends once the job is
+        finished or gone.
+        """
+        async with self.events.subscribe(str(job_id)) as events:
+            job = await self.repo.get_job(job_id)
+            if job is None:
+                return
+            yield "status", job
+
+            while job["status"] in ACTIVE_STATUSES:
+                try:
+                    event = await asyncio.wait_for(
+                        events.get(), settings.JOB_EVENTS_RESYNC_INTERVAL
+                    )
+                except asyncio.TimeoutError:
+                    event = None
+
+                if event is not None and event["type"] == "progress":
+                    yield "progress", {"progress": event["progress"]}
+                    continue
+
+                status = job["status"]
+                job = await self.repo.get_job(job_id)
+                if job is None:
+                    return  # expired / deleted
+                if event is not None or job["status"] != status:
+                    yield "status", job
+                else:
+                    yield "idle", None
@@ -0,0 +1,101 @@
+import asyncio
+import json
+from contextlib import asynccontextmanager
+from typing import Optional
+
+from app.core.logging import logger
+from app.core.redis import redis_async_client
+from app.inference.inference_repository import EVENTS_CHANNEL
+
+# wait this long for the subscription before reading job state anyway
+SUBSCRIBE_TIMEOUT = 5.0
+RECONNECT_DELAY = 1.0
+
+
+class JobEventBus:
+    """
+    Fan-out of job events to the requests waiting on them.
+
+    One Redis subscription per API process, not one per waiting client:
+    a listener task reads EVENTS_CHANNEL and hands each event to the
+    local queues registered for its job. Started on first use.
+    After a reconnect every queue gets None (events may have been
+    missed): consumers re-read the job then.
+    """
+
+    def __init__(self, redis):
+        self.redis = redis
+        self._queues: dict[str, set[asyncio.Queue]] = {}
+        self._listener: Optional[asyncio.Task] = None
+        self._subscribed = asyncio.Event()
+
+    def _dispatch(self, data: str):
+        try:
+            event = json.loads(data)
+        except json.JSONDecodeError:
+            logger.warning(f"Malformed job event: {data[:200]!r}")
+            return
+        for queue in self._queues.get(event.get("job_id"), ()):
+            queue.put_nowait(event)
+
+    def _resync(self):
+        for queues in self._queues.values():
+            for queue in queues:
+                queue.put_nowait(None)
+
+    async def _listen(self):
+        reconnected = False
+        while True:
+            pubsub = self.redis.pubsub(ignore_subscribe_messages=True)
+            try:
+                await pubsub.subscribe(EVENTS_CHANNEL)
+                self._subscribed.set()
+                if reconnected:
+                    self._resync()
+                async for message in pubsub.listen():
+                    self._dispatch(message["data"])
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Job events subscription lost: {e!r}")
+            finally:
+                self._subscribed.clear()
+                await pubsub.aclose()
+            reconnected = True
+            await asyncio.sleep(RECONNECT_DELAY)
+
+    async def _ensure_listening(self):
+        if self._listener is None or self._listener.done():
+            self._listener = asyncio.create_task(self._listen())
+        try:
+            await asyncio.wait_for(self._subscribed.wait(), SUBSCRIBE_TIMEOUT)
+        except asyncio.TimeoutError:
+            # waiters still re-read the job every JOB_EVENTS_RESYNC_INTERVAL
+            logger.warning("Job events subscription not ready, waiting without it")
+
+    @asynccontextmanager
+    async def subscribe(self, job_id: str):
+        """
+        Queue of this job's events. Read the job state only after
+        entering, so a change in between isn't missed.
+        """
+        queue: asyncio.Queue = asyncio.Queue()
+        self._queues.setdefault(job_id, set()).add(queue)
+        try:
+            await self._ensure_listening()
+            yield queue
+        finally:
+            queues = self._queues.get(job_id)
+            if queues is not None:
+                queues.discard(queue)
+                if not queues:
+                    del self._queues[job_id]
+
+    async def aclose(self):
+        if self._listener is not None:
+            self._listener.cancel()
+            await asyncio.gather(self._listener, return_exceptions=True)
+            self._listener = None
+
+
+job_events = JobEventBus(redis_async_client)
@@ -0,0 +1,145 @@
+import asyncio
+import json
+import os
+import socket
+import time
+from typing import Optional, Tuple
+
+from app.core.config import settings
+from app.core.logging import logger
+from app.inference.inference_repository import InferenceJobRepository
+
+QUEUE_KEY = "inference:queue"
+PROCESSING_KEY = "inference:processing:{worker_id}"
+# worker_id -> last liveness beat (unix time)
+WORKERS_KEY = "inference:workers"
+# job_id -> times the job was handed to a worker
+DELIVERIES_KEY = "inference:deliveries"
+
+ACK_ATTEMPTS = 3
+ACK_RETRY_DELAY = 0.5  # sec, doubled per attempt
+
+
+def default_worker_id() -> str:
+    """Stable across restarts of the same container (pid 1 in docker)"""
+    return settings.WORKER_ID or f"{socket.gethostname()}:{os.getpid()}"
+
+
+class JobQueue:
+    """
+    Reliable job queue on Redis lists.
+
+    Producers LPUSH onto inference:queue. A worker BLMOVEs a job into
+    its own processing list (atomically, so the job is never only in
+    memory) and removes it from there (ack) once the job is done.
+    Jobs left in processing lists of dead workers (no liveness beat for
+    WORKER_DEAD_TIMEOUT) are moved back to the queue; a job delivered
+    more than QUEUE_MAX_DELIVERIES times is given up on.
+    """
+
+    def __init__(self, redis, worker_id: Optional[str] = None):
+        self.redis = redis
+        self.worker_id = worker_id or default_worker_id()
+        self.processing_key = PROCESSING_KEY.format(worker_id=self.worker_id)
+        self.jobs = InferenceJobRepository(redis)
+
+    async def pop(
+        self,
+        timeout: float = settings.QUEUE_BLOCK_TIMEOUT
+    ) -> Optional[Tuple[str, dict]]:
+        """Waits up to `timeout` for a job: (raw payload for ack, job)"""
+        # LPUSH + pop from the right = FIFO
+        raw = await self.redis.blmove(
+            QUEUE_KEY, self.processing_key, timeout, src="RIGHT", dest="LEFT"
+        )
+        if raw is None:
+            return None
+        try:
+            job = json.loads(raw)
+        except json.JSONDecodeError:
+            job = None
+        if not isinstance(job, dict) or not job.get("job_id"):
+            logger.error(f"Dropping malformed job payload: {raw[:200]!r}")
+            await self.ack(raw)
+            return None
+
+        deliveries = await self.redis.hincrby(DELIVERIES_KEY, job["job_id"], 1)
+        job["deliveries"] = deliveries
+        return raw, job
+
+    async def ack(self, raw: str, job_id: Optional[str] = None):
+        """
+        Retried: an unacked job stays in this live worker's processing
+        list and would only be redelivered after its restart
+        """
+        for attempt in range(ACK_ATTEMPTS):
+            try:
+                pipe = self.redis.pipeline(transaction=False)
+                pipe.lrem(self.processing_key, 1, raw)
+                if job_id:
+                    pipe.hdel(DELIVERIES_KEY, job_id)
+                await pipe.execute()
+                return
+            except Exception as e:
+                if attempt == ACK_ATTEMPTS - 1:
+                    raise
+                logger.warning(f"Ack of job {job_id} failed, retrying: {e!r}")
+                await asyncio.sleep(ACK_RETRY_DELAY * 2 ** attempt)
+
+    async def defer(self, raw: str, job_id: str):
+        """
+        Puts a taken job back at the end of the queue, for this or
+        another worker to take later; doesn't count as a delivery
+        """
+        pipe = self.redis.pipeline(transaction=True)
+        pipe.lrem(self.processing_key, 1, raw)
+        pipe.lpush(QUEUE_KEY, raw)
+        pipe.hincrby(DELIVERIES_KEY, job_id, -1)
+        await pipe.execute()
+
+    # ---------- liveness / redelivery ----------
+
+    async def start(self):
+        """Registers the worker; jobs a previous run of it left unacked are requeued"""
+        await self.requeue(self.worker_id)
+        await self.beat()
+
+    async def beat(self):
+        await self.redis.zadd(WORKERS_KEY, {self.worker_id: time.time()})
+
+    async def leave(self):
+        """Graceful exit: unacked jobs go back to the queue right away"""
+        await self.requeue(self.worker_id)
+        await self.redis.zrem(WORKERS_KEY, self.worker_id)
+
+    async def requeue(self, worker_id: str) -> int:
+        """Moves a worker's unacked jobs back to the queue, oldest first"""
+        src = PROCESSING_KEY.format(worker_id=worker_id)
+        moved = 0
+        # one LMOVE per job: atomic, safe if several workers recover at once
+        while raw := await self.redis.lmove(src, QUEUE_KEY, src="RIGHT", dest="RIGHT"):
+            moved += 1
+            try:
+                await self.jobs.requeued(json.loads(raw)["job_id"])
+            except Exception as e:
+                logger.warning(f"Failed to reset requeued job to queued: {e!r}")
+        if moved:
+            logger.warning(
+                f"Requeued {moved} unacked job(s) of worker {worker_id}"
+            )
+        return moved
+
+    async def recover_dead_workers(
+        self,
+        dead_timeout: float = settings.WORKER_DEAD_TIMEOUT
+    ) -> int:
+        dead = await self.redis.zrangebyscore(
+            WORKERS_KEY, "-inf", time.time() - dead_timeout
+        )
+        moved = 0
+        for worker_id in dead:
+            if worker_id == self.worker_id:
+                continue
+            moved += await self.requeue(worker_id)
+            await self.redis.zrem(WORKERS_KEY, worker_id)
+        return moved
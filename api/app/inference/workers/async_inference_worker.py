@@ -1,27 +1,56 @@
 import asyncio
-import json
+import time
 from uuid import UUID
-from datetime import datetime
 
 import redis.asyncio as aioredis
+from redis.exceptions import LockError
 
 from app.agents.memory.redis import RedisAgentMemory
+from app.core.concurrency import KeyedLimiter
 from app.core.config import settings
 from app.inference.workers.job_handler.llm_handler import LLMHandler
 from app.inference.workers.job_handler.react_handler import ReActHandler
 from app.inference.workers.job_handler.smart_orchestration_handler import \
     SmartOrchestratorHandler
 from app.inference.workers.job_handler.rag_handler import RAGHandler
-from app.llm.factory import LLMClientFactory
-from app.inference.inference_repository import InferenceJobRepository
+from app.inference.workers.job_handler.ingestion_handler import IngestionHandler
+from app.llm.factory import get_llm_factory
+from app.inference.callbacks import CallbackSender
+from app.inference.inference_repository import ACTIVE_STATUSES, InferenceJobRepository
+from app.inference.job_queue import JobQueue
+from app.inference.workers.metrics import JOBS_DEFERRED, JOBS_IN_FLIGHT, WORKER_CAPACITY
 from app.core.logging import logger
 
-QUEUE_KEY = "inference:queue"
-HEARTBEAT_INTERVAL = 5  # sec
-ZOMBIE_TIMEOUT = 300    # sec, if running > 5 min → zombie
+# only one worker at a time reaps zombie jobs
+REAPER_LOCK_KEY = "inference:reaper:lock"
+# sec before taking jobs again after a queue error (e.g. Redis blip)
+QUEUE_ERROR_BACKOFF = 1.0
+# sec to wait once every job in the queue was deferred (all at capacity)
+QUEUE_DEFER_BACKOFF = 0.5
+
+
+def _job_type(job: dict) -> str:
+    return job.get("job_type") or "unknown"
+
+
+def _provider(job: dict) -> str:
+    return job.get("model") or "unknown"
 
 
 class AsyncInferenceWorker:
+    """
+    Concurrency: at most WORKER_MAX_CONCURRENCY jobs in flight, and a job
+    is taken from the queue only when one of these slots is free (the
+    rest wait in Redis, where other workers can take them). Inside that,
+    jobs are capped per job type and per provider: a taken job whose
+    type / provider is at capacity is put back on the queue right away
+    instead of holding a slot while it waits. stop() (SIGTERM)
+    stops taking jobs and lets in-flight ones finish for up to
+    WORKER_DRAIN_TIMEOUT; unfinished ones go back to the queue.
+    Finished jobs with a callback_url are POSTed there in the
+    background, outside the concurrency slots.
+    """
+
     def __init__(self):
         self.redis = aioredis.Redis(
             host=settings.REDIS_HOST,
@@ -30,25 +59,42 @@ class AsyncInferenceWorker:
             decode_responses=True
         )
         self.repo = InferenceJobRepository(self.redis)
-        self.llm_factory = LLMClientFactory()
+        self.queue = JobQueue(self.redis)
+        self.llm_factory = get_llm_factory()
         self.agent_memory = RedisAgentMemory()
 
         self.handlers = [
             ReActHandler(self.agent_memory, self.llm_factory),
             LLMHandler(self.llm_factory),
             SmartOrchestratorHandler(),
-            RAGHandler()
+            RAGHandler(),
+            IngestionHandler()
         ]
 
+        self.max_concurrency = settings.WORKER_MAX_CONCURRENCY
+        self.slots = asyncio.Semaphore(self.max_concurrency)
+        self.job_type_limiter = KeyedLimiter(settings.WORKER_JOB_TYPE_CONCURRENCY, None)
+        self.provider_limiter = KeyedLimiter(settings.WORKER_PROVIDER_CONCURRENCY, None)
+        self.tasks: set[asyncio.Task] = set()
+        # jobs deferred since a job was last started
+        self._deferred: set[str] = set()
+        self.callbacks = CallbackSender()
+        self.callback_tasks: set[asyncio.Task] = set()
+        self._stopping = asyncio.Event()
+        WORKER_CAPACITY.set(self.max_concurrency)
+
+        self.reaper_lock = self.redis.lock(
+            REAPER_LOCK_KEY, timeout=settings.ZOMBIE_REAP_INTERVAL * 3
+        )
+
     async def heartbeat(self, job_id: UUID):
-        key = f"inference:job:{job_id}"
+        """Bumps the job's score in the running set while it runs"""
         while True:
-            job = await self.repo.get_job(job_id)
-            if not job or job["status"] not in ["running"]:
-                break
-            job["last_heartbeat_at"] = datetime.utcnow().isoformat()
-            await self.redis.set(key, json.dumps(job))
-            await asyncio.sleep(HEARTBEAT_INTERVAL)
+            try:
+                await self.repo.heartbeat(job_id)
+            except Exception as e:
+                logger.warning(f"Heartbeat failed for job {job_id}: {e}")
+            await asyncio.sleep(settings.JOB_HEARTBEAT_INTERVAL)
 
     async def run_job(self, job: dict):
         for handler in self.handlers:
@@ -60,45 +106,231 @@ class AsyncInferenceWorker:
                 result = await handler.handle(job, self.repo)
                 logger.info(f"Job {job['job_id']} result: {result}")
                 return
-            logger.warning(f"No handler found for job {job['job_id']}")
-            await self.repo.update_status(
-                UUID(job['job_id']),
-                "failed",
-                error="No handler found"
-            )
+        logger.warning(f"No handler found for job {job['job_id']}")
+        await self.repo.update_status(
+            UUID(job['job_id']),
+            "failed",
+            error="No handler found"
+        )
 
-    async def handle_zombies(self):
+    async def handle_zombies(self) -> int:
         """
-        Check running jobs, if last_heartbeat > ZOMBIE_TIMEOUT → mark failed
+        Running jobs without a heartbeat for JOB_ZOMBIE_TIMEOUT → failed.
+        One ZRANGEBYSCORE over the running set, not a scan of all jobs.
         """
-        keys = await self.redis.keys("inference:job:*")
-        now = datetime.utcnow()
-        for key in keys:
-            data = await self.redis.get(key)
-            if not data:
-                continue
-            job = json.loads(data)
-            if job.get("status") == "running":
-                last_hb = job.get("last_heartbeat_at") or job.get("started_at")
-                if last_hb:
-                    last_hb_dt = datetime.fromisoformat(last_hb)
-                    if (now - last_hb_dt).total_seconds() > ZOMBIE_TIMEOUT:
-                        await self.repo.update_status(
-                            UUID(job["job_id"]),
-                            "failed",
-                            error="zombie job"
-                        )
+        stale = await self.repo.stale_running(time.time() - settings.JOB_ZOMBIE_TIMEOUT)
+        reaped = 0
+        for job_id in stale:
+            # ZREM decides who reaps it, if a job is seen twice
+            if await self.repo.claim_zombie(job_id):
+                job = await self.repo.update_status(
+                    UUID(job_id), "failed", error="zombie job"
+                )
+                if job:
+                    self.send_callback(job)
+                reaped += 1
+        if reaped:
+            logger.warning(f"Reaped {reaped} zombie job(s)")
+        return reaped
 
-    async def run(self):
+    async def _is_reaper(self) -> bool:
+        """Leader lock: held (and refreshed) by one worker at a time"""
+        try:
+            if await self.reaper_lock.owned():
+                await self.reaper_lock.reacquire()
+                return True
+            return await self.reaper_lock.acquire(blocking=False)
+        except LockError:
+            return False
+
+    async def reaper(self):
         while True:
-            # handle zombies first
-            await self.handle_zombies()
+            await asyncio.sleep(settings.ZOMBIE_REAP_INTERVAL)
+            try:
+                if await self._is_reaper():
+                    await self.handle_zombies()
+            except Exception as e:
+                logger.warning(f"Zombie reaping failed: {e}")
+
+    async def process(self, raw: str, job: dict):
+        """
+        Runs the job and acks it. Not acked if the worker dies or the job
+        is cancelled on shutdown: it's redelivered then.
+        """
+        job_id = job["job_id"]
+        try:
+            await self._execute(job)
+        finally:
+            self.job_type_limiter.release(_job_type(job))
+            self.provider_limiter.release(_provider(job))
+
+        await self.queue.ack(raw, job_id)
+
+        if job.get("callback_url"):
+            state = await self.repo.get_job(UUID(job_id))
+            if state and state["status"] not in ACTIVE_STATUSES:
+                self.send_callback(state)
+
+    def send_callback(self, job: dict):
+        if not job.get("callback_url"):
+            return
+        task = asyncio.create_task(self.callbacks.send(job))
+        self.callback_tasks.add(task)
+        task.add_done_callback(self.callback_tasks.discard)
+
+    async def _reserve(self, job: dict) -> bool:
+        """Job type + provider slots for the job if both are free now"""
+        job_type, provider = _job_type(job), _provider(job)
+        if not (self.job_type_limiter.has_capacity(job_type)
+                and self.provider_limiter.has_capacity(provider)):
+            return False
+        # neither call suspends while a slot is free
+        await self.job_type_limiter.try_acquire(job_type)
+        await self.provider_limiter.try_acquire(provider)
+        return True
+
+    async def _execute(self, job: dict):
+        job_id = job["job_id"]
+        job_type = _job_type(job)
+
+        # redelivered after its worker died between finishing and ack:
+        # the stored record says it's done, don't run it again
+        state = await self.repo.get_job(UUID(job_id))
+        if state is None or state["status"] not in ACTIVE_STATUSES:
+            logger.warning(
+                f"Job {job_id} is already "
+                f"{state['status'] if state else 'gone'}, not running it again"
+            )
+            return
+
+        JOBS_IN_FLIGHT.labels(job_type).inc()
+        heartbeat = asyncio.create_task(self.heartbeat(UUID(job_id)))
+        try:
+            if job["deliveries"] > settings.QUEUE_MAX_DELIVERIES:
+                logger.error(f"Job {job_id} exceeded delivery limit, giving up")
+                await self.repo.update_status(
+                    UUID(job_id), "failed", error="delivery limit exceeded"
+                )
+            else:
+                await self.run_job(job)
+        except Exception as e:
+            logger.exception(f"Job {job_id} failed: {e}")
+            await self.repo.update_status(UUID(job_id), "failed", error=str(e))
+        finally:
+            heartbeat.cancel()
+            JOBS_IN_FLIGHT.labels(job_type).dec()
+
+    async def _defer(self, raw: str, job: dict):
+        """Back to the queue for later / another worker; frees the global slot"""
+        self.slots.release()
+        JOBS_DEFERRED.labels(_job_type(job)).inc()
+        try:
+            await self.queue.defer(raw, job["job_id"])
+        except Exception as e:
+            # still in our processing list: redelivered on restart
+            logger.error(f"Deferring job {job['job_id']} failed: {e!r}")
+
+        # the same job came round again: nothing in the queue can run
+        # now, don't spin on it
+        if job["job_id"] in self._deferred:
+            self._deferred.clear()
+            await self._until_stopped(asyncio.sleep(QUEUE_DEFER_BACKOFF))
+        else:
+            self._deferred.add(job["job_id"])
+
+    def _task_done(self, task: asyncio.Task):
+        self.tasks.discard(task)
+        self.slots.release()
+        if not task.cancelled() and task.exception():
+            logger.error(f"Job task crashed: {task.exception()!r}")
+
+    async def _until_stopped(self, aw):
+        """Result of `aw`, or None if stop() came first (aw is cancelled)"""
+        task = asyncio.ensure_future(aw)
+        stop = asyncio.ensure_future(self._stopping.wait())
+        await asyncio.wait({task, stop}, return_when=asyncio.FIRST_COMPLETED)
+        stop.cancel()
+        if task.done():
+            return task.result()
+        task.cancel()
+        return None
+
+    def stop(self):
+        """Stop taking jobs; run() drains and returns"""
+        if not self._stopping.is_set():
+            logger.info("Worker stopping: draining in-flight jobs")
+            self._stopping.set()
+
+    async def drain(self):
+        if self.tasks:
+            _, pending = await asyncio.wait(
+                set(self.tasks), timeout=settings.WORKER_DRAIN_TIMEOUT
+            )
+            for task in pending:
+                task.cancel()
+            if pending:
+                logger.warning(f"Drain timeout: {len(pending)} job(s) cancelled")
+                await asyncio.gather(*pending, return_exceptions=True)
+        if self.callback_tasks:
+            # one more attempt's worth of time for callbacks in flight
+            _, pending = await asyncio.wait(
+                set(self.callback_tasks), timeout=settings.CALLBACK_TIMEOUT
+            )
+            for task in pending:
+                task.cancel()
+            if pending:
+                logger.warning(f"Drain timeout: {len(pending)} callback(s) dropped")
+        # cancelled / never started jobs are still in our processing list
+        await self.queue.leave()
+
+    async def liveness(self):
+        """Worker beat + redelivery of jobs held by dead workers"""
+        while True:
+            try:
+                await self.queue.beat()
+                await self.queue.recover_dead_workers()
+            except Exception as e:
+                logger.warning(f"Worker liveness check failed: {e}")
+            await asyncio.sleep(settings.WORKER_HEARTBEAT_INTERVAL)
+
+    async def run(self):
+        await self.queue.start()
+        logger.info(f"Worker {self.queue.worker_id} consuming jobs")
+        liveness = asyncio.create_task(self.liveness())
+        reaper = asyncio.create_task(self.reaper())
+        try:
+            while not self._stopping.is_set():
+                # backpressure: take a job only with a free slot
+                if not await self._until_stopped(self.slots.acquire()):
+                    break
+
+                # blocks until a job arrives (no polling delay);
+                # the job stays in our processing list until acked
+                try:
+                    item = await self._until_stopped(self.queue.pop())
+                except Exception as e:
+                    logger.error(f"Taking a job from the queue failed: {e!r}")
+                    item = None
+                    await self._until_stopped(asyncio.sleep(QUEUE_ERROR_BACKOFF))
+                if item is None:
+                    self.slots.release()
+                    continue
+
+                raw, job = item
+                if not await self._reserve(job):
+                    await self._defer(raw, job)
+                    continue
 
-            # RPOP queue
-            job_data = await self.redis.rpop(QUEUE_KEY)
-            if not job_data:
-                await asyncio.sleep(0.5)
-                continue
+                self._deferred.clear()
+                task = asyncio.create_task(self.process(raw, job))
+                self.tasks.add(task)
+                task.add_done_callback(self._task_done)
 
-            job = json.loads(job_data)
-            asyncio.create_task(self.run_job(job))
+            await self.drain()
+        finally:
+            liveness.cancel()
+            reaper.cancel()
+            try:
+                await self.reaper_lock.release()
+            except LockError:
+                pass  # not the reaper
@@ -3,7 +3,7 @@ import json
 import traceback
 from uuid import UUID
 from app.core.redis import redis_async_client
-from app.llm.factory import LLMClientFactory
+from app.llm.factory import get_llm_factory
 from app.inference.inference_repository import InferenceJobRepository
 from app.core.logging import logger
 
@@ -14,7 +14,7 @@ class InferenceWorker:
     def __init__(self):
         self.redis = redis_async_client
         self.repo = InferenceJobRepository(self.redis)
-        self.llm_factory = LLMClientFactory()
+        self.llm_factory = get_llm_factory()
 
     async def run(self):
         logger.info("InferenceWorker started")
@@ -0,0 +1,64 @@
+import asyncio
+import json
+import os
+from uuid import UUID
+from app.core.config import settings
+from app.core.logging import logger
+from app.embeddings.factory import get_embedding_client
+from app.inference.workers.job_handler.base import JobHandler
+from app.services.ingestion import prepare_pipeline
+
+
+class IngestionHandler(JobHandler):
+    """
+    Background PDF ingestion. The job prompt holds JSON with the spooled
+    file path, source and a document_id used if the source is new; progress
+    (pages / chunks embedded) is written to the job record as it goes.
+    No chunk/token caps: the work isn't bound to an HTTP request and a
+    re-run with the same document_id resumes idempotently.
+    """
+
+    async def can_handle(self, job: dict) -> bool:
+        return job.get("job_type") == "ingestion"
+
+    async def handle(self, job: dict, repo):
+        job_id = UUID(job["job_id"])
+        await repo.update_status(job_id, "running")
+
+        payload = json.loads(job["prompt"])
+        path = payload["path"]
+
+        async def on_progress(stats: dict):
+            await repo.update_progress(job_id, stats)
+
+        try:
+            pipeline, result = await prepare_pipeline(
+                path,
+                payload["source"],
+                embedding_client=get_embedding_client(
+                    payload.get("embedding_provider") or settings.EMBEDDING_PROVIDER
+                ),
+                doc_id=payload["document_id"],
+                on_progress=on_progress,
+                keep_partial_on_cancel=True,
+            )
+            if pipeline is not None:
+                result = {**await pipeline.run(path), "timings": pipeline.timings}
+        except asyncio.CancelledError:
+            # worker is going down: keep the spooled file for a re-run
+            raise
+        except Exception as e:
+            logger.warning(f"Ingestion job {job_id} failed: {e!r}")
+            await repo.update_status(job_id, "failed", error=str(e))
+            self._remove_spooled(path)
+            return {"status": "failed", "error": str(e)}
+
+        await repo.update_status(job_id, "finished", result=result)
+        self._remove_spooled(path)
+        return {"status": "finished", "result": result}
+
+    def _remove_spooled(self, path: str):
+        try:
+            os.unlink(path)
+        except OSError as e:
+            logger.warning(f"Failed to remove spooled upload {path}: {e}")
@@ -1,5 +1,6 @@
 import asyncio
 from uuid import UUID
+from app.core.config import settings
 from app.inference.workers.job_handler.base import JobHandler
 from app.llm.filter import refusal_response, validate_llm_output
 from app.llm.sanitizer import sanitize_user_prompt
@@ -36,11 +37,13 @@ class LLMHandler(JobHandler):
             return {"status": "refused", "error": str(e)}
 
         try:
-            llm_output = await asyncio.to_thread(
-                llm_client.generate,
-                prompt=safe_prompt,
-                gen_config=gen_config,
-                instruction=safe_instruction
+            llm_output = await asyncio.wait_for(
+                llm_client.generate(
+                    prompt=safe_prompt,
+                    gen_config=gen_config,
+                    instruction=safe_instruction
+                ),
+                timeout=settings.JOB_LLM_TIMEOUT
             )
 
             status = "finished" if validate_llm_output(llm_output) else "fallback"
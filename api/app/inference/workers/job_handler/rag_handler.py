@@ -2,7 +2,7 @@ import json
 from uuid import UUID
 from app.inference.workers.job_handler.base import JobHandler
 from app.services.rag_service import RAGService
-from app.llm.factory import LLMClientFactory
+from app.llm.factory import get_llm_factory
 from app.llm.config import DEFAULT_GEN_CONFIG
 
 
@@ -23,7 +23,7 @@ class RAGHandler(JobHandler):
                 top_k=payload["top_k"]
             )
 
-            llm_factory = LLMClientFactory()
+            llm_factory = get_llm_factory()
             llm_client = llm_factory.get(payload["llm_provider"])
 
             result = await rag.answer(
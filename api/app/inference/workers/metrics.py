@@ -0,0 +1,19 @@
+from prometheus_client import Counter, Gauge
+
+# exposed by worker_main on WORKER_METRICS_PORT
+WORKER_CAPACITY = Gauge(
+    "inference_worker_capacity",
+    "Max jobs in flight in this worker"
+)
+
+JOBS_IN_FLIGHT = Gauge(
+    "inference_worker_jobs_in_flight",
+    "Jobs taken from the queue and not finished yet",
+    ["job_type"]
+)
+
+JOBS_DEFERRED = Counter(
+    "inference_worker_jobs_deferred",
+    "Jobs put back on the queue: their job type / provider was at capacity",
+    ["job_type"]
+)
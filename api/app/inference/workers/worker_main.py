@@ -1,11 +1,29 @@
 import asyncio
+import signal
+from prometheus_client import start_http_server
 from app.inference.workers.async_inference_worker import AsyncInferenceWorker
+from app.core.config import settings
+from app.core.http import http_pool
 from app.core.logging import logger
+from app.infra.db import qdrant
+from app.infra.pdf_loader import shutdown_pdf_pool
 
 
 async def main():
+    await http_pool.startup()
+    if settings.WORKER_METRICS_PORT:
+        start_http_server(settings.WORKER_METRICS_PORT)
+
     worker = AsyncInferenceWorker()
-    await worker.run()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(sig, worker.stop)
+    try:
+        await worker.run()
+    finally:
+        await http_pool.aclose()
+        await qdrant.close()
+        shutdown_pdf_pool()
 
 if __name__ == "__main__":
     logger.info("Starting AsyncInferenceWorker")
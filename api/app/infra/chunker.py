@@ -1,21 +1,185 @@
-import tiktoken
+import re
+from dataclasses import dataclass
 
-tokenizer = tiktoken.get_encoding("cl100k_base")
+from app.core.tokens import get_token_counter
+
+# Paragraph break (blank line) or sentence end (.!?… plus closing quotes /
+# brackets) followed by whitespace. Single newlines are not boundaries:
+# PDF text breaks lines mid-sentence.
+BOUNDARY = re.compile(r"\n[ \t]*\n\s*|(?<=[.!?…])[\"'»”)\]]*\s+")
+
+# cut at a paragraph break instead of the last sentence
+# if the chunk is at least this full
+PARAGRAPH_MIN_FILL = 0.5
+
+
+@dataclass
+class Segment:
+    text: str
+    tokens: int
+    paragraph_end: bool = False
+
+
+class StreamChunker:
+    """
+    Structure-aware chunker over a text stream.
+
+    Text is split into sentences / paragraphs, each tokenized once; chunks
+    are built by packing whole segments up to `chunk_size` tokens (cutting
+    at a paragraph break when one is close enough), and are slices of the
+    original text, so nothing is decoded back per chunk. Overlap is made of
+    whole trailing sentences up to `overlap` tokens. Tokens are counted
+    with `model`'s tokenizer (the embedding model's); segments are counted
+    one by one, so every packed chunk is counted again as joined and cut
+    shorter if it came out over `chunk_size`. Only segments that may
+    still end up in the next chunk are buffered, so memory stays bounded
+    by ~one chunk regardless of the document size.
+
+    feed() returns chunks completed so far, flush() the rest.
+    """
+
+    def __init__(self, chunk_size: int, overlap: int, model: str | None = None):
+        if overlap >= chunk_size:
+            raise ValueError("overlap must be smaller than chunk_size")
+        self.chunk_size = chunk_size
+        self.overlap = overlap
+        self.counter = get_token_counter(model)
+        # text after the last boundary, may continue in the next feed
+        self.tail = ""
+        self.max_tail_chars = chunk_size * 8
+        self.segments: list[Segment] = []
+        # leading segments already emitted, kept as overlap
+        self.carried = 0
+
+    def _segment(self, text: str, paragraph_end: bool = False) -> Segment:
+        return Segment(text, self.counter.count(text), paragraph_end)
+
+    def feed(self, text: str) -> list[str]:
+        text = self.tail + text
+        start = 0
+        for match in BOUNDARY.finditer(text):
+            self.segments.append(self._segment(
+                text[start:match.end()],
+                paragraph_end=match.group().count("\n") >= 2
+            ))
+            start = match.end()
+        self.tail = text[start:]
+
+        # no boundary for too long: don't let the tail grow unbounded
+        if len(self.tail) > self.max_tail_chars:
+            self.segments.append(self._segment(self.tail))
+            self.tail = ""
+
+        return self._pack(final=False)
+
+    def flush(self) -> list[str]:
+        if self.tail:
+            self.segments.append(self._segment(self.tail, paragraph_end=True))
+            self.tail = ""
+        return self._pack(final=True)
+
+    def _pack(self, final: bool) -> list[str]:
+        chunks: list[str] = []
+
+        while self.segments:
+            total = 0
+            cut = 0
+            paragraph_cut = 0
+            for i, segment in enumerate(self.segments):
+                if total + segment.tokens > self.chunk_size:
+                    break
+                total += segment.tokens
+                cut = i + 1
+                filled = total >= self.chunk_size * PARAGRAPH_MIN_FILL
+                if segment.paragraph_end and filled:
+                    paragraph_cut = cut
+            else:
+                # everything fits: wait for more text unless it's the end
+                if not final:
+                    return chunks
+                if len(self.segments) <= self.carried:
+                    # only the last chunk's overlap is left
+                    self.segments = []
+                    self.carried = 0
+                    return chunks
+                cut = len(self.segments)
+                paragraph_cut = 0
+
+            if paragraph_cut > self.carried:
+                cut = paragraph_cut
+            # segments are counted one by one and tokens can merge across
+            # their boundaries: check the joined chunk, cut shorter if over
+            while cut > self.carried and not self._fits(self.segments[:cut]):
+                cut -= 1
+
+            if cut <= self.carried:
+                if self.carried:
+                    # overlap + next segment don't fit together: drop overlap
+                    self.segments = self.segments[self.carried:]
+                    self.carried = 0
+                else:
+                    # single segment longer than a chunk
+                    chunks.extend(self._split_long(self.segments.pop(0)))
+                continue
+
+            emitted, rest = self.segments[:cut], self.segments[cut:]
+            self._emit(chunks, emitted)
+
+            keep: list[Segment] = []
+            kept_tokens = 0
+            for segment in reversed(emitted):
+                if kept_tokens + segment.tokens > self.overlap:
+                    break
+                keep.insert(0, segment)
+                kept_tokens += segment.tokens
+
+            self.segments = keep + rest
+            self.carried = len(keep)
+
+        return chunks
+
+    @staticmethod
+    def _join(segments: list[Segment]) -> str:
+        return "".join(s.text for s in segments).strip()
+
+    def _fits(self, segments: list[Segment]) -> bool:
+        return self.counter.count(self._join(segments)) <= self.chunk_size
+
+    def _emit(self, chunks: list[str], segments: list[Segment]):
+        chunk = self._join(segments)
+        if chunk:
+            chunks.append(chunk)
+
+    def _split_long(self, segment: Segment) -> list[str]:
+        """Token windows over one oversized segment (one decode for offsets)"""
+        tokenizer = self.counter.encoding
+        if tokenizer is None:
+            # no tokenizer: ~4 chars per token windows
+            text = segment.text
+            tokens = range(len(text) // 4 + 1)
+            offsets = [i * 4 for i in tokens]
+        else:
+            tokens = tokenizer.encode_ordinary(segment.text)
+            text, offsets = tokenizer.decode_with_offsets(tokens)
+        step = self.chunk_size - self.overlap
+
+        chunks = []
+        for start in range(0, len(tokens), step):
+            end = start + self.chunk_size
+            char_end = offsets[end] if end < len(tokens) else len(text)
+            chunk = text[offsets[start]:char_end].strip()
+            if chunk:
+                chunks.append(chunk)
+            if end >= len(tokens):
+                break
+        return chunks
 
 
 def chunk_text(
     text: str,
     chunk_size: int,
-    overlap: int
+    overlap: int,
+    model: str | None = None
 ) -> list[str]:
-    tokens = tokenizer.encode(text)
-    chunks = []
-
-    start = 0
-    while start < len(tokens):
-        end = start + chunk_size
-        chunk = tokenizer.decode(tokens[start:end])
-        chunks.append(chunk)
-        start = end - overlap
-
-    return chunks
+    chunker = StreamChunker(chunk_size, overlap, model=model)
+    return chunker.feed(text) + chunker.flush()
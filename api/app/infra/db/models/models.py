@@ -1,6 +1,6 @@
 import uuid
-from sqlalchemy import ForeignKey, Text, Integer
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy import Computed, ForeignKey, Index, String, Text, Integer
+from sqlalchemy.dialects.postgresql import TSVECTOR, UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from pgvector.sqlalchemy import Vector
@@ -17,7 +17,9 @@ class Document(Base):
         default=uuid.uuid4,
     )
 
-    source: Mapped[str | None] = mapped_column(Text)
+    source: Mapped[str | None] = mapped_column(Text, index=True)
+    # sha256 of the ingested file, set once ingestion completed
+    content_hash: Mapped[str | None] = mapped_column(String(64))
 
 
 class Embedding(Base):
@@ -36,9 +38,21 @@ class Embedding(Base):
 
     chunk_index: Mapped[int] = mapped_column(Integer)
     content: Mapped[str] = mapped_column(Text)
+    # sha256 of chunk text
+    content_hash: Mapped[str | None] = mapped_column(String(64), index=True)
+    # full-text index over content for sparse (keyword) retrieval;
+    # 'simple' config: documents are mixed ru/en, no stemming
+    content_tsv: Mapped[str | None] = mapped_column(
+        TSVECTOR,
+        Computed("to_tsvector('simple', content)", persisted=True)
+    )
 
     embedding: Mapped[list[float]] = mapped_column(
         Vector(3072)
     )
 
     document = relationship("Document")
+
+    __table_args__ = (
+        Index("ix_embeddings_content_tsv", "content_tsv", postgresql_using="gin"),
+    )
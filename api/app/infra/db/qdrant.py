@@ -1,46 +1,114 @@
-from qdrant_client import QdrantClient
-from qdrant_client.http.models import VectorParams
+from qdrant_client import AsyncQdrantClient
+from qdrant_client.http.models import (
+    CollectionInfo, FieldCondition, Filter, FilterSelector, MatchValue,
+    PointIdsList, PointStruct, VectorParams
+)
 from typing import List
 from app.core.config import settings
+from app.core.logging import logger
 
-client = QdrantClient(url=settings.QDRANT_URL, prefer_grpc=False)
+# One async client per process; HTTP keep-alive / gRPC channel are reused
+client = AsyncQdrantClient(
+    url=settings.QDRANT_URL,
+    prefer_grpc=settings.QDRANT_PREFER_GRPC,
+    grpc_port=settings.QDRANT_GRPC_PORT,
+    timeout=settings.QDRANT_TIMEOUT,
+)
 
+# Collection metadata, filled on startup (create_collection / load_collection)
+collections: dict[str, CollectionInfo] = {}
 
-def create_collection(name: str = "documents", vector_size: int = 3072):
+
+async def load_collection(name: str) -> CollectionInfo:
+    """Returns cached collection info, fetching it once"""
+    info = collections.get(name)
+    if info is None:
+        info = await client.get_collection(collection_name=name)
+        collections[name] = info
+    return info
+
+
+async def create_collection(name: str = "documents", vector_size: int = 3072):
     """Создаём коллекцию только если её нет"""
-    try:
-        client.get_collection(name=name)
+    if await client.collection_exists(collection_name=name):
         print(f"Collection '{name}' already exists")
-    except Exception:  # коллекции нет → создаём
+    else:
         try:
-            client.create_collection(
+            await client.create_collection(
                 collection_name=name,
                 vectors_config=VectorParams(size=vector_size, distance="Cosine")
             )
             print(f"Collection '{name}' created")
         except Exception as e:
-            # если вдруг кто-то параллельно создал коллекцию
+            # если вдруг кто-то параллельно
+            # создал коллекцию
             if "already exists" in str(e):
                 print(f"Collection '{name}' already exists (race condition)")
             else:
                 raise
 
+    collections.pop(name, None)
+    await load_collection(name)
+
 
-def upsert_embedding(id: str, vector: List[float], content: str):
-    client.upsert(
+async def close():
+    try:
+        await client.close()
+    except Exception as e:
+        logger.warning(f"Failed to close Qdrant client: {e}")
+
+
+async def upsert_embedding(id: str, vector: List[float], content: str):
+    await client.upsert(
         collection_name="documents",
-        points=[{"id": id, "vector": vector, "payload": {"content": content}}]
+        points=[PointStruct(id=id, vector=vector, payload={"content": content})]
+    )
+
+
+async def upsert_points_batched(
+    collection_name: str,
+    points: List[PointStruct],
+    batch_size: int = settings.QDRANT_UPSERT_BATCH_SIZE,
+    wait: bool = settings.QDRANT_UPSERT_WAIT
+):
+    """Bulk upsert: one request per `batch_size` points"""
+    for start in range(0, len(points), batch_size):
+        await client.upsert(
+            collection_name=collection_name,
+            points=points[start:start + batch_size],
+            wait=wait
+        )
+
+
+async def delete_points(collection_name: str, ids: List[str]):
+    await client.delete(
+        collection_name=collection_name,
+        points_selector=PointIdsList(points=ids)
     )
 
 
-def search(query_vector: List[float], limit: int = 5):
+async def delete_document_points(collection_name: str, document_id: str):
+    await client.delete(
+        collection_name=collection_name,
+        points_selector=FilterSelector(filter=Filter(must=[
+            FieldCondition(key="document_id", match=MatchValue(value=document_id))
+        ]))
+    )
+
+
+async def search(
+    query_vector: List[float],
+    limit: int = 5,
+    with_vectors: bool = False
+):
     # Используем query_points вместо client.search
-    client.get_collection("documents")
-    response = client.query_points(
+    response = await client.query_points(
         collection_name="documents",
         query=query_vector,
         limit=limit,
-        with_payload=True  # чтобы достать текст chunk'а
+        # chunk text + position, not the whole payload
+        with_payload=["content", "document_id", "chunk_index"],
+        with_vectors=with_vectors
     )
     # response.points — список найденных точек
     return [
@@ -48,6 +116,53 @@ def search(query_vector: List[float], limit: int = 5):
             "id": p.id,
             "vector": p.vector,
             "content": p.payload["content"],
+            "document_id": p.payload.get("document_id"),
+            "chunk_index": p.payload.get("chunk_index"),
+            "score": getattr(p, "score", 0.0)
+        }
+        for p in response.points
+    ]
+
+
+async def create_payload_index(collection_name: str, field_name: str, field_schema: str):
+    """Index payload field used in filters (no-op if it exists)"""
+    await client.create_payload_index(
+        collection_name=collection_name,
+        field_name=field_name,
+        field_schema=field_schema
+    )
+
+
+async def upsert_point(collection_name: str, id: str, vector: List[float], payload: dict):
+    await client.upsert(
+        collection_name=collection_name,
+        points=[PointStruct(id=id, vector=vector, payload=payload)]
+    )
+
+
+async def search_points(
+    collection_name: str,
+    query_vector: List[float],
+    limit: int = 1,
+    query_filter: Filter | None = None,
+    score_threshold: float | None = None,
+    with_payload: bool | List[str] = True,
+    with_vectors: bool = False
+):
+    response = await client.query_points(
+        collection_name=collection_name,
+        query=query_vector,
+        query_filter=query_filter,
+        score_threshold=score_threshold,
+        limit=limit,
+        with_payload=with_payload,
+        with_vectors=with_vectors
+    )
+    return [
+        {
+            "id": p.id,
+            "payload": p.payload,
+            "vector": p.vector,
             "score": getattr(p, "score", 0.0)
         }
         for p in response.points
@@ -1,5 +1,14 @@
+import asyncio
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import AsyncIterator, List
+
 from pypdf import PdfReader
 
+from app.core.config import settings
+
+_pdf_pool: ProcessPoolExecutor | None = None
+
 
 def load_pdf(path: str) -> str:
     reader = PdfReader(path)
@@ -11,3 +20,62 @@ def load_pdf(path: str) -> str:
             pages.append(text)
 
     return "\n".join(pages)
+
+
+def get_pdf_pool() -> ProcessPoolExecutor:
+    """Process pool for CPU-bound page extraction (created on first use)"""
+    global _pdf_pool
+    if _pdf_pool is None:
+        _pdf_pool = ProcessPoolExecutor(max_workers=settings.INGEST_PDF_WORKERS)
+    return _pdf_pool
+
+
+def shutdown_pdf_pool():
+    global _pdf_pool
+    if _pdf_pool is not None:
+        _pdf_pool.shutdown(wait=False, cancel_futures=True)
+        _pdf_pool = None
+
+
+# --- run inside pool processes (module-level, so they pickle) ---
+
+def count_pages(path: str) -> int:
+    return len(PdfReader(path).pages)
+
+
+def extract_pages(path: str, start: int, end: int) -> List[str]:
+    reader = PdfReader(path)
+    return [reader.pages[i].extract_text() or "" for i in range(start, end)]
+
+
+async def iter_pdf_pages(
+    path: str,
+    total_pages: int,
+    window: int = settings.INGEST_PAGE_WINDOW,
+    start_page: int = 0,
+) -> AsyncIterator[str]:
+    """
+    Yields page texts in order while later windows of pages are still
+    being extracted in the process pool. At most 2 windows per pool
+    worker are in flight, so a slow consumer holds extraction back.
+    """
+    loop = asyncio.get_running_loop()
+    pool = get_pdf_pool()
+    max_in_flight = settings.INGEST_PDF_WORKERS * 2
+
+    pending: deque[asyncio.Future] = deque()
+    next_start = start_page
+    try:
+        while next_start < total_pages or pending:
+            while next_start < total_pages and len(pending) < max_in_flight:
+                end = min(next_start + window, total_pages)
+                pending.append(
+                    loop.run_in_executor(pool, extract_pages, path, next_start, end)
+                )
+                next_start = end
+
+            for text in await pending.popleft():
+                yield text
+    finally:
+        for future in pending:
+            future.cancel()
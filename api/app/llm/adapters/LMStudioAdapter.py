@@ -1,15 +1,16 @@
-from typing import Dict, Any, List, Optional
-from .base.base_generation import BaseLLMGenerationClient
+from typing import Dict, Any, List, Optional, AsyncIterator
+from .base.base_generation import BaseLLMGenerationClient, delta_frame, done_frame
 from .base.base_tts import BaseLLMTTSClient
 from .base.http_client import BaseHTTPClient
 
 import base64
+import json
 
 
 class LMStudioGenerationClient(BaseLLMGenerationClient, BaseHTTPClient):
 
     def __init__(self, base_url: str, model: str, api_key: Optional[str] = None):
-        BaseHTTPClient.__init__(self, base_url, api_key)
+        BaseHTTPClient.__init__(self, base_url, api_key, provider="lmstudio")
         self.model_name = model
 
     def _sanitize_config(self, gen_config: Dict[str, Any]) -> Dict[str, Any]:
@@ -25,26 +26,37 @@ class LMStudioGenerationClient(BaseLLMGenerationClient, BaseHTTPClient):
                 allowed[key] = gen_config[key]
         return allowed
 
-    async def generate(
+    def _build_payload(
         self,
         prompt: str,
         gen_config: Dict[str, Any],
-        instruction: Optional[List[str]] = None,
+        instruction: Optional[List[str]],
     ) -> Dict[str, Any]:
 
         messages = []
 
         if instruction:
+            if isinstance(instruction, list):
+                instruction = "\n".join(instruction)
             messages.append({"role": "system", "content": instruction})
 
         messages.append({"role": "user", "content": prompt})
 
-        payload = {
+        return {
             "model": self.model_name,
             "messages": messages,
             **self._sanitize_config(gen_config)
         }
 
+    async def generate(
+        self,
+        prompt: str,
+        gen_config: Dict[str, Any],
+        instruction: Optional[List[str]] = None,
+    ) -> Dict[str, Any]:
+
+        payload = self._build_payload(prompt, gen_config, instruction)
+
         response = await self._post(
             "/v1/chat/completions",
             payload,
@@ -61,6 +73,48 @@ class LMStudioGenerationClient(BaseLLMGenerationClient, BaseHTTPClient):
             "provider": "lmstudio"
         }
 
+    async def stream(
+        self,
+        prompt: str,
+        gen_config: Dict[str, Any],
+        instruction: Optional[List[str]] = None,
+    ) -> AsyncIterator[Dict[str, Any]]:
+
+        payload = {
+            **self._build_payload(prompt, gen_config, instruction),
+            "stream": True,
+            "stream_options": {"include_usage": True}
+        }
+
+        finish_reason = None
+        usage = None
+
+        # OpenAI-compatible SSE: "data: {...}" lines, terminated by "data: [DONE]"
+        async with self._stream_post(
+            "/v1/chat/completions",
+            payload,
+            timeout=240.0
+        ) as response:
+            async for line in response.aiter_lines():
+                if not line.startswith("data:"):
+                    continue
+                data = line[len("data:"):].strip()
+                if data == "[DONE]":
+                    break
+
+                chunk = json.loads(data)
+                if chunk.get("usage"):
+                    usage = chunk["usage"]
+
+                for choice in chunk.get("choices") or []:
+                    content = (choice.get("delta") or {}).get("content")
+                    if content:
+                        yield delta_frame(content)
+                    if choice.get("finish_reason"):
+                        finish_reason = choice["finish_reason"]
+
+        yield done_frame(finish_reason or "stop", usage, "lmstudio")
+
 
 class LMStudioTTSClient(BaseLLMTTSClient, BaseHTTPClient):
 
@@ -71,7 +125,7 @@ class LMStudioTTSClient(BaseLLMTTSClient, BaseHTTPClient):
         api_key: Optional[str] = None,
         endpoint_type: str = "openai",
     ):
-        BaseHTTPClient.__init__(self, base_url, api_key)
+        BaseHTTPClient.__init__(self, base_url, api_key, provider="lmstudio")
         self.model_name = model
         self.endpoint_type = endpoint_type
 
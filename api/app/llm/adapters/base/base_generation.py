@@ -1,5 +1,24 @@
 from abc import ABC, abstractmethod
-from typing import Dict, Any, List
+from typing import Dict, Any, List, AsyncIterator
+
+
+def delta_frame(text: str) -> Dict[str, Any]:
+    """Stream frame with a piece of generated text"""
+    return {"type": "delta", "text": text}
+
+
+def done_frame(
+    finish_reason: str | None,
+    usage: Dict[str, Any] | None,
+    provider: str | None
+) -> Dict[str, Any]:
+    """Final stream frame with usage + finish reason"""
+    return {
+        "type": "done",
+        "finish_reason": finish_reason,
+        "usage": usage,
+        "provider": provider
+    }
 
 
 class BaseLLMGenerationClient(ABC):
@@ -17,3 +36,29 @@ class BaseLLMGenerationClient(ABC):
         (text + usage + meta)
         """
         pass
+
+    async def stream(
+        self,
+        prompt: str,
+        gen_config: Dict[str, Any],
+        instruction: List[str] | None = None
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        yields delta frames while the model generates,
+        then exactly one done frame (finish_reason + usage + provider).
+
+        Default: whole generate() answer as a single delta,
+        adapters with native streaming override it.
+        """
+        raw = await self.generate(
+            prompt=prompt,
+            gen_config=gen_config,
+            instruction=instruction
+        )
+        if raw.get("text"):
+            yield delta_frame(raw["text"])
+        yield done_frame(
+            raw.get("finish_reason"),
+            raw.get("usage"),
+            raw.get("provider")
+        )
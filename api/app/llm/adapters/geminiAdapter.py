@@ -1,8 +1,8 @@
-import asyncio
-from typing import Dict, Any, List
+from typing import Dict, Any, List, AsyncIterator
 from google import genai
-from .base.base_generation import BaseLLMGenerationClient
+from .base.base_generation import BaseLLMGenerationClient, delta_frame, done_frame
 from google.genai.types import GenerateContentConfig
+from app.core.concurrency import provider_limiter
 
 
 class GeminiClient(BaseLLMGenerationClient):
@@ -14,6 +14,34 @@ class GeminiClient(BaseLLMGenerationClient):
         self.client = genai.Client(api_key=api_key)
         self.model_name = model
 
+    def _build_request(
+        self,
+        prompt: str,
+        gen_config: Dict[str, Any],
+        instruction: List[str] | None
+    ) -> Dict[str, Any]:
+        return {
+            "model": self.model_name,
+            "contents": [
+                {"role": "user", "parts": [{"text": prompt}]}
+            ],
+            "config": GenerateContentConfig(
+                system_instruction=instruction,
+                temperature=gen_config["temperature"],
+                max_output_tokens=gen_config["max_tokens"],
+                top_p=gen_config["top_p"]
+            )
+        }
+
+    def _usage(self, usage) -> Dict[str, Any] | None:
+        if not usage:
+            return None
+        return {
+            "prompt_tokens": usage.prompt_token_count,
+            "completion_tokens": usage.candidates_token_count,
+            "total_tokens": usage.total_token_count
+        }
+
     async def generate(
         self,
         prompt: str,
@@ -21,22 +49,11 @@ class GeminiClient(BaseLLMGenerationClient):
         instruction: List[str] | None = None
     ) -> Dict[str, Any]:
 
-        def sync_call():
-            return self.client.models.generate_content(
-                model=self.model_name,
-                contents=[
-                    {"role": "user", "parts": [{"text": prompt}]}
-                ],
-                config=GenerateContentConfig(
-                    system_instruction=instruction,
-                    temperature=gen_config["temperature"],
-                    max_output_tokens=gen_config["max_tokens"],
-                    top_p=gen_config["top_p"]
-                )
+        async with provider_limiter.slot("gemini"):
+            response = await self.client.aio.models.generate_content(
+                **self._build_request(prompt, gen_config, instruction)
             )
 
-        response = await asyncio.to_thread(sync_call)
-
         # getting response text & finish reason
         candidate_text = None
         finish_reason = None
@@ -53,10 +70,38 @@ class GeminiClient(BaseLLMGenerationClient):
         return {
             "text": candidate_text,
             "finish_reason": finish_reason,
-            "usage": {
-                "prompt_tokens": usage.prompt_token_count,
-                "completion_tokens": usage.candidates_token_count,
-                "total_tokens": usage.total_token_count
-            },
+            "usage": self._usage(usage),
             "provider": "gemini"
         }
+
+    async def stream(
+        self,
+        prompt: str,
+        gen_config: Dict[str, Any],
+        instruction: List[str] | None = None
+    ) -> AsyncIterator[Dict[str, Any]]:
+
+        finish_reason = None
+        usage = None
+
+        # SDK's async surface streams natively, no executor thread needed
+        async with provider_limiter.slot("gemini"):
+            response = await self.client.aio.models.generate_content_stream(
+                **self._build_request(prompt, gen_config, instruction)
+            )
+
+            async for chunk in response:
+                if chunk.usage_metadata:
+                    usage = chunk.usage_metadata
+
+                if chunk.candidates:
+                    candidate = chunk.candidates[0]
+                    if candidate.finish_reason:
+                        finish_reason = getattr(
+                            candidate.finish_reason, "value", candidate.finish_reason
+                        )
+
+                if chunk.text:
+                    yield delta_frame(chunk.text)
+
+        yield done_frame(finish_reason, self._usage(usage), "gemini")
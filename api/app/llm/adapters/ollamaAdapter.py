@@ -1,6 +1,7 @@
-import httpx
-from typing import Dict, Any, List
-from .base.base_generation import BaseLLMGenerationClient
+import json
+from typing import Dict, Any, List, AsyncIterator
+from app.core.http import http_pool
+from .base.base_generation import BaseLLMGenerationClient, delta_frame, done_frame
 
 
 class OllamaClient(BaseLLMGenerationClient):
@@ -12,13 +13,13 @@ class OllamaClient(BaseLLMGenerationClient):
         self.base_url = base_url.rstrip("/")
         self.model_name = model
 
-    async def generate(
+    def _build_payload(
         self,
-        prompt,
+        prompt: str,
         gen_config: Dict[str, Any],
-        instruction: List[str] | None = None
+        instruction: List[str] | None,
+        stream: bool
     ) -> Dict[str, Any]:
-
         messages = []
 
         if instruction:
@@ -33,10 +34,10 @@ class OllamaClient(BaseLLMGenerationClient):
             "content": prompt
         })
 
-        payload = {
+        return {
             "model": self.model_name,
             "messages": messages,
-            "stream": False,
+            "stream": stream,
             "options": {
                 "temperature": gen_config["temperature"],
                 "top_p": gen_config["top_p"],
@@ -44,11 +45,31 @@ class OllamaClient(BaseLLMGenerationClient):
             }
         }
 
-        async with httpx.AsyncClient(timeout=120.0) as client:
-            response = await client.post(
-                f"{self.base_url}/api/chat",
-                json=payload
+    def _usage(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            # Ollama may not return tokens - may be None
+            "prompt_tokens": data.get("prompt_eval_count"),
+            "completion_tokens": data.get("eval_count"),
+            "total_tokens": (
+                (data.get("prompt_eval_count") or 0) +
+                (data.get("eval_count") or 0)
             )
+        }
+
+    async def generate(
+        self,
+        prompt,
+        gen_config: Dict[str, Any],
+        instruction: List[str] | None = None
+    ) -> Dict[str, Any]:
+
+        payload = self._build_payload(prompt, gen_config, instruction, stream=False)
+
+        response = await http_pool.get("ollama").post(
+            f"{self.base_url}/api/chat",
+            json=payload,
+            timeout=120.0
+        )
 
         response.raise_for_status()
         data = response.json()
@@ -56,14 +77,41 @@ class OllamaClient(BaseLLMGenerationClient):
         return {
             "text": data["message"]["content"],
             "finish_reason": data.get("done_reason"),
-            "usage": {
-                # Ollama may not return tokens - may be None
-                "prompt_tokens": data.get("prompt_eval_count"),
-                "completion_tokens": data.get("eval_count"),
-                "total_tokens": (
-                    (data.get("prompt_eval_count") or 0) +
-                    (data.get("eval_count") or 0)
-                )
-            },
+            "usage": self._usage(data),
             "provider": "ollama"
         }
+
+    async def stream(
+        self,
+        prompt: str,
+        gen_config: Dict[str, Any],
+        instruction: List[str] | None = None
+    ) -> AsyncIterator[Dict[str, Any]]:
+
+        payload = self._build_payload(prompt, gen_config, instruction, stream=True)
+
+        # Ollama streams NDJSON: one message chunk per line, last one has done=true
+        async with http_pool.get("ollama").stream(
+            "POST",
+            f"{self.base_url}/api/chat",
+            json=payload,
+            timeout=120.0
+        ) as response:
+            response.raise_for_status()
+
+            async for line in response.aiter_lines():
+                if not line:
+                    continue
+                data = json.loads(line)
+
+                content = (data.get("message") or {}).get("content")
+                if content:
+                    yield delta_frame(content)
+
+                if data.get("done"):
+                    yield done_frame(
+                        data.get("done_reason"),
+                        self._usage(data),
+                        "ollama"
+                    )
+                    return
@@ -1,6 +1,7 @@
-from openai import OpenAI
-from typing import Dict, Any, List
-from .base.base_generation import BaseLLMGenerationClient
+from openai import AsyncOpenAI
+from typing import Dict, Any, List, AsyncIterator
+from app.core.concurrency import provider_limiter
+from .base.base_generation import BaseLLMGenerationClient, delta_frame, done_frame
 
 
 class OpenAiClient(BaseLLMGenerationClient):
@@ -9,16 +10,14 @@ class OpenAiClient(BaseLLMGenerationClient):
         api_key: str,
         model: str,
     ):
-        self.client = OpenAI(api_key=api_key)
+        self.client = AsyncOpenAI(api_key=api_key)
         self.model_name = model
 
-    async def generate(
+    def _build_messages(
         self,
         prompt: str,
-        gen_config: Dict[str, Any],
-        instruction: List[str] | None = None
-    ) -> Dict[str, Any]:
-
+        instruction: List[str] | None
+    ) -> List[Dict[str, str]]:
         messages = []
 
         if instruction:
@@ -32,13 +31,23 @@ class OpenAiClient(BaseLLMGenerationClient):
             "content": prompt
         })
 
-        response = await self.client.chat.completions.create(
-            model=self.model_name,
-            messages=messages,
-            temperature=gen_config["temperature"],
-            top_p=gen_config["top_p"],
-            max_tokens=gen_config["max_tokens"],
-        )
+        return messages
+
+    async def generate(
+        self,
+        prompt: str,
+        gen_config: Dict[str, Any],
+        instruction: List[str] | None = None
+    ) -> Dict[str, Any]:
+
+        async with provider_limiter.slot("openai"):
+            response = await self.client.chat.completions.create(
+                model=self.model_name,
+                messages=self._build_messages(prompt, instruction),
+                temperature=gen_config["temperature"],
+                top_p=gen_config["top_p"],
+                max_tokens=gen_config["max_tokens"],
+            )
 
         choice = response.choices[0]
 
@@ -52,3 +61,41 @@ class OpenAiClient(BaseLLMGenerationClient):
             },
             "provider": "openai"
         }
+
+    async def stream(
+        self,
+        prompt: str,
+        gen_config: Dict[str, Any],
+        instruction: List[str] | None = None
+    ) -> AsyncIterator[Dict[str, Any]]:
+
+        finish_reason = None
+        usage = None
+
+        async with provider_limiter.slot("openai"):
+            stream = await self.client.chat.completions.create(
+                model=self.model_name,
+                messages=self._build_messages(prompt, instruction),
+                temperature=gen_config["temperature"],
+                top_p=gen_config["top_p"],
+                max_tokens=gen_config["max_tokens"],
+                stream=True,
+                stream_options={"include_usage": True},
+            )
+
+            async for chunk in stream:
+                # usage arrives in the last chunk with empty choices
+                if chunk.usage:
+                    usage = {
+                        "prompt_tokens": chunk.usage.prompt_tokens,
+                        "completion_tokens": chunk.usage.completion_tokens,
+                        "total_tokens": chunk.usage.total_tokens,
+                    }
+
+                for choice in chunk.choices:
+                    if choice.delta and choice.delta.content:
+                        yield delta_frame(choice.delta.content)
+                    if choice.finish_reason:
+                        finish_reason = choice.finish_reason
+
+        yield done_frame(finish_reason, usage, "openai")
@@ -1,5 +1,5 @@
-import httpx
 from typing import Optional, Dict
+from app.core.http import http_pool
 from .base.base_generation import BaseLLMGenerationClient
 
 
@@ -36,11 +36,14 @@ class QwenTTSClient(BaseLLMGenerationClient):
         }
         payload.update(self._sanitize_gen_config(gen_config))
 
-        async with httpx.AsyncClient(timeout=120.0) as client:
-            resp = await client.post(f"{self.base_url}/tts", json=payload)
-            if resp.status_code >= 400:
-                raise RuntimeError(f"TTS error {resp.status_code}: {resp.text}")
-            data = resp.json()
+        resp = await http_pool.get("tts").post(
+            f"{self.base_url}/tts",
+            json=payload,
+            timeout=120.0
+        )
+        if resp.status_code >= 400:
+            raise RuntimeError(f"TTS error {resp.status_code}: {resp.text}")
+        data = resp.json()
 
         # Контракт: всегда возвращаем audio_base64 и provider
         return {
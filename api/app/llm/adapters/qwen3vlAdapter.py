@@ -1,8 +1,8 @@
-import httpx
 from typing import Dict, Any, List, Optional
 from PIL import Image
 import io
 import base64
+from app.core.http import http_pool
 from .base.base_generation import BaseLLMGenerationClient
 
 
@@ -62,18 +62,18 @@ class Qwen3VLClient(BaseLLMGenerationClient):
             image.save(buf, format="PNG")
             payload["image"] = base64.b64encode(buf.getvalue()).decode()
 
-        async with httpx.AsyncClient(timeout=180.0) as client:
-            response = await client.post(
-                f"{self.base_url}/generate",
-                json=payload
-            )
+        response = await http_pool.get("qwen3vl").post(
+            f"{self.base_url}/generate",
+            json=payload,
+            timeout=180.0
+        )
 
-            if response.status_code >= 400:
-                raise RuntimeError(
-                    f"LLM error {response.status_code}: {response.text}"
-                )
+        if response.status_code >= 400:
+            raise RuntimeError(
+                f"LLM error {response.status_code}: {response.text}"
+            )
 
-            data = response.json()
+        data = response.json()
 
         return {
             "text": data.get("text"),
@@ -1,3 +1,5 @@
+from functools import lru_cache
+
 from app.core.config import settings
 from app.llm.adapters.geminiAdapter import GeminiClient
 from app.llm.adapters.openAIAdapter import OpenAiClient
@@ -41,3 +43,12 @@ class LLMClientFactory:
         if not client:
             raise ValueError(f"No LLM client found for provider '{provider}'")
         return client
+
+
+@lru_cache(maxsize=None)
+def get_llm_factory() -> LLMClientFactory:
+    """
+    Process-wide factory: SDK clients and their connection pools
+    are built once and shared by the API and the worker
+    """
+    return LLMClientFactory()
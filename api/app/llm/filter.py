@@ -118,12 +118,26 @@ def refusal_response(reason: str):
     }
 
 
+def fallback_response():
+    return {
+        "status": "fallback",
+        "answer": """
+        I might be mistaken.
+        Please rephrase your question or narrow the scope.
+        """,
+        "confidence": "low"
+    }
+
+
 def validate_llm_output(output) -> bool:
     if not output:
         return False
 
     if isinstance(output, dict):
-        text = output.get("answer") or output.get("text")
+        result = output.get("result")
+        text = output.get("answer") or output.get("text") or (
+            result.get("text") if isinstance(result, dict) else None
+        )
     else:
         text = str(output)
 
@@ -138,3 +152,20 @@ def validate_llm_output(output) -> bool:
         return False
 
     return True
+
+
+def validate_partial_output(text: str, delta: str) -> bool:
+    """
+    Incremental validate_llm_output for streamed answers.
+    text: everything received so far (delta included)
+    Only the tail that can contain a new forbidden match is scanned.
+    """
+    if len(text) > settings.MAX_RESPONSE_LENGTH:
+        return False
+
+    longest = max((len(f) for f in settings.FORBIDDEN_LLM_OUTPUT), default=0)
+    tail = text[-(len(delta) + longest):].lower()
+    if any(f in tail for f in settings.FORBIDDEN_LLM_OUTPUT):
+        return False
+
+    return True
@@ -0,0 +1,79 @@
+import hashlib
+import json
+import re
+import unicodedata
+
+from app.llm.config import DEFAULT_GEN_CONFIG
+from app.llm.runner import DEFAULT_INSTRUCTION
+
+FINGERPRINT_VERSION = "v2"
+
+
+def canonical_text(text: str | None) -> str:
+    """Unicode NFC + trimmed + collapsed whitespace (case is kept)"""
+    if not text:
+        return ""
+    text = unicodedata.normalize("NFC", text)
+    return re.sub(r"\s+", " ", text).strip()
+
+
+def canonical_instruction(instruction: list[str] | str | None) -> list[str]:
+    """Same list the runner sends to the model (default applied)"""
+    if isinstance(instruction, str):
+        instruction = [instruction]
+    instruction = [canonical_text(i) for i in instruction or [] if canonical_text(i)]
+    return instruction or DEFAULT_INSTRUCTION
+
+
+def canonical_gen_config(gen_config: dict | None) -> dict:
+    """Effective generation config without unset keys"""
+    return {
+        k: v for k, v in (gen_config or DEFAULT_GEN_CONFIG).items()
+        if v is not None
+    }
+
+
+def canonical_json(obj) -> str:
+    return json.dumps(obj, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+
+
+def _hash(obj) -> str:
+    return hashlib.sha256(canonical_json(obj).encode("utf-8")).hexdigest()
+
+
+def request_fingerprint(
+    prompt: str,
+    provider: str,
+    model: str,
+    gen_config: dict | None = None,
+    instruction: list[str] | str | None = None
+) -> str:
+    """
+    Fixed-size identity of an LLM request.
+    Requests that differ only in whitespace / dict ordering
+    share the same fingerprint.
+    """
+    return _hash({
+        "v": FINGERPRINT_VERSION,
+        "prompt": canonical_text(prompt),
+        "instruction": canonical_instruction(instruction),
+        "provider": provider,
+        "model": model,
+        "gen_config": canonical_gen_config(gen_config),
+    })
+
+
+def scope_fingerprint(
+    provider: str,
+    model: str,
+    gen_config: dict | None = None,
+    instruction: list[str] | str | None = None
+) -> str:
+    """Everything but the prompt: answers are reusable only within one scope"""
+    return _hash({
+        "v": FINGERPRINT_VERSION,
+        "instruction": canonical_instruction(instruction),
+        "provider": provider,
+        "model": model,
+        "gen_config": canonical_gen_config(gen_config),
+    })
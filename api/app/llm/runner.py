@@ -1,10 +1,14 @@
 import asyncio
 import logging
+from typing import AsyncIterator
 from .normalizer import normalize_llm_response
 
 logger = logging.getLogger(__name__)
 logging.basicConfig(level=logging.INFO)
 
+# TODO: default instruction conf needed
+DEFAULT_INSTRUCTION = ["You are a professional teacher. Explain simply."]
+
 
 async def run_llm_async(
     prompt: str,
@@ -23,8 +27,7 @@ async def run_llm_async(
     - proper timeout
     """
 
-    # TODO: default instruction conf needed
-    instruction = instruction or ["You are a professional teacher. Explain simply."]
+    instruction = instruction or DEFAULT_INSTRUCTION
 
     logger.info(f"LLM async request started: prompt='{prompt[:50]}...'")
 
@@ -66,3 +69,46 @@ async def run_llm_async(
     raise RuntimeError(
         f"LLM request failed after {max_retries} attempts"
     )
+
+
+async def stream_llm_async(
+    prompt: str,
+    gen_config: dict,
+    client,
+    instruction: list[str] | str | None = None,
+    timeout: float = 120.0
+) -> AsyncIterator[dict]:
+    """
+    Streaming LLM runner:
+    - yields adapter frames (delta..., done)
+    - timeout is applied between frames (idle timeout),
+      so long answers are not cut while tokens keep coming
+    - no retries: a partially sent answer can't be replayed
+    """
+
+    if isinstance(instruction, str):
+        instruction = [instruction]
+    instruction = instruction or DEFAULT_INSTRUCTION
+
+    logger.info(f"LLM stream request started: prompt='{prompt[:50]}...'")
+
+    frames = client.stream(
+        prompt=prompt,
+        gen_config=gen_config,
+        instruction=instruction,
+    ).__aiter__()
+
+    try:
+        while True:
+            try:
+                frame = await asyncio.wait_for(frames.__anext__(), timeout=timeout)
+            except StopAsyncIteration:
+                break
+
+            yield frame
+
+            if frame["type"] == "done":
+                logger.info("LLM stream finished")
+                break
+    finally:
+        await frames.aclose()
@@ -12,9 +12,13 @@ from app.api.tts import router as tts_router
 from app.api.eval import router as eval_router
 from app.api import embeddings
 from app.dependencies.auth import auth_dependency
-from app.infra.db.qdrant import create_collection
+from app.infra.db import qdrant
+from app.infra.pdf_loader import shutdown_pdf_pool
+from app.inference.job_events import job_events
 from app.middlewares.body import body_middleware
 from app.container import embedding_service, vector_store
+from app.core.config import settings
+from app.core.http import http_pool
 from app.middlewares.observability import ObservabilityMiddleware
 from app.startup import create_initial_admin
 
@@ -40,25 +44,35 @@ app.include_router(eval_router)
 
 @app.on_event("startup")
 async def startup():
+    await http_pool.startup()
 
-    texts = [
-        "FastAPI tutorial",
-        "How to cook pasta",
-        "Vector databases and embeddings",
-        "Python async programming",
-        "Machine learning basics"
-    ]
+    # persisted FAISS index: sample texts are embedded only on the first start
+    if not await vector_store.aload(mmap=settings.VECTOR_STORE_MMAP):
+        texts = [
+            "FastAPI tutorial",
+            "How to cook pasta",
+            "Vector databases and embeddings",
+            "Python async programming",
+            "Machine learning basics"
+        ]
+        embeddings = await embedding_service.client.embed(texts)
+        vector_store.build(embeddings, texts)
+        await vector_store.asave()
 
-    embeddings = []
-    for t in texts:
-        vec = await embedding_service.embed(t)
-        embeddings.append(vec)
+    await qdrant.create_collection()
+    await qdrant.create_payload_index("documents", "document_id", "keyword")
 
-    vector_store.build(embeddings, texts)
+    await create_initial_admin()
 
-    create_collection()
 
-    await create_initial_admin()
+@app.on_event("shutdown")
+async def shutdown():
+    await http_pool.aclose()
+    await qdrant.close()
+    await job_events.aclose()
+    shutdown_pdf_pool()
+    if vector_store.dirty:
+        await vector_store.asave()
 
 
 @app.get("/health", tags=["health"], dependencies=[Depends(auth_dependency)])
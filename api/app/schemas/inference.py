@@ -1,6 +1,6 @@
-from typing import Optional
+from typing import Any, Optional
 from uuid import UUID
-from pydantic import BaseModel
+from pydantic import BaseModel, HttpUrl
 
 
 # DTO for req
@@ -8,7 +8,7 @@ class InferenceRequest(BaseModel):
     prompt: str
     model: str = "gemini"
     temperature: float = 0.7
-    callback_url: Optional[str] = None
+    callback_url: Optional[HttpUrl] = None
 
 
 # DTO for res
@@ -29,3 +29,12 @@ class InferenceStatusResponse(BaseModel):
     status: str
     result: Optional[InferenceResult]
     error: str | None = None
+
+
+# DTO for /wait and /events: any job type
+class JobStateResponse(BaseModel):
+    job_id: UUID
+    status: str
+    result: Any = None
+    error: str | None = None
+    progress: Optional[dict] = None
@@ -0,0 +1,12 @@
+from typing import Optional
+from uuid import UUID
+from pydantic import BaseModel
+
+
+# DTO for ingestion job status res
+class IngestionJobStatusResponse(BaseModel):
+    job_id: UUID
+    status: str
+    progress: Optional[dict] = None     # pages / chunks embedded so far
+    result: Optional[dict] = None       # document_id, num_chunks, timings
+    error: str | None = None
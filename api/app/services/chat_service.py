@@ -1,13 +1,19 @@
-import json
 import logging
+from typing import AsyncIterator
 
 from fastapi import Request
 from app.core.timing import track_timing
-from app.llm.factory import LLMClientFactory
-from app.llm.runner import run_llm_async
+from app.llm.adapters.base.base_generation import delta_frame, done_frame
+from app.llm.factory import get_llm_factory
+from app.llm.fingerprint import FINGERPRINT_VERSION, request_fingerprint
+from app.llm.normalizer import normalize_llm_response
+from app.llm.runner import run_llm_async, stream_llm_async
 from app.llm.config import DEFAULT_GEN_CONFIG
 from app.core.config import settings
-from app.core.redis import redis_client
+from app.services.semantic_cache import SemanticCache
+from app.core.cache import cache, decode_value, encode_value
+from app.core.singleflight import singleflight
+from app.container import embedding_service
 
 logger = logging.getLogger(__name__)
 logging.basicConfig(level=logging.INFO)
@@ -17,22 +23,26 @@ class ChatService:
     CACHE_TTL = 3600  # 1h
 
     def __init__(self):
-        self.llm_factory = LLMClientFactory()
+        self.llm_factory = get_llm_factory()
+        self.semantic_cache = SemanticCache(embedding_service)
 
     def _get_chat_key(
         self,
         prompt: str,
         provider: str,
+        model: str,
         gen_config: dict | None = None,
         instruction: str | None = None
     ) -> str:
-        """Generating key for Redis Cache"""
-        key = f"llm_cache:v1:{provider}:prompt={prompt}"
-        if gen_config:
-            key += f":config={str(sorted(gen_config.items()))}"
-        if instruction:
-            key += f":instruction={instruction}"
-        return key
+        """Generating key for Redis Cache (fixed-size request fingerprint)"""
+        fingerprint = request_fingerprint(
+            prompt=prompt,
+            provider=provider,
+            model=model,
+            gen_config=gen_config,
+            instruction=instruction
+        )
+        return f"llm_cache:{FINGERPRINT_VERSION}:{provider}:{fingerprint}"
 
     async def chat(
         self,
@@ -50,68 +60,187 @@ class ChatService:
         except ValueError:
             raise ValueError(f"Provider '{provider}' is not available")
 
-        key = self._get_chat_key(prompt, provider, gen_config, instruction)
+        key = self._get_chat_key(
+            prompt, provider, client.model_name, gen_config, instruction
+        )
 
         # ===== Cache check =====
         if request:
             with track_timing(request, "cache_check"):
-                cached = redis_client.get(key)
+                cached = await cache.get(key)
         else:
-            cached = redis_client.get(key)
+            cached = await cache.get(key)
 
         if cached:
             logger.info(f"ChatService: Cache hit for provider '{provider}'")
-            return json.loads(cached)
-
+            return decode_value(cached)
+
+        # ===== Semantic cache (opt-in): paraphrases of answered prompts =====
+        prompt_vector = None
+        if settings.SEMANTIC_CACHE_ENABLED:
+            cached, prompt_vector = await self.semantic_cache.lookup(
+                prompt, provider, client.model_name, gen_config, instruction, request
+            )
+            if cached:
+                return cached
+
+        # ===== Single-flight: identical in-flight requests share one LLM call =====
+        # the shared call knows nothing of the callers' requests:
+        # each caller times its own wait and takes token usage from the result
+        generate = singleflight.do(
+            key,
+            fn=lambda: self._generate(
+                key, prompt, provider, client, gen_config, instruction, timeout,
+                prompt_vector
+            ),
+            load=lambda: self._load_cached(key)
+        )
+        if not request:
+            return await generate
+
+        with track_timing(request, "llm_call"):
+            response = await generate
+        self._track_tokens(request, response)
+        return response
+
+    @staticmethod
+    def _track_tokens(request: Request | dict, response: dict):
+        """TOKEN ACCOUNTING (source of truth): provider usage of the answer"""
+        usage = response.get("usage") \
+            or ((response.get("meta") or {}).get("raw") or {}).get("usage")
+        if not usage or not hasattr(request, "state"):
+            return
+        request.state.tokens["prompt_tokens"] = usage.get("prompt_tokens", 0)
+        request.state.tokens["completion_tokens"] = usage.get("completion_tokens", 0)
+        request.state.tokens["total_tokens"] = usage.get("total_tokens", 0)
+
+    async def _load_cached(self, key: str):
+        return decode_value(await cache.get(key))
+
+    async def _generate(
+        self,
+        key: str,
+        prompt: str,
+        provider: str,
+        client,
+        gen_config: dict | None,
+        instruction: str | None,
+        timeout: float | None,
+        prompt_vector: list[float] | None = None
+    ) -> dict:
+        """
+        LLM call + cache write. Returns the response as a dict, the same
+        shape a cache hit or another worker's result (load) has
+        """
         logger.info(f"ChatService sending prompt to '{provider}': '{prompt[:100]}...'")
 
         try:
             # ===== LLM call =====
-            if request:
-                with track_timing(request, "llm_call"):
-                    response = await run_llm_async(
-                        prompt=prompt,
-                        gen_config=gen_config or DEFAULT_GEN_CONFIG,
-                        client=client,
-                        instruction=instruction,
-                        max_retries=settings.MAX_RETRIES,
-                        timeout=timeout
-                    )
-            else:
-                response = await run_llm_async(
-                    prompt=prompt,
-                    gen_config=gen_config or DEFAULT_GEN_CONFIG,
-                    client=client,
-                    instruction=instruction,
-                    max_retries=settings.MAX_RETRIES,
-                    timeout=timeout
-                )
-
-            # ===== TOKEN ACCOUNTING (source of truth) =====
-            if request and hasattr(response, "meta"):
-                usage = response.meta.get("raw", {}).get("usage")
-                if usage:
-                    request.state.tokens["prompt_tokens"] = usage.get(
-                        "prompt_tokens", 0
-                    )
-                    request.state.tokens["completion_tokens"] = usage.get(
-                        "completion_tokens", 0
-                    )
-                    request.state.tokens["total_tokens"] = usage.get(
-                        "total_tokens", 0
-                    )
+            response = await run_llm_async(
+                prompt=prompt,
+                gen_config=gen_config or DEFAULT_GEN_CONFIG,
+                client=client,
+                instruction=instruction,
+                max_retries=settings.MAX_RETRIES,
+                timeout=timeout
+            )
 
             # ===== Cache write =====
             response_dict = response.dict()
-            if request:
-                with track_timing(request, "cache_write"):
-                    redis_client.setex(key, self.CACHE_TTL, json.dumps(response_dict))
-            else:
-                redis_client.setex(key, self.CACHE_TTL, json.dumps(response_dict))
+            await cache.set(key, encode_value(response_dict), self.CACHE_TTL)
+
+            if prompt_vector is not None:
+                await self.semantic_cache.store(
+                    prompt, prompt_vector, response_dict,
+                    provider, client.model_name, gen_config, instruction
+                )
 
             logger.info(f"ChatService received response from '{provider}' and cached it")
-            return response
+            return response_dict
 
         except Exception as e:
             logger.exception(f"ChatService failed for prompt: {prompt}, exception: {e}")
             raise
+
+    async def stream(
+        self,
+        prompt: str,
+        provider: str | None = None,
+        gen_config: dict | None = None,
+        instruction: str | None = None,
+        timeout: float | None = None,
+        request: Request | None = None
+    ) -> AsyncIterator[dict]:
+        """
+        Streaming counterpart of chat(): yields delta frames and a final done frame.
+        A cache hit is replayed as a single delta;
+        the full answer is cached only after the stream completes, and
+        only if it isn't empty (a failed stream never reaches the cache).
+        """
+        provider = provider or settings.DEFAULT_PROVIDER
+
+        try:
+            client = self.llm_factory.get(provider)
+        except ValueError:
+            raise ValueError(f"Provider '{provider}' is not available")
+
+        key = self._get_chat_key(
+            prompt, provider, client.model_name, gen_config, instruction
+        )
+
+        # ===== Cache check =====
+        cached = await cache.get(key)
+        if cached:
+            logger.info(f"ChatService: Cache hit for provider '{provider}' (stream)")
+            data = decode_value(cached)
+            yield delta_frame(data["result"]["text"])
+            yield done_frame(
+                data["result"].get("finish_reason"),
+                data.get("usage"),
+                (data.get("meta") or {}).get("provider")
+            )
+            return
+
+        logger.info(f"ChatService streaming prompt to '{provider}': '{prompt[:100]}...'")
+
+        gen_config = gen_config or DEFAULT_GEN_CONFIG
+        parts = []
+
+        async for frame in stream_llm_async(
+            prompt=prompt,
+            gen_config=gen_config,
+            client=client,
+            instruction=instruction,
+            timeout=timeout
+        ):
+            if frame["type"] == "delta":
+                parts.append(frame["text"])
+                yield frame
+                continue
+
+            # ===== done frame =====
+            usage = frame.get("usage")
+            if request and usage:
+                request.state.tokens["prompt_tokens"] = usage.get("prompt_tokens", 0)
+                request.state.tokens["completion_tokens"] = usage.get(
+                    "completion_tokens", 0
+                )
+                request.state.tokens["total_tokens"] = usage.get("total_tokens", 0)
+
+            text = "".join(parts)
+            if text.strip():
+                response = normalize_llm_response(
+                    model=client.model_name,
+                    prompt=prompt,
+                    gen_config=gen_config,
+                    raw_response={**frame, "text": text}
+                )
+                await cache.set(key, encode_value(response.dict()), self.CACHE_TTL)
+                logger.info(
+                    f"ChatService streamed response from '{provider}' and cached it"
+                )
+            else:
+                # the endpoint answers with a fallback, don't replay it from cache
+                logger.warning(f"ChatService: empty stream from '{provider}', not cached")
+
+            yield frame
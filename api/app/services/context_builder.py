@@ -0,0 +1,169 @@
+from dataclasses import dataclass, field
+from typing import List
+
+import numpy as np
+
+from app.core.config import settings
+from app.core.tokens import count_tokens, count_tokens_batch
+from app.embeddings.schemas import SimilarityResult
+
+# "[n] " label + separator between blocks
+BLOCK_OVERHEAD_TOKENS = 4
+# shorter shared edges are coincidences, not chunk overlap
+MIN_OVERLAP_CHARS = 8
+
+
+@dataclass
+class ContextBlock:
+    """One or more adjacent chunks of a document, overlap removed"""
+    text: str
+    chunks: List[SimilarityResult] = field(default_factory=list)
+    tokens: int = 0
+
+    @property
+    def score(self) -> float:
+        return max(c.score for c in self.chunks)
+
+
+def context_window(model: str | None) -> int:
+    if model:
+        matches = [p for p in settings.MODEL_CONTEXT_WINDOWS if model.startswith(p)]
+        if matches:
+            return settings.MODEL_CONTEXT_WINDOWS[max(matches, key=len)]
+    return settings.DEFAULT_CONTEXT_WINDOW
+
+
+def context_budget(model: str | None, gen_config: dict, prompt_overhead: str) -> int:
+    """
+    Tokens left for context: model window minus the reserved answer
+    and the rest of the prompt, capped by RAG_MAX_CONTEXT_TOKENS
+    """
+    reserve = gen_config.get("max_tokens") or settings.RAG_OUTPUT_RESERVE_TOKENS
+    overhead = count_tokens(prompt_overhead, model=model)
+    available = context_window(model) - reserve - overhead
+    return max(0, min(settings.RAG_MAX_CONTEXT_TOKENS, available))
+
+
+def mmr_select(
+    candidates: List[SimilarityResult],
+    k: int,
+    lambda_: float = settings.RAG_MMR_LAMBDA
+) -> List[SimilarityResult]:
+    """
+    Maximal marginal relevance: picks k chunks that are relevant but not
+    near-duplicates of each other. Relevance is the retrieval score
+    (min-max normalized, so it works for cosine and RRF scores alike);
+    redundancy is the max cosine similarity to already picked chunks.
+    Candidates without vectors only count as redundant if their text is
+    contained in a picked chunk.
+    """
+    if len(candidates) <= 1 or k <= 0:
+        return candidates[:k]
+
+    scores = np.array([c.score for c in candidates], dtype=np.float32)
+    span = scores.max() - scores.min()
+    relevance = (scores - scores.min()) / span if span > 0 else np.ones_like(scores)
+
+    dim = next((len(c.vector) for c in candidates if c.vector), 0)
+    vectors = np.zeros((len(candidates), dim), dtype=np.float32)
+    for i, c in enumerate(candidates):
+        if c.vector and len(c.vector) == dim:
+            vectors[i] = c.vector
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    vectors = np.divide(vectors, norms, out=np.zeros_like(vectors), where=norms > 0)
+
+    selected: List[int] = []
+    redundancy = np.zeros(len(candidates), dtype=np.float32)
+    remaining = list(range(len(candidates)))
+    while remaining and len(selected) < k:
+        best = max(
+            remaining,
+            key=lambda i: lambda_ * relevance[i] - (1 - lambda_) * redundancy[i]
+        )
+        selected.append(best)
+        remaining.remove(best)
+
+        similarity = vectors @ vectors[best]
+        for i in remaining:
+            if candidates[i].document in candidates[best].document:
+                similarity[i] = 1.0
+        redundancy = np.maximum(redundancy, similarity)
+
+    return [candidates[i] for i in selected]
+
+
+def trim_overlap(left: str, right: str) -> str:
+    """`right` without the prefix it shares with the end of `left`"""
+    if not right:
+        return right
+    # earliest match = longest overlap
+    pos = left.find(right[0], max(0, len(left) - len(right)))
+    while pos != -1 and len(left) - pos >= MIN_OVERLAP_CHARS:
+        if right.startswith(left[pos:]):
+            return right[len(left) - pos:].lstrip()
+        pos = left.find(right[0], pos + 1)
+    return right
+
+
+def merge_adjacent(chunks: List[SimilarityResult]) -> List[ContextBlock]:
+    """
+    Joins chunks that follow each other in the same document into one
+    block (overlap trimmed). Blocks keep the order of their best chunk.
+    """
+    blocks: List[ContextBlock] = []
+    block_of: dict[tuple[str, int], ContextBlock] = {}
+
+    positioned = sorted(
+        (c for c in chunks if c.document_id is not None and c.chunk_index is not None),
+        key=lambda c: (c.document_id, c.chunk_index)
+    )
+    for chunk in positioned:
+        prev = block_of.get((chunk.document_id, chunk.chunk_index - 1))
+        if prev is not None:
+            tail = trim_overlap(prev.chunks[-1].document, chunk.document)
+            prev.text = f"{prev.text} {tail}"
+            prev.chunks.append(chunk)
+            block = prev
+        else:
+            block = ContextBlock(text=chunk.document, chunks=[chunk])
+        block_of[(chunk.document_id, chunk.chunk_index)] = block
+
+    seen: set[int] = set()
+    for chunk in chunks:
+        if chunk.document_id is not None and chunk.chunk_index is not None:
+            block = block_of[(chunk.document_id, chunk.chunk_index)]
+        else:
+            block = ContextBlock(text=chunk.document, chunks=[chunk])
+        if id(block) not in seen:
+            seen.add(id(block))
+            blocks.append(block)
+    return blocks
+
+
+def pack(
+    blocks: List[ContextBlock],
+    budget: int,
+    model: str | None
+) -> List[ContextBlock]:
+    """Greedy packing in relevance order; a block that doesn't fit is skipped"""
+    counts = count_tokens_batch([b.text for b in blocks], model=model)
+    packed = []
+    used = 0
+    for block, tokens in zip(blocks, counts):
+        block.tokens = tokens + BLOCK_OVERHEAD_TOKENS
+        if used + block.tokens > budget:
+            continue
+        packed.append(block)
+        used += block.tokens
+    return packed
+
+
+def build_context(
+    candidates: List[SimilarityResult],
+    top_k: int,
+    budget: int,
+    model: str | None = None,
+) -> List[ContextBlock]:
+    """MMR selection -> merge of adjacent chunks -> packing to the token budget"""
+    selected = mmr_select(candidates, top_k)
+    return pack(merge_adjacent(selected), budget, model)
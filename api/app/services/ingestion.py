@@ -1,13 +1,24 @@
+import asyncio
+import hashlib
+import os
+import shutil
+import tempfile
+import time
 import uuid
-from typing import List
+from contextlib import aclosing, contextmanager
+from typing import Awaitable, Callable, List
+from qdrant_client.http.models import PointStruct
+from sqlalchemy import delete, select, update
+from sqlalchemy.dialects.postgresql import insert
 from app.core.timing import track_timing
-from app.core.tokens import count_tokens
+from app.core.tokens import count_tokens, count_tokens_batch
 from app.core.logging import logger
-from app.infra.pdf_loader import load_pdf
-from app.infra.chunker import chunk_text
+from app.infra.pdf_loader import count_pages, get_pdf_pool, iter_pdf_pages
+from app.infra.chunker import StreamChunker
 from app.embeddings.factory import get_embedding_client
+from app.embeddings.clients.base.embedding_client import EmbeddingClient
 from app.infra.db.pg import session_context
-from app.infra.db.qdrant import upsert_embedding
+from app.infra.db import qdrant
 from app.infra.db.models.models import Document, Embedding
 from app.core.config import settings
 
@@ -22,124 +33,552 @@ class EmbeddingLimitExceeded(Exception):
     pass
 
 
-async def ingest_pdf(
-    file_path: str,
+# Chunk and file hashes are scoped to the embedding model: vectors are
+# reused and documents skipped as unchanged only for the same model.
+
+def content_hash(text: str, model: str | None = None) -> str:
+    if model:
+        text = f"{model}\x00{text}"
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+async def hash_file(path: str, model: str | None = None) -> str:
+    def digest() -> str:
+        h = hashlib.sha256()
+        if model:
+            h.update(f"{model}\x00".encode("utf-8"))
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1024 * 1024), b""):
+                h.update(block)
+        return h.hexdigest()
+
+    return await asyncio.to_thread(digest)
+
+
+def chunk_id(doc_id: str, chunk_hash: str) -> str:
+    """
+    Same id for the PG row and the Qdrant point;
+    stays the same while the chunk text doesn't change
+    """
+    return str(uuid.uuid5(uuid.UUID(doc_id), chunk_hash))
+
+
+async def store_chunks(
+    doc_id: str,
     source: str,
-    timings: dict,
-    tokens: dict,
+    chunks: List[str],
+    vectors: List[List[float]],
+    indexes: List[int],
+    hashes: List[str],
+    collection_name: str = "documents",
+    existing_ids: set[str] | None = None,
 ):
-    # PDF → text
-    if timings is not None:
-        with track_timing(timings, "load_pdf"):
-            text = load_pdf(file_path)
-    else:
-        text = load_pdf(file_path)
-
-    # count pdf tokens
-    if tokens is not None:
-        tokens["raw_text_tokens"] = count_tokens(text)
-
-    # text → chunks
-    if timings is not None:
-        with track_timing(timings, "chunk_text"):
-            chunks: List[str] = chunk_text(
-                text, chunk_size=CHUNK_SIZE,
-                overlap=CHUNK_OVERLAP
+    """
+    Bulk write of a batch of chunks: batched Qdrant upserts and a
+    multi-row INSERT into PG, running concurrently. PG is committed only
+    after both succeed; if either fails, the batch's new Qdrant points
+    are removed (`existing_ids` were stored before and are kept).
+    Writes are idempotent (upserts), so a batch can safely be stored again.
+    """
+    ids = [chunk_id(doc_id, h) for h in hashes]
+
+    points = [
+        PointStruct(
+            id=emb_id,
+            vector=vector,
+            payload={"content": chunk, "document_id": doc_id, "chunk_index": idx}
+        )
+        for idx, emb_id, chunk, vector in zip(indexes, ids, chunks, vectors)
+    ]
+    rows = [
+        {
+            "id": uuid.UUID(emb_id),
+            "document_id": uuid.UUID(doc_id),
+            "chunk_index": idx,
+            "content": chunk,
+            "content_hash": h,
+            "embedding": vector,
+        }
+        for idx, emb_id, chunk, h, vector in zip(indexes, ids, chunks, hashes, vectors)
+    ]
+
+    async with session_context() as session:
+        async def write_pg():
+            await session.execute(
+                insert(Document)
+                .values(id=uuid.UUID(doc_id), source=source)
+                .on_conflict_do_nothing(index_elements=["id"])
             )
-    else:
-        chunks: List[str] = chunk_text(
-            text, chunk_size=CHUNK_SIZE,
-            overlap=CHUNK_OVERLAP
+            if rows:
+                # executemany -> batched multi-row INSERT;
+                # a known chunk may only have moved
+                stmt = insert(Embedding)
+                await session.execute(
+                    stmt.on_conflict_do_update(
+                        index_elements=["id"],
+                        set_={"chunk_index": stmt.excluded.chunk_index}
+                    ),
+                    rows
+                )
+
+        results = await asyncio.gather(
+            write_pg(),
+            qdrant.upsert_points_batched(collection_name, points),
+            return_exceptions=True
         )
+        pg_error, qdrant_error = results
+
+        if pg_error is None and qdrant_error is None:
+            await session.commit()
+            return
 
-    # count chunk tokens
-    num_chunks = len(chunks)
-    total_tokens = sum(count_tokens(c) for c in chunks)
+        await session.rollback()
 
-    if num_chunks > MAX_EMBED_CHUNKS:
-        logger.warning(
-            "Ingestion truncated: too many chunks",
-            extra={
-                "original_chunks": num_chunks,
-                "used_chunks": MAX_EMBED_CHUNKS,
-            }
+    # don't leave orphan points without PG rows, also when only some
+    # of the Qdrant batches went through
+    orphans = [i for i in ids if i not in (existing_ids or ())]
+    if orphans:
+        try:
+            await qdrant.delete_points(collection_name, orphans)
+        except Exception as e:
+            logger.warning(f"Failed to clean up Qdrant points of {doc_id}: {e!r}")
+
+    raise pg_error or qdrant_error
+
+
+async def find_document(source: str) -> Document | None:
+    async with session_context() as session:
+        result = await session.execute(
+            select(Document).where(Document.source == source).limit(1)
         )
-        chunks = chunks[:MAX_EMBED_CHUNKS]
-        if tokens is not None:
-            tokens["truncated_chunks"] = True
-        num_chunks = len(chunks)
+        return result.scalar_one_or_none()
 
-    if total_tokens > MAX_EMBED_TOKENS:
-        raise EmbeddingLimitExceeded(
-            f"Ingestion aborted: total tokens {total_tokens} "
-            f"exceed MAX_EMBED_TOKENS={MAX_EMBED_TOKENS}"
+
+async def load_document_chunks(doc_id: str) -> list[tuple[str, str | None, int]]:
+    """(id, content_hash, chunk_index) of every stored chunk of a document"""
+    async with session_context() as session:
+        result = await session.execute(
+            select(Embedding.id, Embedding.content_hash, Embedding.chunk_index)
+            .where(Embedding.document_id == uuid.UUID(doc_id))
         )
+        return [(str(row[0]), row[1], row[2]) for row in result.all()]
 
-    if tokens is not None:
-        tokens["chunk_tokens"] = sum(count_tokens(c) for c in chunks)
-        tokens["num_chunks"] = num_chunks
 
-    # chunks → embeddings
-    embedding_client = get_embedding_client(provider=settings.EMBEDDING_PROVIDER)
-    if timings is not None:
-        with track_timing(timings, "embedding_generation"):
-            vectors = await embedding_client.embed(chunks)
-    else:
-        vectors = await embedding_client.embed(chunks)
+async def load_vectors(hashes: List[str]) -> dict[str, List[float]]:
+    """
+    Already stored vectors for chunk hashes (from any document);
+    the hashes include the embedding model
+    """
+    if not hashes:
+        return {}
+    async with session_context() as session:
+        result = await session.execute(
+            select(Embedding.content_hash, Embedding.embedding)
+            .where(Embedding.content_hash.in_(hashes))
+            .distinct(Embedding.content_hash)
+        )
+        return {h: [float(v) for v in vector] for h, vector in result.all()}
+
 
-    if tokens is not None:
-        tokens["embedding_input_tokens"] = tokens["chunk_tokens"]
-
-    # save to PG & Qdrant
-    if timings is not None:
-        with track_timing(timings, "db_qdrant_upsert"):
-            async with session_context() as session:
-                doc_id = str(uuid.uuid4())
-                session.add(Document(id=doc_id, source=source))
-
-                for idx, (chunk, vector) in enumerate(zip(chunks, vectors)):
-                    emb_id = str(uuid.uuid4())
-                    session.add(
-                        Embedding(
-                            id=emb_id,
-                            document_id=doc_id,
-                            chunk_index=idx,
-                            content=chunk,
-                            embedding=vector
-                        )
+async def delete_chunks(doc_id: str, ids: List[str], collection_name: str = "documents"):
+    async with session_context() as session:
+        await session.execute(
+            delete(Embedding).where(Embedding.id.in_([uuid.UUID(i) for i in ids]))
+        )
+        await session.commit()
+    await qdrant.delete_points(collection_name, ids)
+
+
+async def set_document_hash(doc_id: str, file_hash: str | None):
+    async with session_context() as session:
+        await session.execute(
+            update(Document)
+            .where(Document.id == uuid.UUID(doc_id))
+            .values(content_hash=file_hash)
+        )
+        await session.commit()
+
+
+async def delete_document(doc_id: str, collection_name: str = "documents"):
+    """Removes a document with all its chunks from PG and Qdrant"""
+    async with session_context() as session:
+        await session.execute(
+            delete(Embedding).where(Embedding.document_id == uuid.UUID(doc_id))
+        )
+        await session.execute(delete(Document).where(Document.id == uuid.UUID(doc_id)))
+        await session.commit()
+    await qdrant.delete_document_points(collection_name, doc_id)
+
+
+class IngestionPipeline:
+    """
+    Streaming PDF ingestion:
+
+        extract pages (process pool) -> chunk -> embed (N workers) -> store
+
+    Stages are connected by bounded queues, so a slow stage holds the
+    previous ones back instead of buffering the whole document in memory,
+    and chunks land in the index batch by batch while later pages are
+    still being extracted.
+
+    Incremental: chunks are addressed by content hash. For a re-ingested
+    document, chunks already stored at the same position are skipped,
+    known chunk texts (from any document, same embedding model) reuse
+    their stored vector instead of being embedded again, and chunks gone
+    from the new version are deleted at the end.
+
+    Writes are idempotent (fixed doc_id, hash-based chunk ids), so an
+    interrupted run can simply be started again with the same doc_id.
+    On failure, a new document is removed; an existing one keeps its
+    previous chunks.
+    """
+
+    def __init__(
+        self,
+        doc_id: str,
+        source: str,
+        embedding_client: EmbeddingClient,
+        chunk_size: int = CHUNK_SIZE,
+        overlap: int = CHUNK_OVERLAP,
+        max_chunks: int | None = None,
+        max_tokens: int | None = None,
+        collection_name: str = "documents",
+        on_progress: Callable[[dict], Awaitable[None]] | None = None,
+        keep_partial_on_cancel: bool = False,
+        existing_chunks: list[tuple[str, str | None, int]] | None = None,
+        file_hash: str | None = None,
+    ):
+        self.doc_id = doc_id
+        self.source = source
+        self.embedding_client = embedding_client
+        self.embedding_model = getattr(embedding_client, "model", None)
+        self.token_model = self.embedding_model
+        self.chunker = StreamChunker(chunk_size, overlap, model=self.token_model)
+        self.max_chunks = max_chunks
+        self.max_tokens = max_tokens
+        self.collection_name = collection_name
+        self.on_progress = on_progress
+        self.keep_partial_on_cancel = keep_partial_on_cancel
+        self.file_hash = file_hash
+
+        # previous version of the document (None -> new document)
+        self.is_new_document = existing_chunks is None
+        self.existing_chunks = existing_chunks or []
+        self.existing_ids = {i for i, _, _ in self.existing_chunks}
+        self.existing_positions = {
+            h: idx for _, h, idx in self.existing_chunks if h is not None
+        }
+        self.seen_hashes: set[str] = set()
+
+        self.batch_size = settings.INGEST_EMBED_BATCH_SIZE
+        self.embed_workers = settings.INGEST_EMBED_CONCURRENCY
+
+        self.truncated = False
+        self.timings: dict[str, float] = {}
+        self.stats = {
+            "pages_total": 0,
+            "pages_done": 0,
+            "num_chunks": 0,
+            "chunks_embedded": 0,
+            "chunks_reused": 0,
+            "chunks_unchanged": 0,
+            "chunks_removed": 0,
+            "raw_text_tokens": 0,
+            "chunk_tokens": 0,
+        }
+
+    @contextmanager
+    def _busy(self, name: str):
+        """Accumulates time spent in a stage (stages overlap in wall time)"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            key = f"{name}_ms"
+            self.timings[key] = round(self.timings.get(key, 0.0) + elapsed_ms, 2)
+
+    async def run(self, path: str) -> dict:
+        size = settings.INGEST_QUEUE_SIZE
+        pages: asyncio.Queue = asyncio.Queue(maxsize=size)
+        batches: asyncio.Queue = asyncio.Queue(maxsize=size)
+        embedded: asyncio.Queue = asyncio.Queue(maxsize=size)
+
+        # the document holds mixed versions until _finalize sets the new
+        # hash: if the update fails, no re-upload counts as unchanged
+        if not self.is_new_document:
+            await set_document_hash(self.doc_id, None)
+
+        try:
+            async with asyncio.TaskGroup() as tg:
+                tg.create_task(self._extract(path, pages))
+                tg.create_task(self._chunk(pages, batches))
+                for _ in range(self.embed_workers):
+                    tg.create_task(self._embed(batches, embedded))
+                tg.create_task(self._store(embedded))
+        except BaseException as e:
+            if isinstance(e, asyncio.CancelledError) and self.keep_partial_on_cancel:
+                raise  # left for a resumed run to complete
+            if self.is_new_document:
+                try:
+                    await delete_document(self.doc_id, self.collection_name)
+                except Exception as cleanup_error:
+                    logger.warning(
+                        f"Failed to clean up document {self.doc_id}: {cleanup_error!r}"
                     )
+            # surface the stage error itself, not the TaskGroup wrapper
+            if isinstance(e, BaseExceptionGroup):
+                raise e.exceptions[0] from None
+            raise
+
+        await self._finalize()
+        await self._report_progress()
+        return {"document_id": self.doc_id, "num_chunks": self.stats["num_chunks"]}
+
+    async def _finalize(self):
+        # a truncated run didn't see the chunks past the cut-off: it can't
+        # tell them from removed ones, and the document isn't complete, so
+        # it neither deletes anything nor counts as unchanged next time
+        if self.truncated:
+            return
+
+        # chunks of the previous version that are gone now
+        current_ids = {chunk_id(self.doc_id, h) for h in self.seen_hashes}
+        stale = [i for i in self.existing_ids if i not in current_ids]
+        if stale:
+            await delete_chunks(self.doc_id, stale, self.collection_name)
+            self.stats["chunks_removed"] = len(stale)
+
+        if self.file_hash:
+            await set_document_hash(self.doc_id, self.file_hash)
+
+    async def _extract(self, path: str, pages: asyncio.Queue):
+        loop = asyncio.get_running_loop()
+        total = await loop.run_in_executor(get_pdf_pool(), count_pages, path)
+        self.stats["pages_total"] = total
+
+        async with aclosing(iter_pdf_pages(path, total)) as page_texts:
+            while True:
+                with self._busy("load_pdf"):
+                    text = await anext(page_texts, None)
+                if text is None or self.truncated:
+                    break
+                await pages.put(text)
+        await pages.put(None)
+
+    async def _chunk(self, pages: asyncio.Queue, batches: asyncio.Queue):
+        batch: list[tuple[int, str, str]] = []
+        first_page = True
+
+        while (text := await pages.get()) is not None:
+            self.stats["pages_done"] += 1
+            if self.truncated or not text:
+                continue  # drain until the extractor stops
+            self.stats["raw_text_tokens"] += count_tokens(text, model=self.token_model)
+
+            with self._busy("chunk_text"):
+                chunks = self.chunker.feed(text if first_page else "\n" + text)
+            first_page = False
+
+            for chunk, tokens in zip(chunks, self._count(chunks)):
+                if not self._accept(chunk, tokens, batch):
+                    break
+                if len(batch) >= self.batch_size:
+                    await batches.put(batch)
+                    batch = []
 
-                    emb_id = str(uuid.uuid5(uuid.UUID(doc_id), str(idx)))
-                    upsert_embedding(id=emb_id, vector=vector, content=chunk)
-
-                await session.commit()
-    else:
-        async with session_context() as session:
-            doc_id = str(uuid.uuid4())
-            session.add(Document(id=doc_id, source=source))
-
-            for idx, (chunk, vector) in enumerate(zip(chunks, vectors)):
-                emb_id = str(uuid.uuid4())
-                session.add(
-                    Embedding(
-                        id=emb_id,
-                        document_id=doc_id,
-                        chunk_index=idx,
-                        content=chunk,
-                        embedding=vector
+        if not self.truncated:
+            chunks = self.chunker.flush()
+            for chunk, tokens in zip(chunks, self._count(chunks)):
+                if not self._accept(chunk, tokens, batch):
+                    break
+        if batch:
+            await batches.put(batch)
+
+        for _ in range(self.embed_workers):
+            await batches.put(None)
+
+    def _count(self, chunks: list[str]) -> list[int]:
+        """Chunk sizes in the embedding model's tokens, one batch per page"""
+        return count_tokens_batch(chunks, model=self.token_model)
+
+    def _accept(self, chunk: str, tokens: int, batch: list[tuple[int, str, str]]) -> bool:
+        """Adds chunk to batch unless limits say to stop"""
+        chunk_hash = content_hash(chunk, self.embedding_model)
+        if chunk_hash in self.seen_hashes:
+            return True  # same text twice in a document is stored once
+
+        if self.max_chunks is not None and self.stats["num_chunks"] >= self.max_chunks:
+            logger.warning(
+                "Ingestion truncated: too many chunks",
+                extra={"used_chunks": self.max_chunks}
+            )
+            self.truncated = True
+            return False
+
+        self.stats["chunk_tokens"] += tokens
+        if self.max_tokens is not None and self.stats["chunk_tokens"] > self.max_tokens:
+            raise EmbeddingLimitExceeded(
+                f"Ingestion aborted: total tokens {self.stats['chunk_tokens']} "
+                f"exceed MAX_EMBED_TOKENS={self.max_tokens}"
+            )
+
+        idx = self.stats["num_chunks"]
+        self.seen_hashes.add(chunk_hash)
+        self.stats["num_chunks"] += 1
+
+        if self.existing_positions.get(chunk_hash) == idx:
+            self.stats["chunks_unchanged"] += 1
+        else:
+            batch.append((idx, chunk, chunk_hash))
+        return True
+
+    async def _embed(self, batches: asyncio.Queue, embedded: asyncio.Queue):
+        while (batch := await batches.get()) is not None:
+            hashes = [h for _, _, h in batch]
+            with self._busy("vector_reuse"):
+                vectors = await load_vectors(hashes)
+
+            missing = [(chunk, h) for _, chunk, h in batch if h not in vectors]
+            self.stats["chunks_reused"] += len(batch) - len(missing)
+            if missing:
+                with self._busy("embedding_generation"):
+                    new_vectors = await self.embedding_client.embed(
+                        [chunk for chunk, _ in missing]
                     )
+                vectors.update(zip((h for _, h in missing), new_vectors))
+
+            await embedded.put((batch, [vectors[h] for h in hashes]))
+        await embedded.put(None)
+
+    async def _store(self, embedded: asyncio.Queue):
+        finished_workers = 0
+        while finished_workers < self.embed_workers:
+            item = await embedded.get()
+            if item is None:
+                finished_workers += 1
+                continue
+
+            batch, vectors = item
+            with self._busy("db_qdrant_upsert"):
+                await store_chunks(
+                    self.doc_id,
+                    self.source,
+                    [chunk for _, chunk, _ in batch],
+                    vectors,
+                    indexes=[idx for idx, _, _ in batch],
+                    hashes=[h for _, _, h in batch],
+                    collection_name=self.collection_name,
+                    existing_ids=self.existing_ids,
                 )
+            self.stats["chunks_embedded"] += len(batch)
+            await self._report_progress()
 
-                emb_id = str(uuid.uuid5(uuid.UUID(doc_id), str(idx)))
-                upsert_embedding(id=emb_id, vector=vector, content=chunk)
+    async def _report_progress(self):
+        if self.on_progress is None:
+            return
+        try:
+            await self.on_progress(dict(self.stats))
+        except Exception as e:
+            logger.warning(f"Ingestion progress update failed: {e!r}")
+
+
+async def spool_to_disk(file_obj, suffix: str = ".pdf", dir: str | None = None) -> str:
+    """Copies an uploaded file-like object to a temp file (pool workers need a path)"""
+    def copy() -> str:
+        file_obj.seek(0)
+        if dir:
+            os.makedirs(dir, exist_ok=True)
+        with tempfile.NamedTemporaryFile(suffix=suffix, delete=False, dir=dir) as tmp:
+            shutil.copyfileobj(file_obj, tmp)
+            return tmp.name
+
+    return await asyncio.to_thread(copy)
+
+
+async def prepare_pipeline(
+    path: str,
+    source: str,
+    embedding_client: EmbeddingClient,
+    doc_id: str | None = None,
+    **pipeline_kwargs,
+) -> tuple[IngestionPipeline | None, dict | None]:
+    """
+    Resolves the document for `source`:
+    - same file as last time -> (None, result): nothing to do
+    - known source -> pipeline updating that document incrementally
+    - new source -> pipeline for a new document (doc_id or a fresh uuid)
+    """
+    file_hash = await hash_file(path, getattr(embedding_client, "model", None))
+    document = await find_document(source)
+
+    existing_chunks = None
+    if document is not None:
+        doc_id = str(document.id)
+        existing_chunks = await load_document_chunks(doc_id)
+        if document.content_hash == file_hash:
+            logger.info(f"Ingestion skipped, unchanged document: {doc_id}")
+            return None, {
+                "document_id": doc_id,
+                "num_chunks": len(existing_chunks),
+                "unchanged": True,
+            }
+
+    pipeline = IngestionPipeline(
+        doc_id=doc_id or str(uuid.uuid4()),
+        source=source,
+        embedding_client=embedding_client,
+        existing_chunks=existing_chunks,
+        file_hash=file_hash,
+        **pipeline_kwargs,
+    )
+    return pipeline, None
 
-            await session.commit()
+
+async def ingest_pdf(
+    file_path,
+    source: str,
+    timings: dict,
+    tokens: dict,
+):
+    """file_path: path or file-like object (e.g. UploadFile.file)"""
+    spooled = None
+    if not isinstance(file_path, (str, os.PathLike)):
+        spooled = file_path = await spool_to_disk(file_path)
+
+    try:
+        pipeline, result = await prepare_pipeline(
+            file_path,
+            source,
+            embedding_client=get_embedding_client(provider=settings.EMBEDDING_PROVIDER),
+            max_chunks=MAX_EMBED_CHUNKS,
+            max_tokens=MAX_EMBED_TOKENS,
+        )
+        if pipeline is None:
+            return result
+
+        if timings is not None:
+            with track_timing(timings, "ingestion_pipeline"):
+                result = await pipeline.run(file_path)
+            timings.update(pipeline.timings)
+        else:
+            result = await pipeline.run(file_path)
+    finally:
+        if spooled:
+            os.unlink(spooled)
 
     if tokens is not None:
+        tokens["raw_text_tokens"] = pipeline.stats["raw_text_tokens"]
+        tokens["chunk_tokens"] = pipeline.stats["chunk_tokens"]
+        tokens["num_chunks"] = pipeline.stats["num_chunks"]
+        tokens["embedding_input_tokens"] = pipeline.stats["chunk_tokens"]
+        if pipeline.truncated:
+            tokens["truncated_chunks"] = True
+
         logger.info(
-            f"PDF ingested: document_id={doc_id}, "
-            f"num_chunks={tokens.get('num_chunks', len(chunks))}, "
+            f"PDF ingested: document_id={pipeline.doc_id}, "
+            f"num_chunks={tokens.get('num_chunks')}, "
             f"tokens={tokens}, timings={timings}"
         )
 
-    return {"document_id": doc_id, "num_chunks": len(chunks)}
+    return result
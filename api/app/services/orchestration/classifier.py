@@ -1,4 +1,4 @@
-from app.llm.factory import LLMClientFactory
+from app.llm.factory import get_llm_factory
 from app.llm.runner import run_llm_async
 from app.llm.config import DEFAULT_GEN_CONFIG
 from app.services.prompts.classifier_prompt import CLASSIFIER_PROMPT
@@ -10,7 +10,7 @@ class QueryClassifier:
         provider: str,
         generation_config: str,
     ):
-        self.llm_client = LLMClientFactory().get(provider)
+        self.llm_client = get_llm_factory().get(provider)
         self.gen_config = generation_config or DEFAULT_GEN_CONFIG
 
     async def classify(self, query: str) -> str:
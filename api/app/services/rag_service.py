@@ -1,14 +1,16 @@
 from fastapi import HTTPException, Request
 from app.core.timing import track_timing
-from app.core.tokens import count_tokens, track_tokens
+from app.core.tokens import track_tokens
 from app.embeddings.factory import get_embedding_client
 from app.embeddings.service import EmbeddingService
 from app.embeddings.schemas import SimilarityResult
+from app.services.context_builder import build_context, context_budget
+from app.services.reranker import get_reranker
+from app.services.retrieval import HybridRetriever
 from app.llm.runner import run_llm_async
 from app.core.config import settings
 
 DEBUG = settings.DEBUG_MODE
-MAX_PROMPT_TOKENS = 8000  # restriction for prompt tokens
 
 
 class RAGService:
@@ -21,6 +23,8 @@ class RAGService:
     def __init__(self, embedding_provider: str = "gemini", top_k: int = 5):
         client = get_embedding_client(embedding_provider)
         self.embedding_service = EmbeddingService(client)
+        self.retriever = HybridRetriever(self.embedding_service)
+        self.reranker = get_reranker()
         self.top_k = top_k
 
     async def answer(
@@ -31,54 +35,53 @@ class RAGService:
         timeout: float = 30.0,
         request: Request | None = None,
     ):
-        # 1️⃣ Semantic search
+        # 1️⃣ Hybrid search: dense + full-text, fused with RRF
+        candidates_k = max(settings.RAG_CANDIDATES, self.top_k)
+        if self.reranker:
+            candidates_k = max(settings.RERANK_CANDIDATES, candidates_k)
         if request:
-            with track_timing(request, "vector_search"):
-                top_chunks: list[SimilarityResult] = (
-                    await self.embedding_service.most_similar(
-                        query=question,
-                        top_k=self.top_k,
-                        request=request,
-                    )
+            with track_timing(request, "retrieval"):
+                candidates: list[SimilarityResult] = await self.retriever.search(
+                    query=question,
+                    top_k=candidates_k,
+                    request=request,
+                    with_vectors=True,
                 )
         else:
-            top_chunks = await self.embedding_service.most_similar(
+            candidates = await self.retriever.search(
                 query=question,
-                top_k=self.top_k,
+                top_k=candidates_k,
                 request=None,
+                with_vectors=True,
             )
 
         if DEBUG:
-            print(f"[DEBUG] Retrieved {len(top_chunks)} chunks")
+            print(f"[DEBUG] Retrieved {len(candidates)} chunks")
 
-        if not top_chunks:
+        if not candidates:
             raise HTTPException(status_code=404, detail="Information not found in docs")
 
-        # 2️⃣ Extractive filtering: leave only the chunks where keywords occur
-        keywords = [w.lower() for w in question.split() if len(w) > 2]
-        filtered_chunks = [
-            c for c in top_chunks
-            if any(k in c.document.lower() for k in keywords)
-        ]
-        if DEBUG:
-            print(f"[DEBUG] Filtered to {len(filtered_chunks)} "
-                  "chunks after keyword filter")
+        # Optional cross-encoder rerank of the over-fetched candidates
+        if self.reranker:
+            if request:
+                with track_timing(request, "rerank"):
+                    candidates = await self.reranker.rerank(question, candidates)
+            else:
+                candidates = await self.reranker.rerank(question, candidates)
 
-        if not filtered_chunks:
-            filtered_chunks = top_chunks[:self.top_k]  # fallback on top-k
+        # 2️⃣ Context assembly: MMR selection, merge of adjacent chunks,
+        # packing to the model's token budget
+        model = getattr(llm_client, "model_name", None)
+        budget = context_budget(model, gen_config, self.SYSTEM_PROMPT + question)
+        blocks = build_context(candidates, self.top_k, budget, model=model)
 
-        # 3️⃣ Build token-limited context
-        context = []
-        context_tokens = 0
-        for i, c in enumerate(filtered_chunks):
-            chunk_text = f"[{i+1}] {c.document}"
-            t = count_tokens(chunk_text)
-            if context_tokens + t > MAX_PROMPT_TOKENS:
-                break
-            context.append(chunk_text)
-            context_tokens += t
+        if DEBUG:
+            print(f"[DEBUG] Context: {len(blocks)} blocks, "
+                  f"{sum(b.tokens for b in blocks)}/{budget} tokens")
 
-        prompt_context = "\n\n".join(context)
+        prompt_context = "\n\n".join(
+            f"[{i+1}] {b.text}" for i, b in enumerate(blocks)
+        )
 
         prompt = f"""CONTEXT:
         {prompt_context}
@@ -87,10 +90,10 @@ class RAGService:
         {question}
         """
 
-        # 4️⃣ LLM call
+        # 3️⃣ LLM call
         if request:
             with track_timing(request, "llm_call"):
-                with track_tokens(request, "rag_prompt", prompt):
+                with track_tokens(request, "rag_prompt", prompt, model=model):
                     response = await run_llm_async(
                         prompt=prompt,
                         gen_config=gen_config,
@@ -123,12 +126,12 @@ class RAGService:
                 timeout=timeout,
             )
 
-        # 5️⃣ Return
+        # 4️⃣ Return
         return {
             "answer": response.result.text,
             "sources": [
-                {"index": i + 1, "text": c.document, "score": c.score}
-                for i, c in enumerate(filtered_chunks)
+                {"index": i + 1, "text": b.text, "score": b.score}
+                for i, b in enumerate(blocks)
             ],
             "meta": response.meta,
         }
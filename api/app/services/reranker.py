@@ -0,0 +1,162 @@
+import asyncio
+import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import List
+
+from app.core.config import settings
+from app.core.logging import logger
+from app.embeddings.cache import LocalLRUCache
+from app.embeddings.schemas import SimilarityResult
+
+
+def pair_key(query: str, chunk: SimilarityResult) -> str:
+    text = chunk.id or chunk.document
+    return hashlib.sha256(f"{query}\x00{text}".encode("utf-8")).hexdigest()
+
+
+class CrossEncoderReranker:
+    """
+    Re-scores retrieved chunks with a local cross-encoder on CPU.
+
+    The model is loaded once, on first use, in the reranker's own thread
+    (torch / transformers are imported only then). Pairs are scored in
+    batches, best retrieval candidates first, until the latency budget is
+    spent; whatever wasn't scored in time keeps its retrieval order after
+    the scored chunks. (query, chunk) scores are cached in-process.
+    If the model can't be loaded, reranking is turned off.
+    """
+
+    def __init__(
+        self,
+        model_name: str = settings.RERANK_MODEL,
+        batch_size: int = settings.RERANK_BATCH_SIZE,
+        max_length: int = settings.RERANK_MAX_LENGTH,
+        timeout: float = settings.RERANK_TIMEOUT,
+    ):
+        self.model_name = model_name
+        self.batch_size = batch_size
+        self.max_length = max_length
+        self.timeout = timeout
+        self.cache = LocalLRUCache(settings.RERANK_CACHE_SIZE, settings.RERANK_CACHE_TTL)
+
+        # one thread: forward passes don't run concurrently (torch is
+        # already multi-threaded inside), model is used from one place
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="reranker")
+        self._load_lock = threading.Lock()
+        self._model = None
+        self._tokenizer = None
+        self.available = True
+
+    def _load(self):
+        with self._load_lock:
+            if self._model is not None:
+                return
+            import torch
+            from transformers import AutoModelForSequenceClassification, AutoTokenizer
+
+            torch.set_num_threads(settings.RERANK_THREADS)
+            self._tokenizer = AutoTokenizer.from_pretrained(self.model_name)
+            model = AutoModelForSequenceClassification.from_pretrained(self.model_name)
+            model.eval()
+            self._model = model
+            logger.info(f"Reranker model loaded: {self.model_name}")
+
+    def _score(self, query: str, texts: List[str]) -> List[float]:
+        """Runs in the reranker thread"""
+        import torch
+
+        self._load()
+        with torch.inference_mode():
+            inputs = self._tokenizer(
+                [query] * len(texts),
+                texts,
+                padding=True,
+                truncation="only_second",
+                max_length=self.max_length,
+                return_tensors="pt",
+            )
+            logits = self._model(**inputs).logits
+        # single relevance logit, or the "relevant" class of two
+        return logits[:, -1].float().tolist()
+
+    async def rerank(
+        self,
+        query: str,
+        candidates: List[SimilarityResult],
+        top_n: int = settings.RERANK_TOP_N,
+    ) -> List[SimilarityResult]:
+        """Top `top_n` candidates by cross-encoder score (score replaced)"""
+        if not self.available or not candidates:
+            return candidates[:top_n]
+
+        keys = [pair_key(query, c) for c in candidates]
+        scores: dict[int, float] = {}
+        missing: list[int] = []
+        for i, key in enumerate(keys):
+            score = self.cache.get(key)
+            if score is None:
+                missing.append(i)
+            else:
+                scores[i] = score
+
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.timeout
+        for start in range(0, len(missing), self.batch_size):
+            batch = missing[start:start + self.batch_size]
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            try:
+                batch_scores = await asyncio.wait_for(
+                    loop.run_in_executor(
+                        self._executor,
+                        self._score,
+                        query,
+                        [candidates[i].document for i in batch],
+                    ),
+                    timeout=remaining
+                )
+            except asyncio.TimeoutError:
+                # the batch finishes in the background (and loads the model)
+                logger.warning(
+                    "Rerank budget exceeded",
+                    extra={"scored": len(scores), "candidates": len(candidates)}
+                )
+                break
+            except (ImportError, OSError) as e:
+                # no torch / transformers, or the model can't be fetched
+                logger.warning(f"Reranking disabled, model unavailable: {e!r}")
+                self.available = False
+                break
+            except Exception as e:
+                logger.warning(f"Reranking failed, keeping retrieval order: {e!r}")
+                break
+
+            for i, score in zip(batch, batch_scores):
+                scores[i] = score
+                self.cache.set(keys[i], score)
+
+        if not scores:
+            return candidates[:top_n]
+
+        # unscored ones go after the scored, in retrieval order, with
+        # scores on the same scale (context assembly compares them)
+        floor = min(scores.values())
+        unscored = [i for i in range(len(candidates)) if i not in scores]
+        for rank, i in enumerate(unscored, start=1):
+            scores[i] = floor - rank * 1e-3
+
+        ranked = sorted(scores, key=scores.get, reverse=True)
+        return [
+            candidates[i].model_copy(update={"score": scores[i]}) for i in ranked[:top_n]
+        ]
+
+
+@lru_cache
+def get_reranker() -> CrossEncoderReranker | None:
+    """Shared reranker, None if reranking is disabled"""
+    if not settings.RERANK_ENABLED:
+        return None
+    return CrossEncoderReranker()
@@ -0,0 +1,150 @@
+import asyncio
+import re
+from typing import List, Optional
+
+from fastapi import Request
+from sqlalchemy import func, select
+
+from app.core.config import settings
+from app.core.logging import logger
+from app.core.timing import track_timing
+from app.embeddings.schemas import SimilarityResult
+from app.embeddings.service import EmbeddingService
+from app.infra.db.models.models import Embedding
+from app.infra.db.pg import session_context
+
+# query terms for full-text search (unicode words, short ones are noise)
+TERM = re.compile(r"\w{3,}")
+
+
+def to_tsquery_text(query: str) -> str:
+    """
+    OR-query over the question's words: 'a | b | c'.
+    Chunks matching more (rarer) words rank higher; AND would
+    drop everything that misses a single word of the question.
+    """
+    terms = dict.fromkeys(t.lower() for t in TERM.findall(query))
+    return " | ".join(terms)
+
+
+async def fulltext_search(
+    query: str,
+    limit: int,
+    with_vectors: bool = False
+) -> List[SimilarityResult]:
+    """Keyword search over embeddings.content (GIN index on content_tsv)"""
+    tsquery_text = to_tsquery_text(query)
+    if not tsquery_text:
+        return []
+
+    tsquery = func.to_tsquery("simple", tsquery_text)
+    # normalization 1: divide by 1 + log(length), long chunks don't win by size
+    rank = func.ts_rank_cd(Embedding.content_tsv, tsquery, 1).label("rank")
+
+    columns = [
+        Embedding.id, Embedding.content, Embedding.document_id,
+        Embedding.chunk_index, rank
+    ]
+    if with_vectors:
+        columns.append(Embedding.embedding)
+
+    async with session_context() as session:
+        result = await session.execute(
+            select(*columns)
+            .where(Embedding.content_tsv.op("@@")(tsquery))
+            .order_by(rank.desc())
+            .limit(limit)
+        )
+        return [
+            SimilarityResult(
+                document=row.content,
+                score=float(row.rank),
+                id=str(row.id),
+                document_id=str(row.document_id),
+                chunk_index=row.chunk_index,
+                vector=[float(v) for v in row.embedding] if with_vectors else None,
+            )
+            for row in result.all()
+        ]
+
+
+def reciprocal_rank_fusion(
+    rankings: List[List[SimilarityResult]],
+    k: int = settings.HYBRID_RRF_K
+) -> List[SimilarityResult]:
+    """
+    Merges ranked lists by sum of 1 / (k + rank); scores of different
+    retrievers aren't comparable, ranks are. Result score = RRF score.
+    """
+    scores: dict[str, float] = {}
+    docs: dict[str, SimilarityResult] = {}
+    for ranking in rankings:
+        for rank, doc in enumerate(ranking, start=1):
+            key = doc.id or doc.document
+            scores[key] = scores.get(key, 0.0) + 1.0 / (k + rank)
+            docs.setdefault(key, doc)
+
+    order = sorted(scores, key=scores.get, reverse=True)
+    return [docs[key].model_copy(update={"score": scores[key]}) for key in order]
+
+
+class HybridRetriever:
+    """
+    Dense (Qdrant) + full-text (Postgres) search run in parallel and
+    merged with reciprocal rank fusion. If full-text search fails, falls
+    back to dense results only.
+    """
+
+    def __init__(
+        self,
+        embedding_service: EmbeddingService,
+        candidates: int = settings.HYBRID_CANDIDATES,
+        rrf_k: int = settings.HYBRID_RRF_K,
+        enabled: bool = settings.HYBRID_SEARCH_ENABLED,
+    ):
+        self.embedding_service = embedding_service
+        self.candidates = candidates
+        self.rrf_k = rrf_k
+        self.enabled = enabled
+
+    async def search(
+        self,
+        query: str,
+        top_k: int = 5,
+        request: Optional[Request] = None,
+        with_vectors: bool = False,
+    ) -> List[SimilarityResult]:
+        if not self.enabled:
+            return await self.embedding_service.most_similar(
+                query=query, top_k=top_k, request=request, with_vectors=with_vectors
+            )
+
+        limit = max(self.candidates, top_k)
+        dense, sparse = await asyncio.gather(
+            self.embedding_service.most_similar(
+                query=query, top_k=limit, request=request, with_vectors=with_vectors
+            ),
+            self._fulltext(query, limit, request, with_vectors),
+            return_exceptions=True
+        )
+        if isinstance(dense, BaseException):
+            raise dense
+        if isinstance(sparse, BaseException):
+            logger.warning(
+                f"Full-text search failed, using dense results only: {sparse!r}"
+            )
+            return dense[:top_k]
+
+        return reciprocal_rank_fusion([dense, sparse], k=self.rrf_k)[:top_k]
+
+    async def _fulltext(
+        self,
+        query: str,
+        limit: int,
+        request: Optional[Request],
+        with_vectors: bool
+    ) -> List[SimilarityResult]:
+        if request:
+            with track_timing(request, "fulltext_search"):
+                return await fulltext_search(query, limit, with_vectors)
+        return await fulltext_search(query, limit, with_vectors)
@@ -0,0 +1,147 @@
+import json
+import re
+import time
+import uuid
+
+from fastapi import Request
+from qdrant_client.http.models import FieldCondition, Filter, MatchValue, Range
+
+from app.core.config import settings
+from app.core.logging import logger
+from app.core.timing import track_timing
+from app.embeddings.service import EmbeddingService
+from app.infra.db import qdrant
+from app.llm.fingerprint import request_fingerprint, scope_fingerprint
+
+
+class SemanticCache:
+    """
+    Opt-in response cache keyed by prompt meaning.
+
+    Prompts are embedded and looked up among previously answered prompts
+    of the same scope (provider, model, gen config, instruction) in a
+    dedicated Qdrant collection; an answer is reused when cosine similarity
+    reaches the provider's threshold.
+
+    One collection per embedding model and vector size, created on first
+    use: switching the embedding provider starts an empty cache instead
+    of failing every lookup on the old collection's dimension.
+    """
+
+    def __init__(
+        self,
+        embedding_service: EmbeddingService,
+        collection: str = settings.SEMANTIC_CACHE_COLLECTION,
+    ):
+        self.embedding_service = embedding_service
+        self.collection = collection
+        self.model = getattr(embedding_service.client, "model", None)
+        self._created: set[str] = set()
+
+    async def _collection(self, vector: list[float]) -> str:
+        name = semantic_cache_collection(self.collection, self.model, len(vector))
+        if name not in self._created:
+            await create_semantic_cache_collection(name, len(vector))
+            self._created.add(name)
+        return name
+
+    def _threshold(self, provider: str) -> float:
+        return settings.SEMANTIC_CACHE_THRESHOLDS.get(
+            provider,
+            settings.SEMANTIC_CACHE_THRESHOLD
+        )
+
+    async def lookup(
+        self,
+        prompt: str,
+        provider: str,
+        model: str,
+        gen_config: dict | None = None,
+        instruction: str | None = None,
+        request: Request | None = None,
+    ) -> tuple[dict | None, list[float] | None]:
+        """
+        Returns (cached response | None, prompt embedding).
+        The embedding is handed back so store() doesn't embed twice.
+        """
+        try:
+            vector = await self.embedding_service.embed(prompt, request=request)
+            collection = await self._collection(vector)
+
+            scope = scope_fingerprint(provider, model, gen_config, instruction)
+            query_filter = Filter(must=[
+                FieldCondition(key="scope", match=MatchValue(value=scope)),
+                FieldCondition(
+                    key="created_at",
+                    range=Range(gte=time.time() - settings.SEMANTIC_CACHE_TTL)
+                ),
+            ])
+
+            if request:
+                with track_timing(request, "semantic_cache_lookup"):
+                    hits = await qdrant.search_points(
+                        collection,
+                        vector,
+                        limit=1,
+                        query_filter=query_filter,
+                        score_threshold=self._threshold(provider),
+                    )
+            else:
+                hits = await qdrant.search_points(
+                    collection,
+                    vector,
+                    limit=1,
+                    query_filter=query_filter,
+                    score_threshold=self._threshold(provider),
+                )
+        except Exception as e:
+            logger.warning(f"SemanticCache lookup failed: {e!r}")
+            return None, None
+
+        if not hits:
+            return None, vector
+
+        logger.info(
+            f"SemanticCache: hit for provider '{provider}' "
+            f"(score={hits[0]['score']:.3f})"
+        )
+        return json.loads(hits[0]["payload"]["response"]), vector
+
+    async def store(
+        self,
+        prompt: str,
+        vector: list[float],
+        response: dict,
+        provider: str,
+        model: str,
+        gen_config: dict | None = None,
+        instruction: str | None = None,
+    ) -> None:
+        # same request → same point, repeated stores just refresh it
+        point_id = str(uuid.UUID(
+            request_fingerprint(prompt, provider, model, gen_config, instruction)[:32]
+        ))
+        payload = {
+            "scope": scope_fingerprint(provider, model, gen_config, instruction),
+            "prompt": prompt,
+            "response": json.dumps(response),
+            "created_at": time.time(),
+        }
+
+        try:
+            collection = await self._collection(vector)
+            await qdrant.upsert_point(collection, point_id, vector, payload)
+        except Exception as e:
+            logger.warning(f"SemanticCache store failed: {e!r}")
+
+
+def semantic_cache_collection(base: str, model: str | None, vector_size: int) -> str:
+    """e.g. semantic_cache_gemini-embedding-001_3072"""
+    suffix = re.sub(r"[^A-Za-z0-9_-]+", "-", f"{model or 'default'}_{vector_size}")
+    return f"{base}_{suffix}"
+
+
+async def create_semantic_cache_collection(name: str, vector_size: int):
+    await qdrant.create_collection(name=name, vector_size=vector_size)
+    await qdrant.create_payload_index(name, "scope", "keyword")
+    await qdrant.create_payload_index(name, "created_at", "float")
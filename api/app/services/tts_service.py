@@ -1,9 +1,9 @@
-import httpx
 from typing import Optional, Dict
 import io
 
 from app.core.logging import logger
 from app.core.config import settings
+from app.core.http import http_pool
 
 
 class TTSService:
@@ -47,9 +47,12 @@ class TTSService:
         }
 
         # ===== Скачиваем WAV из StreamingResponse =====
-        async with httpx.AsyncClient(timeout=60.0) as client:
-            resp = await client.post(f"{self.tts_api_url}/tts/custom_voice", json=payload)
-            resp.raise_for_status()
-            audio_bytes = await resp.aread()
+        resp = await http_pool.get("tts").post(
+            f"{self.tts_api_url}/tts/custom_voice",
+            json=payload,
+            timeout=60.0
+        )
+        resp.raise_for_status()
+        audio_bytes = await resp.aread()
 
         return io.BytesIO(audio_bytes)
@@ -0,0 +1,14 @@
+import os
+
+import pytest
+
+# Settings are read on import: no Vault / Redis in tests
+os.environ.setdefault("REDIS_HOST", "localhost")
+os.environ.setdefault("REDIS_PORT", "6379")
+os.environ.setdefault("JWT_SECRET_KEY", "test-secret")
+os.environ.setdefault("GEMINI_API_KEY", "test-key")
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
@@ -0,0 +1,65 @@
+import ipaddress
+
+import httpx
+import pytest
+
+from app.inference import callbacks
+from app.inference.callbacks import CallbackSender, callback_url_error
+
+PUBLIC = ipaddress.ip_address("93.184.216.34")
+PRIVATE = ipaddress.ip_address("127.0.0.1")
+
+JOB = {
+    "job_id": "00000000-0000-0000-0000-000000000001",
+    "status": "completed",
+    "result": "ok",
+    "callback_url": "https://hooks.example.com:8443/done",
+}
+
+
+@pytest.fixture
+def rebinding_dns(monkeypatch):
+    """Public address on the first lookup, loopback on every later one"""
+    lookups = []
+
+    async def resolve(host, port):
+        lookups.append(host)
+        return [PUBLIC] if len(lookups) == 1 else [PRIVATE]
+
+    monkeypatch.setattr(callbacks, "_resolve", resolve)
+    return lookups
+
+
+@pytest.mark.anyio
+async def test_callback_goes_to_checked_address(rebinding_dns):
+    sent = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        sent.append(request)
+        return httpx.Response(200)
+
+    sender = CallbackSender(max_attempts=1, transport=httpx.MockTransport(handler))
+    assert await sender.send(JOB)
+
+    # resolved once, and the request went to that answer, not a new lookup
+    assert rebinding_dns == ["hooks.example.com"]
+    [request] = sent
+    assert request.url.host == str(PUBLIC)
+    assert request.url.port == 8443
+    assert request.headers["Host"] == "hooks.example.com:8443"
+    assert request.extensions["sni_hostname"] == "hooks.example.com"
+
+
+@pytest.mark.anyio
+async def test_callback_not_sent_when_rebound(rebinding_dns):
+    sent = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        sent.append(request)
+        return httpx.Response(200)
+
+    # public when the job was created, private by the time it's sent
+    assert await callback_url_error(JOB["callback_url"]) is None
+    sender = CallbackSender(max_attempts=1, transport=httpx.MockTransport(handler))
+    assert not await sender.send(JOB)
+    assert sent == []
@@ -0,0 +1,35 @@
+import random
+
+import pytest
+
+from app.core.tokens import count_tokens
+from app.infra.chunker import StreamChunker
+
+WORDS = [
+    "alpha", "beta", "gamma", "...", "!?", "»", "“quoted”", "(paren)",
+    "12345", "привет", "мир", "日本語", "—", "-",
+]
+SEPARATORS = [" ", ". ", "! ", "\n\n", "\n", ".\n\n"]
+
+
+def _text(seed: int, words: int = 3000) -> str:
+    rng = random.Random(seed)
+    return "".join(
+        rng.choice(WORDS) + rng.choice(SEPARATORS) for _ in range(words)
+    )
+
+
+@pytest.mark.parametrize("model", [None, "text-embedding-3-small"])
+@pytest.mark.parametrize("chunk_size,overlap", [(500, 50), (100, 20), (60, 10)])
+def test_chunks_never_exceed_chunk_size(model, chunk_size, overlap):
+    for seed in range(10):
+        text = _text(seed)
+        chunker = StreamChunker(chunk_size, overlap, model=model)
+        chunks = []
+        for start in range(0, len(text), 700):
+            chunks += chunker.feed(text[start:start + 700])
+        chunks += chunker.flush()
+
+        assert chunks
+        # joined chunks, separators included, in the model's tokens
+        assert max(count_tokens(c, model=model) for c in chunks) <= chunk_size
@@ -0,0 +1,116 @@
+import asyncio
+import ipaddress
+import json
+
+import fakeredis
+import httpx
+import pytest
+from fastapi import FastAPI
+
+from app.api import inference
+from app.dependencies.auth import auth_dependency
+from app.dependencies.inference import get_inference_service
+from app.dependencies.user import get_current_user
+from app.inference import callbacks
+from app.inference.callbacks import CallbackSender
+from app.inference.inference_repository import InferenceJobRepository
+from app.inference.inference_service import InferenceService
+from app.inference.job_queue import JobQueue
+from app.inference.workers.async_inference_worker import AsyncInferenceWorker
+from app.inference.workers.job_handler.llm_handler import LLMHandler
+from app.models.user import UserContext
+
+CALLBACK_URL = "https://hooks.example.com/done"
+
+
+class FakeLLM:
+    async def generate(self, prompt, gen_config, instruction=None):
+        return {"text": f"echo: {prompt}"}
+
+
+class FakeLLMFactory:
+    def get(self, provider):
+        return FakeLLM()
+
+
+@pytest.fixture
+def redis():
+    return fakeredis.FakeAsyncRedis(decode_responses=True)
+
+
+@pytest.fixture
+def api(redis):
+    app = FastAPI()
+    app.include_router(inference.router)
+    user = UserContext(id="1", role="user")
+    app.dependency_overrides[auth_dependency] = lambda: user
+    app.dependency_overrides[get_current_user] = lambda: user
+    app.dependency_overrides[get_inference_service] = \
+        lambda: InferenceService(InferenceJobRepository(redis))
+    return httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app), base_url="http://api"
+    )
+
+
+@pytest.fixture
+def public_dns(monkeypatch):
+    async def resolve(host, port):
+        return [ipaddress.ip_address("93.184.216.34")]
+
+    monkeypatch.setattr(callbacks, "_resolve", resolve)
+
+
+def make_worker(redis, transport) -> AsyncInferenceWorker:
+    worker = AsyncInferenceWorker()
+    worker.redis = redis
+    worker.repo = InferenceJobRepository(redis)
+    worker.queue = JobQueue(redis, worker_id="test-worker")
+    worker.handlers = [LLMHandler(FakeLLMFactory())]
+    worker.callbacks = CallbackSender(max_attempts=1, transport=transport)
+    return worker
+
+
+@pytest.mark.anyio
+async def test_create_inference_sends_callback(api, redis, public_dns):
+    async with api:
+        response = await api.post(
+            "/inference/", json={"prompt": "hello", "callback_url": CALLBACK_URL}
+        )
+    assert response.status_code == 200
+    job_id = response.json()["job_id"]
+
+    sent = []
+
+    def receiver(request: httpx.Request) -> httpx.Response:
+        sent.append(request)
+        return httpx.Response(200)
+
+    worker = make_worker(redis, httpx.MockTransport(receiver))
+    raw, job = await worker.queue.pop(timeout=1)
+    assert job["job_type"] == "single_shot"
+    assert job["callback_url"] == CALLBACK_URL
+
+    assert await worker._reserve(job)
+    await worker.process(raw, job)
+    await asyncio.gather(*worker.callback_tasks)
+
+    [callback] = sent
+    assert callback.headers["Host"] == "hooks.example.com"
+    payload = json.loads(callback.content)
+    state = await worker.repo.get_job(job_id)
+    assert payload["job_id"] == job_id
+    assert payload["status"] == state["status"]
+    assert state["status"] not in ("queued", "running")
+
+
+@pytest.mark.anyio
+async def test_create_inference_rejects_private_callback(api, monkeypatch):
+    async def resolve(host, port):
+        return [ipaddress.ip_address("169.254.169.254")]
+
+    monkeypatch.setattr(callbacks, "_resolve", resolve)
+    async with api:
+        response = await api.post(
+            "/inference/", json={"prompt": "hello", "callback_url": CALLBACK_URL}
+        )
+    assert response.status_code == 422
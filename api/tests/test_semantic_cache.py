@@ -0,0 +1,80 @@
+import pytest
+
+from app.embeddings.service import EmbeddingService
+from app.services import semantic_cache
+from app.services.semantic_cache import SemanticCache
+
+
+class FakeEmbeddingClient:
+    def __init__(self, model: str, dim: int):
+        self.model = model
+        self.dim = dim
+
+    async def embed(self, texts):
+        return [[1.0] * self.dim for _ in texts]
+
+
+class FakeQdrant:
+    """Collections with a fixed vector size, like Qdrant checks them"""
+
+    def __init__(self):
+        self.sizes: dict[str, int] = {}
+        self.points: dict[str, list] = {}
+
+    async def create_collection(self, name, vector_size):
+        self.sizes.setdefault(name, vector_size)
+        self.points.setdefault(name, [])
+
+    async def create_payload_index(self, name, field, schema):
+        pass
+
+    def _check(self, name, vector):
+        if self.sizes.get(name) != len(vector):
+            raise ValueError(f"Wrong vector dimension for '{name}'")
+
+    async def upsert_point(self, name, point_id, vector, payload):
+        self._check(name, vector)
+        self.points[name].append({"score": 1.0, "payload": payload})
+
+    async def search_points(self, name, vector, **kwargs):
+        self._check(name, vector)
+        return self.points[name][:1]
+
+
+@pytest.fixture
+def qdrant(monkeypatch):
+    fake = FakeQdrant()
+    monkeypatch.setattr(semantic_cache, "qdrant", fake)
+    return fake
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize("model,dim", [
+    ("text-embedding-3-small", 1536), ("gemini-embedding-001", 3072)
+])
+async def test_cache_hits_with_any_embedding_dimension(qdrant, model, dim):
+    cache = SemanticCache(EmbeddingService(FakeEmbeddingClient(model, dim)))
+
+    cached, vector = await cache.lookup("hi", "openai", "gpt")
+    assert cached is None and len(vector) == dim
+    await cache.store("hi", vector, {"text": "hello"}, "openai", "gpt")
+
+    cached, _ = await cache.lookup("hi", "openai", "gpt")
+    assert cached == {"text": "hello"}
+    assert list(qdrant.sizes.values()) == [dim]
+
+
+@pytest.mark.anyio
+async def test_other_embedding_model_gets_its_own_collection(qdrant):
+    old = SemanticCache(
+        EmbeddingService(FakeEmbeddingClient("gemini-embedding-001", 3072))
+    )
+    new = SemanticCache(
+        EmbeddingService(FakeEmbeddingClient("text-embedding-3-small", 1536))
+    )
+    _, vector = await old.lookup("hi", "openai", "gpt")
+    await old.store("hi", vector, {"text": "old"}, "openai", "gpt")
+
+    cached, vector = await new.lookup("hi", "openai", "gpt")
+    assert cached is None and len(vector) == 1536
+    assert len(qdrant.sizes) == 2